@@ -1,11 +1,11 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 import re
 
-def active_response_agent(query: str) -> str:
+def active_response_agent(query: str, wazuh=None) -> str:
     """Active Response and Orchestration Agent - Executes automated responses"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         query_lower = query.lower()
         
         result = "🤖 Active Response and Orchestration\n"
@@ -1,10 +1,10 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 
-def fetch_agents(query: str) -> str:
+def fetch_agents(query: str, wazuh=None) -> str:
     """Fetch and analyze Wazuh agents status"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         agents = wazuh.get_agents()
         
         if agents.get('error', 0) != 0:
@@ -1,11 +1,12 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import ALERT_SUMMARY_FIELDS, get_wazuh_client
 
-def fetch_alerts(query: str) -> str:
+def fetch_alerts(query: str, wazuh=None) -> str:
     """Fetch and filter Wazuh alerts based on natural language query"""
     try:
-        wazuh = WazuhClient()
-        alerts = wazuh.get_alerts()
+        wazuh = wazuh or get_wazuh_client()
+        # Incremental: only alerts newer than the last poll cross the wire
+        alerts = wazuh.poll_alerts(fields=ALERT_SUMMARY_FIELDS, window_size=50)
         
         if alerts.get('error', 0) != 0:
             return f"Error fetching alerts: {alerts['error']}"
@@ -1,5 +1,5 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import ALERT_SUMMARY_FIELDS, get_wazuh_client
 import re
 
 # MITRE ATT&CK tactic mapping for alert correlation
@@ -60,6 +60,9 @@ def map_alert_to_mitre(rule_description: str, rule_id: int):
     
     return tactics if tactics else ['Unable to map to specific MITRE tactic']
 
+# Alerts analysed per triage run; the summary total comes from total_affected_items
+TRIAGE_ALERT_LIMIT = 1000
+
 def correlate_alerts(alerts):
     """Correlate alerts to identify patterns"""
     if not alerts:
@@ -86,10 +89,10 @@ def correlate_alerts(alerts):
     
     return patterns
 
-def alert_triage_agent(query: str) -> str:
+def alert_triage_agent(query: str, wazuh=None) -> str:
     """Alert Triage Agent - Analyzes alerts with MITRE ATT&CK correlation"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         
         # Determine severity filter
         severity_min = 7  # Default: high severity
@@ -100,12 +103,14 @@ def alert_triage_agent(query: str) -> str:
         elif 'medium' in query.lower():
             severity_min = 5
         
-        alerts_data = wazuh.get_alerts(limit=100, severity_min=severity_min)
+        # Only alerts newer than the previous triage run are downloaded
+        alerts = wazuh.poll_alerts(severity_min=severity_min, fields=ALERT_SUMMARY_FIELDS,
+                                   window_size=TRIAGE_ALERT_LIMIT)
         
-        if alerts_data.get('error', 0) != 0:
-            return f"Error fetching alerts: {alerts_data['error']}"
+        if alerts.get('error', 0) != 0:
+            return f"Error fetching alerts: {alerts['error']}"
         
-        items = alerts_data.get('data', {}).get('affected_items', [])
+        items = alerts.get('data', {}).get('affected_items', [])
         
         if not items:
             return "No alerts found matching the criteria."
@@ -117,7 +122,7 @@ def alert_triage_agent(query: str) -> str:
         result = f"🚨 Alert Triage Report\n"
         result += f"{'='*50}\n\n"
         result += f"📊 Summary:\n"
-        result += f"- Total Alerts: {len(items)}\n"
+        result += f"- Total Alerts: {alerts['data'].get('total_affected_items') or len(items)}\n"
         result += f"- Critical Alerts (Level ≥10): {sum(1 for a in items if a.get('rule', {}).get('level', 0) >= 10)}\n"
         result += f"- High Alerts (Level ≥7): {sum(1 for a in items if a.get('rule', {}).get('level', 0) >= 7)}\n\n"
         
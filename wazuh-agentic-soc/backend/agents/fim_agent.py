@@ -1,11 +1,11 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 import re
 
-def fim_agent(query: str) -> str:
+def fim_agent(query: str, wazuh=None) -> str:
     """File Integrity Monitoring Agent - Monitors file changes"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         query_lower = query.lower()
         
         result = "📁 File Integrity Monitoring (FIM) Report\n"
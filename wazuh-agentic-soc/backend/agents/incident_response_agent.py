@@ -1,11 +1,11 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 import re
 
-def incident_response_agent(query: str) -> str:
+def incident_response_agent(query: str, wazuh=None) -> str:
     """Incident Response Agent - Triggers automated responses and escalates"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         query_lower = query.lower()
         
         result = "🚨 Incident Response Actions\n"
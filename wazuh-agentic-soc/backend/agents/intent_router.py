@@ -0,0 +1,191 @@
+import re
+from collections import namedtuple
+
+# Intents in routing priority order (highest first) with their trigger keywords.
+# A keyword also matches its plural/inflected forms ("alerts", "blocked").
+INTENTS = [
+    ("xml_editor", ['create rule', 'add rule', 'new rule', 'modify rule', 'edit rule', 'xml', 'decoder']),
+    ("active_response", ['trigger', 'active response', 'orchestrate', 'automated response', 'execute command']),
+    ("incident_response", ['isolate', 'quarantine', 'block ip', 'escalate', 'incident response']),
+    ("alert_triage", ['triage', 'mitre', 'attack', 'correlate alerts', 'analyze incidents']),
+    ("threat_intelligence", ['threat intelligence', 'virustotal', 'ioc', 'check ip', 'analyze hash', 'threat feed']),
+    ("fim", ['fim', 'file integrity', 'file change', 'file monitoring', 'baseline']),
+    ("sca", ['sca', 'compliance', 'cis', 'nist', 'security assessment', 'configuration check']),
+    ("log_analysis", ['analyze logs', 'log collection', 'search logs', 'log analysis', 'ioc detection']),
+    ("reporting", ['report', 'generate report', 'executive summary', 'compliance report', 'visualization']),
+    ("firewall", ['block', 'allow', 'firewall', 'iptables', 'port']),
+    ("alerts", ['alert', 'incident', 'security event', 'attack', 'breach', 'critical', 'high']),
+    ("rules", ['rule', 'policy', 'regulation']),
+    ("agents", ['agent', 'host', 'server', 'endpoint', 'machine', 'online', 'offline', 'status']),
+]
+
+DEFAULT_INTENT = "alerts"
+
+Intent = namedtuple("Intent", ["tool", "score", "confidence", "matches"])
+
+
+def inflections(word: str) -> tuple:
+    """The word with its plural and -ed/-ing forms, built from the stem ("isolate" -> "isolated", "isolating")"""
+    if word.endswith("e"):
+        return (word, word + "s", word + "d", word[:-1] + "ing")
+    if word.endswith("y") and word[-2:-1] not in ("a", "e", "i", "o", "u"):
+        return (word, word[:-1] + "ies", word[:-1] + "ied", word + "ing")
+    return (word, word + "s", word + "es", word + "ed", word + "ing")
+
+
+# Everything but ASCII letters and digits separates words
+_SEPARATORS = str.maketrans({chr(c): " " for c in range(128) if not chr(c).isalnum()})
+
+
+def _trie_pattern(phrases) -> str:
+    """Regex alternation for ``phrases`` factored into a trie, so matching never backtracks
+    across keywords that share a prefix; longer phrases are tried first"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        # Words of a phrase may be separated by any run of separators (spaces after normalization)
+        branches = [(" +" if char == " " else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" not in node:
+            return body
+        return (body if len(branches) > 1 else f"(?:{body})") + "?"
+    return build(trie)
+
+
+class IntentRouter:
+    """Scores every intent in one pass over the query.
+
+    Every keyword and inflection is compiled into one trie-shaped regex
+    alternation, so a single C-level ``findall`` over the normalized query
+    finds all hits, longest phrase first ("compliance report" wins over
+    "compliance"), however many keywords there are. Each hit adds the
+    intent's priority weight times the number of words in the keyword, so
+    specific phrases and higher-priority tools rank first.
+    """
+
+    def __init__(self, intents=INTENTS, default=DEFAULT_INTENT):
+        self.default = default
+        self.priority = {tool: rank for rank, (tool, _) in enumerate(intents)}
+        weights = {tool: len(intents) - rank for tool, rank in self.priority.items()}
+        self.phrases = {}  # "blocked ip" -> ("block ip", [(tool, weight)])
+        for tool, keywords in intents:
+            for keyword in keywords:
+                words = keyword.split()
+                for last in inflections(words[-1]):
+                    phrase = " ".join(words[:-1] + [last])
+                    self.phrases.setdefault(phrase, (keyword, []))[1].append((tool, weights[tool] * len(words)))
+        # Matched against the query with separators turned into spaces and padded with
+        # one on each side, so a phrase always starts and ends on a word boundary
+        self.pattern = re.compile(f" ({_trie_pattern(self.phrases)})(?= )")
+
+    def _score(self, query: str):
+        """({tool: score}, {tool: [keywords]}) from one findall over the query"""
+        scores, matches = {}, {}
+        for phrase in self.pattern.findall(f" {query.lower().translate(_SEPARATORS)} "):
+            if "  " in phrase:
+                phrase = " ".join(phrase.split())
+            keyword, intents = self.phrases[phrase]
+            for tool, weight in intents:
+                scores[tool] = scores.get(tool, 0) + weight
+                matches.setdefault(tool, []).append(keyword)
+        return scores, matches
+
+    def route(self, query: str) -> list:
+        """All matching intents, best first; the default intent with zero confidence if none match"""
+        scores, matches = self._score(query)
+        if not scores:
+            return [Intent(self.default, 0, 0.0, [])]
+        total = sum(scores.values())
+        ranked = sorted(scores, key=lambda tool: (-scores[tool], self.priority[tool]))
+        return [Intent(tool, scores[tool], round(scores[tool] / total, 3), matches[tool]) for tool in ranked]
+
+    def best(self, query: str) -> str:
+        scores, _ = self._score(query)
+        if not scores:
+            return self.default
+        return min(scores, key=lambda tool: (-scores[tool], self.priority[tool]))
+
+
+_router = IntentRouter()
+
+
+def route_query(query: str) -> list:
+    """Ranked intents for a query using the shared router"""
+    return _router.route(query)
+
+
+# Tools whose report already covers another tool's data, so a compound query
+# does not need to run both ("triage alerts and incidents")
+SUBSUMES = {
+    "alert_triage": {"alerts"},
+    "incident_response": {"alerts"},
+    "reporting": {"alerts", "agents", "sca"},
+    "xml_editor": {"rules"},
+}
+
+# Clause boundaries in compound questions ("triage alerts and show FIM changes")
+_CLAUSE_SPLIT = re.compile(r"\s*(?:;|,?\s*\b(?:and then|and also|then|also|and)\b)\s*", re.IGNORECASE)
+
+# Tools that change state on the manager or endpoints: they get exactly the words the user
+# wrote for them, never a target borrowed from another clause
+ACTION_TOOLS = {"incident_response", "active_response", "firewall"}
+
+# Targets the agents parse out of a query, by kind; one named in a read-only clause
+# usually qualifies the others ("show FIM changes and SCA results for agent 003")
+_QUALIFIERS = {
+    "agent": re.compile(r"\bagent\s+\d+\b", re.IGNORECASE),
+    "ip": re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b"),
+    "rule": re.compile(r"\brule\s+\d+\b", re.IGNORECASE),
+}
+
+
+def _targets(text: str) -> dict:
+    """{kind: [distinct targets in order]} named in ``text``"""
+    return {kind: list(dict.fromkeys(" ".join(match.lower().split()) for match in pattern.findall(text)))
+            for kind, pattern in _QUALIFIERS.items()}
+
+
+def _with_qualifiers(sub_query: str, shared: dict) -> str:
+    """``sub_query`` plus each shared target whose kind it names none of"""
+    present = _targets(sub_query)
+    return " ".join([sub_query] + [target for kind, target in shared.items() if not present[kind]])
+
+
+def plan_tools(query: str, router: IntentRouter = _router) -> list:
+    """[(tool, sub_query)] for each distinct intent of a possibly compound query, in order.
+
+    Each clause is routed on its own. A clause that matches nothing, or whose
+    best intent already ranked for (or is covered by, see SUBSUMES) an earlier
+    clause ("correlate alerts and incidents") is folded into that earlier
+    step instead of adding a tool. An agent ID, IP or rule ID that the
+    read-only clauses name exactly one of is added to read-only sub-queries
+    naming none of that kind; ACTION_TOOLS sub-queries are left as typed.
+    """
+    steps = []  # [tool, clauses, tools ranked for those clauses]
+    for clause in filter(None, (part.strip() for part in _CLAUSE_SPLIT.split(query))):
+        intents = router.route(clause)
+        best = intents[0]
+        owner = next((step for step in steps if best.tool in step[2]), None)
+        if steps and (best.score == 0 or owner):
+            step = owner or steps[-1]
+            step[1].append(clause)
+            step[2].update(intent.tool for intent in intents if intent.score)
+            continue
+        steps.append([best.tool, [clause], {intent.tool for intent in intents} | SUBSUMES.get(best.tool, set())])
+    if len(steps) <= 1:
+        # Single intent: the tool sees the question exactly as asked
+        return [(steps[0][0] if steps else router.default, query)]
+    plan = [(tool, " and ".join(clauses)) for tool, clauses, _ in steps]
+    reads = _targets(" ; ".join(sub_query for tool, sub_query in plan if tool not in ACTION_TOOLS))
+    # Two agents (or IPs, rules) named: which one an unqualified clause means is a guess, so add neither
+    shared = {kind: targets[0] for kind, targets in reads.items() if len(targets) == 1}
+    return [(tool, sub_query if tool in ACTION_TOOLS else _with_qualifiers(sub_query, shared))
+            for tool, sub_query in plan]
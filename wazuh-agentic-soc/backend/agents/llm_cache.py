@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from integrations.ttl_cache import TTLCache
+
+# Seconds an LLM answer is reused for an identical prompt
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "300"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+# Optional JSON file the cache is loaded from and written back to
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+
+
+def prompt_key(prompt, model=""):
+    """Hash of the whitespace-normalized prompt (which embeds the tool data) and the model"""
+    normalized = re.sub(r"\s+", " ", str(prompt)).strip()
+    return hashlib.sha256(f"{model}\n{normalized}".encode()).hexdigest()
+
+
+class CachedLLM:
+    """Drop-in wrapper around a LangChain chat model that answers repeated prompts from a TTL cache.
+
+    ``invoke`` and ``stream`` are cached; every other attribute is passed
+    through to the wrapped model. With ``path`` set, entries survive
+    restarts via a small JSON file written after each new answer.
+    """
+
+    def __init__(self, llm, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES, path=LLM_CACHE_PATH):
+        self.llm = llm
+        self.ttl = ttl
+        self.path = path or None
+        self.cache = TTLCache(max_entries=max_entries)
+        self.model = getattr(llm, "model", "") or ""
+        self.saved_seconds = 0.0
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def _remember(self, key, content, seconds):
+        self.cache.set(key, {"content": content, "seconds": seconds}, self.ttl)
+        self._save()
+
+    def invoke(self, prompt, *args, **kwargs):
+        key = prompt_key(prompt, self.model)
+        entry = self.cache.get(key)
+        if entry is not None:
+            # Deferred: langchain_core is already loaded by the wrapped model by now
+            from langchain_core.messages import AIMessage
+            self.saved_seconds += entry["seconds"]
+            return AIMessage(content=entry["content"])
+        started = time.perf_counter()
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        if isinstance(response.content, str):
+            self._remember(key, response.content, time.perf_counter() - started)
+        return response
+
+    def stream(self, prompt, *args, **kwargs):
+        key = prompt_key(prompt, self.model)
+        entry = self.cache.get(key)
+        if entry is not None:
+            from langchain_core.messages import AIMessageChunk
+            self.saved_seconds += entry["seconds"]
+            yield AIMessageChunk(content=entry["content"])
+            return
+        started = time.perf_counter()
+        parts = []
+        complete = True
+        for chunk in self.llm.stream(prompt, *args, **kwargs):
+            if isinstance(chunk.content, str):
+                parts.append(chunk.content)
+            else:
+                complete = False
+            yield chunk
+        # Only a fully consumed, plain-text stream is worth replaying
+        if complete:
+            self._remember(key, "".join(parts), time.perf_counter() - started)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable LLM cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, (expires_at, value) in entries.items():
+            if expires_at > now:
+                self.cache.set(key, value, expires_at - now)
+
+    def _save(self):
+        if not self.path:
+            return
+        now = time.time()
+        entries = {key: (now + seconds_left, value) for key, seconds_left, value in self.cache.items()}
+        with self._save_lock:
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ Could not persist LLM cache: {e}")
+
+    def stats(self):
+        """Hit/miss counters plus the LLM time the hits avoided"""
+        return {**self.cache.stats(), "ttl_seconds": self.ttl, "persisted": bool(self.path),
+                "llm_seconds_saved": round(self.saved_seconds, 2)}
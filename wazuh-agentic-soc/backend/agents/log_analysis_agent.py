@@ -1,11 +1,11 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 import re
 
-def log_analysis_agent(query: str) -> str:
+def log_analysis_agent(query: str, wazuh=None) -> str:
     """Log Collection and Analysis Agent - Aggregates and analyzes logs"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         query_lower = query.lower()
         
         result = "📋 Log Collection and Analysis Report\n"
@@ -1,18 +1,58 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from agents.alert_agent import fetch_alerts
-from agents.rule_agent import fetch_rules
-from agents.agent_manager import fetch_agents
-from agents.firewall_agent import parse_firewall_request
-from agents.xml_editor_agent import xml_editor_agent
-from agents.alert_triage_agent import alert_triage_agent
-from agents.threat_intelligence_agent import threat_intelligence_agent
-from agents.incident_response_agent import incident_response_agent
-from agents.fim_agent import fim_agent
-from agents.sca_agent import sca_agent
-from agents.log_analysis_agent import log_analysis_agent
-from agents.active_response_agent import active_response_agent
-from agents.reporting_agent import reporting_agent
+from agents.response_templates import render_template
+from agents.llm_cache import CachedLLM
+from agents.intent_router import plan_tools, route_query
+from integrations.wazuh_client import get_wazuh_client
+from integrations.request_context import WazuhRequestContext
+from concurrent.futures import ThreadPoolExecutor
+import importlib
 import os
+import threading
+import time
+
+# How a tool result becomes the chat answer:
+#   llm      - Gemini rewrites it conversationally (one extra round trip)
+#   direct   - the tool output as-is
+#   template - the tool output wrapped by a local renderer
+#   auto     - per-tool policy below, falling back to llm
+RESPONSE_MODES = ("llm", "direct", "template", "auto")
+DEFAULT_RESPONSE_MODE = os.getenv("RESPONSE_MODE", "auto")
+
+# Tools that already return a formatted report; the LLM pass adds latency, not insight
+TOOL_RESPONSE_POLICY = {
+    "fim": "direct",
+    "sca": "direct",
+    "reporting": "direct",
+    "agents": "template",
+    "rules": "template",
+    "log_analysis": "template",
+}
+
+# Tools of one compound query run at once on a pool of this size
+MAX_PARALLEL_TOOLS = int(os.getenv("ORCHESTRATOR_MAX_PARALLEL_TOOLS", "4"))
+
+# Tools that change state (iptables, active responses) never run concurrently
+SEQUENTIAL_TOOLS = {"firewall", "active_response", "incident_response"}
+
+# Tool name -> (module, function). Modules are imported on first use (or by
+# load_tools() during warm-up) so importing the orchestrator stays cheap
+TOOL_REGISTRY = {
+    "alerts": ("agents.alert_agent", "fetch_alerts"),
+    "rules": ("agents.rule_agent", "fetch_rules"),
+    "agents": ("agents.agent_manager", "fetch_agents"),
+    "firewall": ("agents.firewall_agent", "parse_firewall_request"),
+    "xml_editor": ("agents.xml_editor_agent", "xml_editor_agent"),
+    "alert_triage": ("agents.alert_triage_agent", "alert_triage_agent"),
+    "threat_intelligence": ("agents.threat_intelligence_agent", "threat_intelligence_agent"),
+    "incident_response": ("agents.incident_response_agent", "incident_response_agent"),
+    "fim": ("agents.fim_agent", "fim_agent"),
+    "sca": ("agents.sca_agent", "sca_agent"),
+    "log_analysis": ("agents.log_analysis_agent", "log_analysis_agent"),
+    "active_response": ("agents.active_response_agent", "active_response_agent"),
+    "reporting": ("agents.reporting_agent", "reporting_agent"),
+}
+
+class QueryCancelled(Exception):
+    """Raised inside run_query once the caller has set its cancel event"""
 
 class SOCOrchestrator:
     def __init__(self):
@@ -20,112 +60,53 @@ class SOCOrchestrator:
         if not api_key or api_key == "your_gemini_api_key_here":
             raise ValueError("Please set your GEMINI_API_KEY in the .env file")
         
-        self.llm = ChatGoogleGenerativeAI(
+        # Imported here rather than at module level: it is the slowest import in the app
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        
+        # Cached so identical prompts (same question over the same Wazuh data) reuse
+        # the answer; also covers parse_rule_request, which gets this instance
+        self.llm = CachedLLM(ChatGoogleGenerativeAI(
             model="gemini-2.0-flash-exp",
             google_api_key=api_key,
             temperature=0.1
-        )
-        
-        # Define tool functions - expanded agentic system
-        self.tools = {
-            "alerts": fetch_alerts,
-            "rules": fetch_rules,
-            "agents": fetch_agents,
-            "firewall": parse_firewall_request,
-            "xml_editor": xml_editor_agent,
-            "alert_triage": alert_triage_agent,
-            "threat_intelligence": threat_intelligence_agent,
-            "incident_response": incident_response_agent,
-            "fim": fim_agent,
-            "sca": sca_agent,
-            "log_analysis": log_analysis_agent,
-            "active_response": active_response_agent,
-            "reporting": reporting_agent
-        }
+        ))
+        
+        # Shared Wazuh client handed to every Wazuh-backed tool
+        self.wazuh = get_wazuh_client()
+        
+        # Tool functions, imported from TOOL_REGISTRY as they are first needed
+        self.tools = {}
         
         # Store pending approvals
         self.pending_approvals = {}
+        
+        # End-to-end latency per response mode actually used
+        self._latency = {}
+        self._latency_lock = threading.Lock()
     
     def _determine_tool(self, query: str) -> str:
-        """Intelligent tool selection using LLM-enhanced keyword matching"""
-        query_lower = query.lower()
-        
-        # Priority-based routing (highest priority first)
-        
-        # XML Editor - Rule creation/modification
-        if any(word in query_lower for word in ['create rule', 'add rule', 'new rule', 'modify rule', 'edit rule', 'xml', 'decoder']):
-            return "xml_editor"
-        
-        # Active Response - Automated actions
-        if any(word in query_lower for word in ['trigger', 'active response', 'orchestrate', 'automated response', 'execute command']):
-            return "active_response"
-        
-        # Incident Response - Isolation, blocking
-        if any(word in query_lower for word in ['isolate', 'quarantine', 'block ip', 'escalate', 'incident response']):
-            return "incident_response"
-        
-        # Alert Triage - MITRE ATT&CK analysis
-        if any(word in query_lower for word in ['triage', 'mitre', 'attack', 'correlate alerts', 'analyze incidents']):
-            return "alert_triage"
-        
-        # Threat Intelligence - IOC checks
-        if any(word in query_lower for word in ['threat intelligence', 'virustotal', 'ioc', 'check ip', 'analyze hash', 'threat feed']):
-            return "threat_intelligence"
-        
-        # FIM - File integrity
-        if any(word in query_lower for word in ['fim', 'file integrity', 'file change', 'file monitoring', 'baseline']):
-            return "fim"
-        
-        # SCA - Compliance checks
-        if any(word in query_lower for word in ['sca', 'compliance', 'cis', 'nist', 'security assessment', 'configuration check']):
-            return "sca"
-        
-        # Log Analysis - Log collection
-        if any(word in query_lower for word in ['analyze logs', 'log collection', 'search logs', 'log analysis', 'ioc detection']):
-            return "log_analysis"
-        
-        # Reporting - Reports generation
-        if any(word in query_lower for word in ['report', 'generate report', 'executive summary', 'compliance report', 'visualization']):
-            return "reporting"
-        
-        # Firewall - Basic firewall commands
-        if any(word in query_lower for word in ['block', 'allow', 'firewall', 'iptables', 'port']):
-            return "firewall"
-        
-        # Alert-related keywords
-        if any(word in query_lower for word in ['alert', 'incident', 'security event', 'attack', 'breach', 'critical', 'high']):
-            return "alerts"
-        
-        # Rule-related keywords
-        if any(word in query_lower for word in ['rule', 'policy', 'regulation']):
-            return "rules"
-        
-        # Agent-related keywords
-        if any(word in query_lower for word in ['agent', 'host', 'server', 'endpoint', 'machine', 'online', 'offline', 'status']):
-            return "agents"
-        
-        # Default to alerts for general security queries
-        return "alerts"
+        """Pick the highest-scoring intent from the compiled keyword router"""
+        return route_query(query)[0].tool
     
-    def process_query(self, user_query: str) -> str:
-        """Process user query through appropriate tool with LLM enhancement"""
-        try:
-            # Handle approval requests
-            if user_query.lower().startswith('approve'):
-                return self._handle_approval(user_query)
-            
-            # Determine which tool to use
-            tool_name = self._determine_tool(user_query)
-            tool_func = self.tools[tool_name]
-            
-            # Execute the tool (pass LLM for XML editor)
-            if tool_name == "xml_editor":
-                result = tool_func(user_query, self.llm)
-            else:
-                result = tool_func(user_query)
-            
-            # Enhance response with LLM
-            enhanced_prompt = f"""
+    def _resolve_mode(self, tool_name: str, result: str, mode: str) -> str:
+        """Pick llm/direct/template for one result; "auto" follows TOOL_RESPONSE_POLICY"""
+        if mode != "auto":
+            return mode
+        if "REQUIRES APPROVAL" in result:
+            # Approval requests need the explanation the LLM adds
+            return "llm"
+        if result.startswith("Error"):
+            return "direct"
+        return TOOL_RESPONSE_POLICY.get(tool_name, "llm")
+    
+    @staticmethod
+    def _check_cancel(cancel):
+        if cancel is not None and cancel.is_set():
+            raise QueryCancelled()
+    
+    def _enhance(self, user_query: str, result: str, emit=None, cancel=None) -> str:
+        """Rewrite a tool result conversationally with the LLM, streaming tokens to ``emit`` if given"""
+        enhanced_prompt = f"""
             User asked: "{user_query}"
             
             Raw data from system:
@@ -141,12 +122,155 @@ class SOCOrchestrator:
             Keep the response concise but informative. If the raw data is already well-formatted, 
             you can present it in a more conversational way without losing important details.
             """
-            
+        
+        # Last point to drop the query before paying for the LLM call
+        self._check_cancel(cancel)
+        if emit is None:
             enhanced_response = self.llm.invoke(enhanced_prompt)
             return enhanced_response.content
+        
+        tokens = []
+        for chunk in self.llm.stream(enhanced_prompt):
+            self._check_cancel(cancel)
+            if isinstance(chunk.content, str) and chunk.content:
+                tokens.append(chunk.content)
+                emit({"type": "token", "content": chunk.content})
+        return "".join(tokens)
+    
+    def _record_latency(self, mode: str, seconds: float):
+        with self._latency_lock:
+            stats = self._latency.setdefault(mode, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += seconds * 1000
+            stats["max_ms"] = max(stats["max_ms"], seconds * 1000)
+    
+    def latency_stats(self) -> dict:
+        """Query count and average/max end-to-end latency per response mode"""
+        with self._latency_lock:
+            return {
+                mode: {
+                    "count": stats["count"],
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+                for mode, stats in self._latency.items()
+            }
+    
+    def _tool(self, tool_name: str):
+        tool_func = self.tools.get(tool_name)
+        if tool_func is None:
+            module, function = TOOL_REGISTRY[tool_name]
+            tool_func = self.tools[tool_name] = getattr(importlib.import_module(module), function)
+        return tool_func
+    
+    def load_tools(self):
+        """Import every tool module now (startup warm-up) instead of on first use"""
+        for tool_name in TOOL_REGISTRY:
+            self._tool(tool_name)
+    
+    def _run_tool(self, tool_name: str, query: str, wazuh) -> str:
+        """Execute one tool (pass LLM for XML editor, the request's Wazuh context for the rest)"""
+        tool_func = self._tool(tool_name)
+        if tool_name == "xml_editor":
+            return tool_func(query, self.llm, wazuh=wazuh)
+        if tool_name == "firewall":
+            return tool_func(query)
+        return tool_func(query, wazuh=wazuh)
+    
+    def _run_tools(self, plan: list, wazuh) -> list:
+        """Run every (tool, sub-query) of a plan and return the results in plan order.
+
+        Read-only tools share a bounded pool, so a compound question takes
+        about as long as its slowest tool; SEQUENTIAL_TOOLS run one after
+        another on this thread meanwhile. A failing tool yields an error
+        line instead of sinking the others.
+        """
+        def run(tool_name, query):
+            try:
+                return self._run_tool(tool_name, query, wazuh)
+            except Exception as e:
+                return f"Error running {tool_name}: {str(e)}"
+        
+        if len(plan) == 1:
+            return [self._run_tool(*plan[0], wazuh)]
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_PARALLEL_TOOLS, len(plan)))) as executor:
+            futures = [None if tool_name in SEQUENTIAL_TOOLS else executor.submit(run, tool_name, query)
+                       for tool_name, query in plan]
+            sequential = {i: run(*plan[i]) for i, future in enumerate(futures) if future is None}
+            return [sequential[i] if future is None else future.result() for i, future in enumerate(futures)]
+    
+    def _merge_results(self, user_query: str, plan: list, results: list, mode: str, emit=None, cancel=None):
+        """Combine per-tool results into one answer; returns (content, mode used)"""
+        modes = [self._resolve_mode(tool_name, result, mode) for (tool_name, _), result in zip(plan, results)]
+        if len(plan) == 1:
+            tool_name, result, mode = plan[0][0], results[0], modes[0]
+            if mode == "llm":
+                return self._enhance(user_query, result, emit, cancel), mode
+            if mode == "template":
+                return render_template(tool_name, result), mode
+            return result, mode
+        
+        if "llm" in modes:
+            # One LLM pass over every section rather than one call per tool
+            sections = "\n\n".join(f"[{tool_name}: {query}]\n{result}" for (tool_name, query), result in zip(plan, results))
+            return self._enhance(user_query, sections, emit, cancel), "llm"
+        sections = [render_template(tool_name, result) if tool_mode == "template" else result.strip()
+                    for (tool_name, _), result, tool_mode in zip(plan, results, modes)]
+        return ("\n\n" + "─" * 50 + "\n\n").join(sections), "template" if "template" in modes else "direct"
+    
+    def run_query(self, user_query: str, mode: str = None, emit=None, cancel=None) -> dict:
+        """Process a query and return the answer with the tool(s), mode and timings used.
+
+        A compound question ("triage critical alerts and show FIM changes on
+        agent 003") is split into one sub-query per intent, and those tools
+        run concurrently before their outputs are merged.
+
+        ``emit``, when given, is called with progress events (tool selected,
+        Wazuh data fetched) and with each LLM token as it arrives, so a
+        caller can stream the answer instead of waiting for all of it.
+        ``cancel`` is an optional threading.Event; once set, the query stops
+        at the next checkpoint (before the tools, before or during the LLM
+        call) and the result comes back with ``cancelled`` set.
+        """
+        started = time.perf_counter()
+        tool_name = None
+        tool_ms = None
+        mode = mode if mode in RESPONSE_MODES else DEFAULT_RESPONSE_MODE
+        try:
+            # Handle approval requests
+            if user_query.lower().startswith('approve'):
+                content, mode = self._handle_approval(user_query), "direct"
+            else:
+                # Determine which tool(s) to use
+                self._check_cancel(cancel)
+                plan = plan_tools(user_query)
+                tool_name = ",".join(tool for tool, _ in plan)
+                if emit:
+                    emit({"type": "progress", "stage": "tool_selected", "tool": tool_name})
+                
+                # Tools of this query share one memo of Wazuh reads
+                results = self._run_tools(plan, WazuhRequestContext(self.wazuh))
+                
+                tool_ms = round((time.perf_counter() - started) * 1000, 1)
+                if emit:
+                    emit({"type": "progress", "stage": "data_fetched", "tool": tool_name, "elapsed_ms": tool_ms})
+                
+                content, mode = self._merge_results(user_query, plan, results, mode, emit, cancel)
             
+        except QueryCancelled:
+            return {"content": "Query cancelled.", "tool": tool_name, "mode": mode, "tool_ms": tool_ms,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1), "cancelled": True}
         except Exception as e:
-            return f"I encountered an error while processing your request: {str(e)}. Please try rephrasing your question or check if the Wazuh connection is working properly."
+            content = f"I encountered an error while processing your request: {str(e)}. Please try rephrasing your question or check if the Wazuh connection is working properly."
+        
+        elapsed = time.perf_counter() - started
+        self._record_latency(mode, elapsed)
+        return {"content": content, "tool": tool_name, "mode": mode, "tool_ms": tool_ms, "latency_ms": round(elapsed * 1000, 1)}
+    
+    def process_query(self, user_query: str, mode: str = None) -> str:
+        """Process user query through the appropriate tool, enhancing with the LLM only where it helps"""
+        return self.run_query(user_query, mode)["content"]
     
     def _handle_approval(self, query: str) -> str:
         """Handle approval requests for critical actions"""
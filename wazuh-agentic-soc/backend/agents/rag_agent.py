@@ -1,10 +1,7 @@
 from langchain_core.tools import tool
-from rag_system import RAGSystem
+from rag_system import get_rag_system
 import os
 
-# Initialize RAG system
-rag_system = RAGSystem()
-
 def rag_agent(query: str) -> str:
     """RAG Agent - Query knowledge base and generate responses"""
     try:
@@ -13,7 +10,7 @@ def rag_agent(query: str) -> str:
             return "Use the /upload endpoint to add documents to the knowledge base."
         
         # Query the RAG system
-        result = rag_system.query(query)
+        result = get_rag_system().query(query)
         
         response = f"🧠 Knowledge Base Query\n"
         response += "=" * 50 + "\n\n"
@@ -1,12 +1,15 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import ALERT_SUMMARY_FIELDS, get_wazuh_client
 from datetime import datetime, timedelta
 import re
 
-def reporting_agent(query: str) -> str:
+# Alerts analysed per report; totals still come from total_affected_items
+REPORT_ALERT_LIMIT = 2000
+
+def reporting_agent(query: str, wazuh=None) -> str:
     """Reporting and Visualization Agent - Generates compliance and security reports"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         query_lower = query.lower()
         
         result = "📊 Security Report Generation\n"
@@ -21,27 +24,33 @@ def reporting_agent(query: str) -> str:
         elif 'threat' in query_lower or 'security' in query_lower:
             report_type = 'threat'
         
-        # Gather data
-        agents_data = wazuh.get_agents()
-        agents = agents_data.get('data', {}).get('affected_items', [])
-        active_agents = sum(1 for agent in agents if agent.get('status') == 'active')
+        # Gather data - the reads are independent, so fetch them concurrently
+        data = wazuh.fetch_many({
+            "agents": ("get_agents", {"limit": 1, "fields": ["status"]}),
+            "active_agents": ("get_agents", {"limit": 1, "status": "active", "fields": ["status"]}),
+            # Newest first, like poll_alerts, so triage in the same query can reuse this read
+            "alerts": ("iter_alerts", {"severity_min": 5, "sort": "-timestamp", "fields": ALERT_SUMMARY_FIELDS,
+                                       "max_items": REPORT_ALERT_LIMIT, "prefetch": True}),
+            "sca": "get_sca_checks",
+        })
+        # Only the counts are reported, so total_affected_items is enough
+        total_agents = data['agents'].get('data', {}).get('total_affected_items', 0)
+        active_agents = data['active_agents'].get('data', {}).get('total_affected_items', 0)
         
-        alerts_data = wazuh.get_alerts(limit=100, severity_min=5)
-        alerts = alerts_data.get('data', {}).get('affected_items', [])
+        alerts = data['alerts'].get('data', {}).get('affected_items', [])
+        total_alerts = data['alerts'].get('data', {}).get('total_affected_items', len(alerts))
         critical_alerts = [a for a in alerts if a.get('rule', {}).get('level', 0) >= 10]
         high_alerts = [a for a in alerts if 7 <= a.get('rule', {}).get('level', 0) < 10]
         
-        # Get SCA compliance
-        sca_data = wazuh.get_sca_checks()
-        sca_items = sca_data.get('data', {}).get('affected_items', [])
+        sca_items = data['sca'].get('data', {}).get('affected_items', [])
         
         # Generate report based on type
         if report_type == 'executive':
             result += f"📈 Executive Summary Report\n"
             result += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
             result += f"🎯 Key Metrics:\n"
-            result += f"- Total Agents: {len(agents)}\n"
-            result += f"- Active Agents: {active_agents} ({active_agents/len(agents)*100 if agents else 0:.1f}%)\n"
+            result += f"- Total Agents: {total_agents}\n"
+            result += f"- Active Agents: {active_agents} ({active_agents/total_agents*100 if total_agents else 0:.1f}%)\n"
             result += f"- Critical Alerts (24h): {len(critical_alerts)}\n"
             result += f"- High Severity Alerts (24h): {len(high_alerts)}\n"
             result += f"- Compliance Score: {len(sca_items)} checks completed\n\n"
@@ -57,8 +66,8 @@ def reporting_agent(query: str) -> str:
             result += f"\n📋 Recommendations:\n"
             if len(critical_alerts) > 0:
                 result += f"- Investigate critical alerts immediately\n"
-            if active_agents < len(agents) * 0.9:
-                result += f"- {len(agents) - active_agents} agents offline - review connectivity\n"
+            if active_agents < total_agents * 0.9:
+                result += f"- {total_agents - active_agents} agents offline - review connectivity\n"
             result += f"- Continue monitoring and threat hunting\n"
         
         elif report_type == 'compliance':
@@ -98,7 +107,7 @@ def reporting_agent(query: str) -> str:
             result += f"🚨 Threat Summary:\n"
             result += f"- Critical Threats: {len(critical_alerts)}\n"
             result += f"- High Severity Threats: {len(high_alerts)}\n"
-            result += f"- Total Security Events: {len(alerts)}\n\n"
+            result += f"- Total Security Events: {total_alerts}\n\n"
             
             # Threat categorization
             threat_types = {
@@ -133,14 +142,14 @@ def reporting_agent(query: str) -> str:
             result += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
             
             result += f"📊 System Overview:\n"
-            result += f"- Total Agents: {len(agents)}\n"
+            result += f"- Total Agents: {total_agents}\n"
             result += f"- Active Agents: {active_agents}\n"
-            result += f"- Inactive Agents: {len(agents) - active_agents}\n\n"
+            result += f"- Inactive Agents: {total_agents - active_agents}\n\n"
             
             result += f"🚨 Alert Summary:\n"
             result += f"- Critical Alerts: {len(critical_alerts)}\n"
             result += f"- High Alerts: {len(high_alerts)}\n"
-            result += f"- Total Alerts: {len(alerts)}\n\n"
+            result += f"- Total Alerts: {total_alerts}\n\n"
             
             result += f"🔒 Compliance Status:\n"
             if sca_items:
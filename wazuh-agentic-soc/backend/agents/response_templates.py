@@ -0,0 +1,25 @@
+"""Local renderers used instead of the LLM enhancement call for tools whose
+output already answers the question"""
+
+# Title and follow-up hint per tool for the "template" response mode; tools whose
+# report already opens with its own heading have no title
+TEMPLATES = {
+    "alerts": ("🚨 Wazuh Alerts", "Ask to triage these alerts for MITRE ATT&CK mapping and correlation."),
+    "rules": ("📜 Wazuh Rules", "Ask to create or modify a rule if none of these fit."),
+    "agents": ("🖥️ Agent Status", "Ask about a specific agent ID for FIM, SCA or log details."),
+    "fim": (None, "Ask for FIM events of a specific agent to narrow this down."),
+    "sca": (None, "Ask for an SCA scan of a specific agent to see failed checks."),
+    "log_analysis": (None, "Ask to search logs for a specific IP, user or agent."),
+    "reporting": (None, "Ask for a daily, weekly or compliance report for another view."),
+}
+
+
+def render_template(tool_name: str, result: str) -> str:
+    """Wrap a tool's text report in a short header and follow-up hint"""
+    title, hint = TEMPLATES.get(tool_name, (None, None))
+    body = result.strip()
+    if title:
+        body = f"{title}\n\n{body}"
+    if hint:
+        body += f"\n\n💡 {hint}"
+    return body
@@ -1,10 +1,10 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 
-def fetch_rules(query: str) -> str:
+def fetch_rules(query: str, wazuh=None) -> str:
     """Fetch and search Wazuh rules based on natural language query"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         rules = wazuh.get_rules()
         
         if rules.get('error', 0) != 0:
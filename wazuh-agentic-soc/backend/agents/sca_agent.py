@@ -1,11 +1,11 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 import re
 
-def sca_agent(query: str) -> str:
+def sca_agent(query: str, wazuh=None) -> str:
     """Security Configuration Assessment Agent - CIS/NIST compliance checks"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         query_lower = query.lower()
         
         result = "🔒 Security Configuration Assessment (SCA) Report\n"
@@ -1,5 +1,5 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 import requests
 import re
 
@@ -49,10 +49,10 @@ def check_virustotal_hash(file_hash: str) -> dict:
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
-def threat_intelligence_agent(query: str) -> str:
+def threat_intelligence_agent(query: str, wazuh=None) -> str:
     """Threat Intelligence Integrator Agent - Pulls external feeds and updates rules"""
     try:
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         query_lower = query.lower()
         
         # Extract IP addresses
@@ -1,5 +1,5 @@
 from langchain_core.tools import tool
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_client import get_wazuh_client
 import re
 import os
 
@@ -64,11 +64,11 @@ GROUPS: [group1, group2]
             'groups': ['custom']
         }
 
-def xml_editor_agent(query: str, llm) -> str:
+def xml_editor_agent(query: str, llm, wazuh=None) -> str:
     """XML Editor Agent - Creates/modifies Wazuh rules and decoders"""
     try:
         query_lower = query.lower()
-        wazuh = WazuhClient()
+        wazuh = wazuh or get_wazuh_client()
         
         # Detect intent
         if any(word in query_lower for word in ['add', 'create', 'new', 'generate']):
@@ -0,0 +1,127 @@
+"""
+One upstream alert poller fanned out to every live dashboard.
+
+Instead of each open tab polling /api/stats and /api/wazuh/alerts on its
+own, a single background task polls Wazuh incrementally (poll_alerts) and
+pushes only what changed to the clients subscribed over /ws/alerts, so
+manager load stays flat however many browsers are open.
+"""
+import asyncio
+import os
+import time
+
+from api.stats import collect_stats
+from integrations.wazuh_async_client import get_async_wazuh_client
+
+ALERT_WATCH_INTERVAL = float(os.getenv("ALERT_WATCH_INTERVAL", "10"))
+# Alerts (level 5+, newest first) kept for the alerts page and new subscribers
+ALERT_WATCH_WINDOW = int(os.getenv("ALERT_WATCH_WINDOW", "100"))
+# Messages buffered per subscriber before it counts as stalled and is resynced
+SUBSCRIBER_BUFFER = 64
+
+
+class AlertWatcher:
+    """Polls while anyone is subscribed and broadcasts deltas.
+
+    Subscribers get a ``snapshot`` (current alerts and stats) first, then
+    ``alerts`` messages carrying only alerts not sent before and ``stats``
+    messages when the dashboard counters change. A subscriber too slow to
+    keep up has its backlog replaced by a fresh snapshot.
+    """
+
+    def __init__(self, interval=ALERT_WATCH_INTERVAL, window_size=ALERT_WATCH_WINDOW, client_factory=get_async_wazuh_client):
+        self.interval = interval
+        self.window_size = window_size
+        self.client_factory = client_factory
+        self.subscribers = set()
+        self.alerts = []
+        self.total_alerts = 0
+        self.dashboard_stats = None
+        self._seen = set()
+        self._task = None
+        self.polls = 0
+        self.broadcasts = 0
+        self.resyncs = 0
+        self.last_poll_ms = None
+
+    def subscribe(self):
+        """Queue of messages for one client; starts the poller for the first one"""
+        queue = asyncio.Queue(SUBSCRIBER_BUFFER)
+        if self.dashboard_stats is not None:
+            queue.put_nowait(self._snapshot())
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        """Forget a client; with nobody left listening, stop polling Wazuh"""
+        self.subscribers.discard(queue)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"Alert watcher poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def poll_once(self):
+        """One incremental poll; broadcasts whatever changed since the last one"""
+        client = self.client_factory()
+        started = time.perf_counter()
+        feed, stats = await asyncio.gather(
+            client.poll_alerts(severity_min=5, window_size=self.window_size),
+            collect_stats(client),
+        )
+        self.polls += 1
+        self.last_poll_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        primed = self.dashboard_stats is not None
+        fresh = []
+        if not feed.get('error'):
+            data = feed.get('data', {})
+            self.alerts = data.get('affected_items', [])
+            self.total_alerts = data.get('total_affected_items', len(self.alerts))
+            fresh = [alert for alert in self.alerts if alert.get('id') not in self._seen]
+            self._seen = {alert.get('id') for alert in self.alerts}
+        stats_changed = stats != self.dashboard_stats
+        self.dashboard_stats = stats
+
+        if not primed:
+            self._broadcast(self._snapshot())
+            return
+        if fresh:
+            self._broadcast({"type": "alerts", "new": fresh, "total": self.total_alerts, "window": self.window_size})
+        if stats_changed:
+            self._broadcast({"type": "stats", "stats": stats})
+
+    def _snapshot(self):
+        return {"type": "snapshot", "alerts": self.alerts, "total": self.total_alerts, "window": self.window_size,
+                "stats": self.dashboard_stats}
+
+    def _broadcast(self, message):
+        self.broadcasts += 1
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind for deltas to help; start it over from current state
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot())
+                self.resyncs += 1
+
+    def stats(self):
+        return {
+            "subscribers": len(self.subscribers),
+            "running": self._task is not None and not self._task.done(),
+            "interval_s": self.interval,
+            "polls": self.polls,
+            "broadcasts": self.broadcasts,
+            "resyncs": self.resyncs,
+            "last_poll_ms": self.last_poll_ms,
+        }
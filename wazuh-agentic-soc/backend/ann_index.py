@@ -0,0 +1,165 @@
+"""
+FAISS index types for the knowledge base.
+
+    flat      exact search (IndexFlatL2); cost grows linearly with the corpus
+    ivf_flat  k-means cells with inverted lists; a query scans RAG_NPROBE cells
+    ivf_pq    IVF over product-quantized codes (RAG_PQ_M bytes per chunk instead of dim * 4)
+    hnsw      navigable small-world graph; a query explores RAG_EF_SEARCH candidates
+
+Approximate types only pay off on large corpora (and IVF needs enough rows
+to train its cells), so below RAG_ANN_THRESHOLD chunks the exact index is
+used whatever RAG_INDEX_TYPE says.
+
+A trained index is opened memory-mapped from its snapshot and never
+modified; rows appended after it are searched exactly over the mapped
+vectors file (MappedIndex) until the next rebuild.
+"""
+import math
+import os
+
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+RAG_INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "hnsw")
+RAG_ANN_THRESHOLD = int(os.getenv("RAG_ANN_THRESHOLD", "20000"))
+# Recall/speed knobs: more cells probed / candidates explored = better recall, slower queries
+RAG_NPROBE = int(os.getenv("RAG_NPROBE", "16"))
+RAG_EF_SEARCH = int(os.getenv("RAG_EF_SEARCH", "64"))
+# Build parameters; 0 picks a default from the corpus size / dimension
+RAG_IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", "0"))
+RAG_PQ_M = int(os.getenv("RAG_PQ_M", "0"))
+RAG_HNSW_M = int(os.getenv("RAG_HNSW_M", "32"))
+
+
+def ivf_nlist(rows: int) -> int:
+    """About 4 * sqrt(rows) cells, with at least 39 training points per cell as FAISS recommends"""
+    if RAG_IVF_NLIST:
+        return RAG_IVF_NLIST
+    return max(1, min(int(4 * math.sqrt(rows)), rows // 39))
+
+
+def pq_m(dim: int) -> int:
+    """Sub-quantizers for IVF-PQ: RAG_PQ_M, else the largest divisor of dim up to dim // 8"""
+    if RAG_PQ_M:
+        return RAG_PQ_M
+    return next(m for m in range(max(1, dim // 8), 0, -1) if dim % m == 0)
+
+
+def pq_nbits(rows: int) -> int:
+    """Bits per PQ code: 8 (256 centroids per sub-quantizer) once there are 39 training rows per centroid"""
+    return max(4, min(8, int(math.log2(max(rows // 39, 1)))))
+
+
+def factory_string(kind: str, rows: int, dim: int) -> str:
+    if kind == "flat":
+        return "Flat"
+    if kind == "ivf_flat":
+        return f"IVF{ivf_nlist(rows)},Flat"
+    if kind == "ivf_pq":
+        return f"IVF{ivf_nlist(rows)},PQ{pq_m(dim)}x{pq_nbits(rows)}"
+    if kind == "hnsw":
+        return f"HNSW{RAG_HNSW_M}"
+    raise ValueError(f"Unknown RAG_INDEX_TYPE {kind!r}; choose from {', '.join(INDEX_TYPES)}")
+
+
+def effective_kind(kind: str, rows: int, threshold: int = None) -> str:
+    """The index type to build for ``rows`` chunks: flat until the corpus passes RAG_ANN_THRESHOLD"""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown RAG_INDEX_TYPE {kind!r}; choose from {', '.join(INDEX_TYPES)}")
+    threshold = RAG_ANN_THRESHOLD if threshold is None else threshold
+    return kind if rows >= threshold else "flat"
+
+
+def build_index(kind: str, vectors, dim: int):
+    """Train (if needed) and fill an index of ``kind`` with ``vectors``"""
+    import faiss
+    index = faiss.index_factory(dim, factory_string(kind, len(vectors), dim))
+    if not index.is_trained:
+        index.train(vectors)
+    if len(vectors):
+        index.add(vectors)
+    set_search_params(index)
+    return index
+
+
+def set_search_params(index, nprobe: int = None, ef_search: int = None):
+    """Apply the recall/speed knobs that exist for this index type"""
+    import faiss
+    try:
+        faiss.extract_index_ivf(index).nprobe = nprobe or RAG_NPROBE
+    except RuntimeError:
+        pass  # Not an IVF index
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search or RAG_EF_SEARCH
+
+
+def open_index(path: str, kind: str):
+    """Read an index snapshot without copying its vectors into the process, if FAISS can"""
+    import faiss
+    # HNSW keeps its vectors in flat storage (zero-copy with MMAP_IFC); IVF maps its inverted lists
+    flags = faiss.IO_FLAG_MMAP_IFC if kind == "hnsw" else faiss.IO_FLAG_MMAP
+    try:
+        return faiss.read_index(path, flags)
+    except RuntimeError as e:
+        print(f"Could not memory-map {path} ({e}); reading it into memory")
+        return faiss.read_index(path)
+
+
+def index_kind(index) -> str:
+    import faiss
+    if hasattr(index, "hnsw"):
+        return "hnsw"
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return "flat"
+    return "ivf_pq" if isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ) else "ivf_flat"
+
+
+class MappedIndex:
+    """Search over memory-mapped vectors: a read-only approximate index covering the first
+    ``ann_rows`` rows (None for exact search only) plus exact search over the rows after it.
+
+    Instances are never modified; an upload or rebuild swaps in a new one.
+    """
+
+    def __init__(self, vectors, ann=None, ann_rows: int = 0):
+        self.vectors = vectors
+        self.ann = ann
+        self.ann_rows = ann_rows if ann is not None else 0
+
+    @property
+    def ntotal(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def kind(self) -> str:
+        return index_kind(self.ann) if self.ann is not None else "flat"
+
+    @property
+    def tail_rows(self) -> int:
+        """Rows answered by exact search"""
+        return len(self.vectors) - self.ann_rows
+
+    def with_vectors(self, vectors) -> "MappedIndex":
+        return MappedIndex(vectors, self.ann, self.ann_rows)
+
+    def search(self, queries, k: int):
+        """(distances, ids) like faiss Index.search, padded with -1 when there are fewer than k rows"""
+        import faiss
+        results = []
+        if self.ann is not None:
+            results.append(self.ann.search(queries, k))
+        if self.tail_rows:
+            distances, ids = faiss.knn(queries, self.vectors[self.ann_rows:], k)
+            results.append((distances, np.where(ids >= 0, ids + self.ann_rows, -1)))
+        if not results:
+            return (np.full((len(queries), k), np.finfo(np.float32).max, dtype=np.float32),
+                    np.full((len(queries), k), -1, dtype=np.int64))
+        if len(results) == 1:
+            return results[0]
+        distances = np.hstack([d for d, _ in results])
+        ids = np.hstack([i for _, i in results])
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, 1), np.take_along_axis(ids, order, 1)
@@ -1,6 +1,5 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from agents.dashboard_agent import dashboard_agent
 import json
 
 router = APIRouter()
@@ -14,6 +13,8 @@ class UIEvent(BaseModel):
 async def handle_ui_event(event: UIEvent):
     """Handle UI events and return execution plan"""
     try:
+        # Imported on first click: the agent module pulls in langchain_core
+        from agents.dashboard_agent import dashboard_agent
         result = dashboard_agent(event.dict())
         return result
     except Exception as e:
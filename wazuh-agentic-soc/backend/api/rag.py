@@ -1,12 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
 from typing import List
-from rag_system import RAGSystem
+from rag_system import get_rag_system
 from pydantic import BaseModel
 import os
 
 router = APIRouter()
-rag_system = RAGSystem()
 
 class Query(BaseModel):
     question: str
@@ -30,7 +29,7 @@ async def upload_documents(files: List[UploadFile] = File(...)):
             if file.filename.endswith('.txt'):
                 with open(file_path, 'r', encoding='utf-8') as f:
                     text = f.read()
-                rag_system.add_text_chunks(text)
+                get_rag_system().add_text_chunks(text)
             
             uploaded_files.append(file.filename)
         
@@ -48,7 +47,7 @@ async def upload_documents(files: List[UploadFile] = File(...)):
 async def query_knowledge_base(query: Query):
     """Query the RAG knowledge base"""
     try:
-        result = rag_system.query(query.question)
+        result = get_rag_system().query(query.question)
         return JSONResponse(
             content=result,
             status_code=200
@@ -59,8 +58,10 @@ async def query_knowledge_base(query: Query):
 @router.get("/status")
 async def rag_status():
     """Get RAG system status"""
+    rag_system = get_rag_system()
     return {
         "documents_count": len(rag_system.texts),
-        "gemini_configured": rag_system.llm is not None,
-        "index_ready": rag_system.index is not None
+        "gemini_configured": rag_system.gemini_configured,
+        "index_ready": rag_system.index is not None,
+        "index": rag_system.index_info()
     }
\ No newline at end of file
@@ -1,32 +1,36 @@
 from fastapi import APIRouter
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_async_client import get_async_wazuh_client
+from integrations.wazuh_client import ALERT_SUMMARY_FIELDS
 
 router = APIRouter()
 
-@router.get("/stats")
-async def get_dashboard_stats():
-    """Get real-time dashboard statistics"""
+async def collect_stats(client=None):
+    """Dashboard counters and the latest critical alerts, as served by /api/stats"""
     try:
-        client = WazuhClient()
+        client = client or get_async_wazuh_client()
         
-        # Get agents
-        agents_data = client.get_agents()
-        agents = agents_data.get('data', {}).get('affected_items', [])
-        active_agents = sum(1 for agent in agents if agent.get('status') == 'active')
+        # Agents, alerts and rules are independent, so fetch them concurrently
+        # Counts come from total_affected_items (limit=1), so no collection is listed in full;
+        # alerts are polled incrementally, so each refresh only pulls what is new
+        results = await client.fetch_many({
+            "agents": ("get_agents", {"limit": 1, "fields": ["status"]}),
+            "active_agents": ("get_agents", {"limit": 1, "status": "active", "fields": ["status"]}),
+            "alerts": ("poll_alerts", {"window_size": 100, "severity_min": 7, "fields": ALERT_SUMMARY_FIELDS}),
+            "rules": ("get_rules", {"limit": 1}),
+        })
         
-        # Get alerts
-        alerts_data = client.get_alerts(limit=100, severity_min=7)
-        alerts = alerts_data.get('data', {}).get('affected_items', [])
-        critical_alerts = len(alerts)
+        total_agents = results['agents'].get('data', {}).get('total_affected_items', 0)
+        active_agents = results['active_agents'].get('data', {}).get('total_affected_items', 0)
         
-        # Get rules
-        rules_data = client.get_rules()
-        rules = rules_data.get('data', {}).get('affected_items', [])
-        total_rules = len(rules)
+        alerts_data = results['alerts'].get('data', {})
+        alerts = alerts_data.get('affected_items', [])
+        critical_alerts = alerts_data.get('total_affected_items', len(alerts))
+        
+        total_rules = results['rules'].get('data', {}).get('total_affected_items', 0)
         
         return {
             "active_agents": active_agents,
-            "total_agents": len(agents),
+            "total_agents": total_agents,
             "critical_alerts": critical_alerts,
             "total_rules": total_rules,
             "recent_alerts": alerts[:5],
@@ -41,4 +45,9 @@ async def get_dashboard_stats():
             "recent_alerts": [],
             "connection_status": "disconnected",
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+@router.get("/stats")
+async def get_dashboard_stats():
+    """Get real-time dashboard statistics"""
+    return await collect_stats()
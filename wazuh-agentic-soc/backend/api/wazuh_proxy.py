@@ -1,15 +1,15 @@
 from fastapi import APIRouter, HTTPException
-from integrations.wazuh_client import WazuhClient
+from integrations.wazuh_async_client import get_async_wazuh_client
 import requests
 
 router = APIRouter()
 
 @router.get("/alerts")
-async def proxy_alerts(limit: int = 100, sort: str = None, q: str = None):
+async def proxy_alerts(limit: int = 100, sort: str = None, q: str = None, select: str = None):
     """Proxy alerts endpoint to Wazuh"""
     try:
-        client = WazuhClient()
-        if not client.token:
+        client = get_async_wazuh_client()
+        if not await client.get_token():
             raise HTTPException(status_code=401, detail="Wazuh authentication failed")
         
         # Build query parameters
@@ -18,8 +18,10 @@ async def proxy_alerts(limit: int = 100, sort: str = None, q: str = None):
             query_params["sort"] = sort
         if q:
             query_params["q"] = q
+        if select:
+            query_params["fields"] = select.split(",")
             
-        alerts = client.get_alerts(**query_params)
+        alerts = await client.get_alerts(**query_params)
         return alerts
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -28,11 +30,11 @@ async def proxy_alerts(limit: int = 100, sort: str = None, q: str = None):
 async def proxy_agents(limit: int = 200):
     """Proxy agents endpoint to Wazuh"""
     try:
-        client = WazuhClient()
-        if not client.token:
+        client = get_async_wazuh_client()
+        if not await client.get_token():
             raise HTTPException(status_code=401, detail="Wazuh authentication failed")
             
-        agents = client.get_agents()
+        agents = await client.get_agents(limit=limit)
         return agents
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -41,11 +43,18 @@ async def proxy_agents(limit: int = 200):
 async def proxy_rules(limit: int = 200, offset: int = 0):
     """Proxy rules endpoint to Wazuh"""
     try:
-        client = WazuhClient()
-        if not client.token:
+        client = get_async_wazuh_client()
+        if not await client.get_token():
             raise HTTPException(status_code=401, detail="Wazuh authentication failed")
             
-        rules = client.get_rules()
+        rules = await client.get_rules(limit=limit, offset=offset)
         return rules
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/cache/invalidate")
+async def invalidate_cache(prefix: str = None):
+    """Drop cached Wazuh responses, e.g. prefix=/rules after editing rules"""
+    client = get_async_wazuh_client()
+    dropped = client.invalidate_cache(prefix)
+    return {"invalidated": dropped, "cache": client.cache_stats()}
\ No newline at end of file
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark the approximate index types in ann_index.py against the exact
+flat index: build time, query latency and recall@10 (share of the flat
+top 10 the approximate index also returns) at several nprobe / efSearch
+settings, on tens of thousands of ngram-embedded SOC chunks
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+import ann_index
+from rag_system import make_embeddings
+
+CHUNKS = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+QUERIES = 500
+K = 10
+NPROBES = (1, 4, 16, 64)
+EF_SEARCHES = (16, 64, 256)
+
+HOSTS = ["web", "db", "mail", "vpn", "dc", "build", "k8s-node", "jump", "backup", "proxy"]
+EVENTS = [
+    "failed ssh password for {user} from {ip}",
+    "sudo to root by {user} on {host}",
+    "new suid binary /usr/local/bin/{proc} on {host}",
+    "outbound transfer of {size} MB from {host} to {ip}",
+    "process {proc} connected to mining pool {ip}:3333",
+    "integrity checksum changed for /etc/{file} on {host}",
+    "union select in request to /{path} from {ip}",
+    "rootcheck hidden process {proc} on {host}",
+    "windows logon failure 4625 for {user} from {ip}",
+    "dns query with long random subdomain from {host} by {proc}",
+    "wazuh agent {host} disconnected from manager",
+    "CVE-2024-{cve} affects package {proc} on {host}",
+]
+USERS = ["root", "admin", "svc_backup", "jdoe", "asmith", "deploy", "postgres", "www-data"]
+PROCS = ["xmrig", "nc", "python3", "curl", "powershell", "sshd", "nginx", "openssl", "kworker", "bash"]
+FILES = ["passwd", "shadow", "sudoers", "crontab", "hosts", "ssh/sshd_config"]
+PATHS = ["login", "search", "api/v1/users", "admin", "products", "cart"]
+
+
+def synthetic_chunks(n, seed):
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(n):
+        event = rng.choice(EVENTS).format(
+            user=rng.choice(USERS), host=f"{rng.choice(HOSTS)}-{rng.randrange(40):02d}",
+            ip=f"203.0.113.{rng.randrange(256)}", proc=rng.choice(PROCS), file=rng.choice(FILES),
+            path=rng.choice(PATHS), size=rng.randrange(1, 5000), cve=rng.randrange(1000, 9999))
+        chunks.append(f"Alert {i}: {event}. Rule level {rng.randrange(3, 16)}, triaged by tier {rng.randrange(1, 4)}.")
+    return chunks
+
+
+def timed_search(index, queries):
+    started = time.perf_counter()
+    _, ids = index.search(queries, K)
+    return ids, (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def recall(ids, truth):
+    return np.mean([len(set(row) & set(expected)) / K for row, expected in zip(ids, truth)])
+
+
+def run_benchmark():
+    embeddings = make_embeddings("ngram")
+    vectors = embeddings.embed_batch(synthetic_chunks(CHUNKS, seed=1))
+    queries = embeddings.embed_batch(synthetic_chunks(QUERIES, seed=2))
+    print(f"🧭 {CHUNKS:,} chunks x dim {embeddings.dim}, {QUERIES} queries; recall@{K} against the flat index")
+
+    for kind in ann_index.INDEX_TYPES:
+        started = time.perf_counter()
+        index = ann_index.build_index(kind, vectors, embeddings.dim)
+        build_s = time.perf_counter() - started
+        label = f"{kind} ({ann_index.factory_string(kind, CHUNKS, embeddings.dim)})"
+        if kind == "flat":
+            truth, us = timed_search(index, queries)
+            print(f"- {label:<24} build {build_s:6.2f} s | {us:8.1f} µs/query | recall 100.0%")
+            continue
+        knob, values = ("nprobe", NPROBES) if kind.startswith("ivf") else ("efSearch", EF_SEARCHES)
+        for value in values:
+            ann_index.set_search_params(index, nprobe=value, ef_search=value)
+            ids, query_us = timed_search(index, queries)
+            print(f"- {label:<24} build {build_s:6.2f} s | {knob} {value:<3} {query_us:8.1f} µs/query | "
+                  f"recall {recall(ids, truth):6.1%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark RAG ingestion embedding: the old per-byte SHA-256 vector fill
+plus list round trip vs SimpleHashEmbeddings.embed_batch, on 100k chunks
+"""
+import hashlib
+import time
+
+import numpy as np
+
+from rag_system import SimpleHashEmbeddings
+
+CHUNKS = 100_000
+DIM = 256
+
+
+def legacy_text_to_vector(text, dim=DIM):
+    """The pre-batch _text_to_vector: one Python assignment per output byte"""
+    out = np.zeros(dim, dtype=np.float32)
+    i = 0
+    counter = 0
+    while i < dim:
+        m = hashlib.sha256()
+        m.update(text.encode("utf-8"))
+        m.update(counter.to_bytes(4, "little", signed=False))
+        for b in m.digest():
+            if i >= dim:
+                break
+            out[i] = (b - 128) / 128.0
+            i += 1
+        counter += 1
+    norm = np.linalg.norm(out)
+    if norm > 0:
+        out = out / norm
+    return out
+
+
+def legacy_ingest(texts):
+    """embed_documents -> lists -> np.array, as add_documents used to do"""
+    vectors = [legacy_text_to_vector(t).tolist() for t in texts]
+    return np.array(vectors).astype("float32")
+
+
+def run_benchmark():
+    embeddings = SimpleHashEmbeddings(dim=DIM)
+    chunks = [f"Runbook step {i}: isolate host {i % 250}, collect memory image, rotate credentials. " * (1 + i % 4)
+              for i in range(CHUNKS)]
+
+    print(f"🧮 Embedding {CHUNKS:,} chunks at dim {DIM}")
+    started = time.perf_counter()
+    legacy = legacy_ingest(chunks)
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = embeddings.embed_batch(chunks)
+    batch_s = time.perf_counter() - started
+
+    print(f"- per-byte loop + list round trip {legacy_s:7.2f} s ({CHUNKS / legacy_s:9,.0f} chunks/s)")
+    print(f"- embed_batch                     {batch_s:7.2f} s ({CHUNKS / batch_s:9,.0f} chunks/s)  x{legacy_s / batch_s:.1f}")
+    print(f"🎯 Identical vectors: {np.array_equal(legacy, batch)} | dtype {batch.dtype}, "
+          f"C-contiguous {batch.flags['C_CONTIGUOUS']}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark knowledge-base ingest as the corpus grows: the old full
+index.faiss + meta.pkl rewrite per upload vs the append-only VectorStore
+used by RAGSystem.add_documents (compaction included)
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+from rag_system import RAGSystem, make_embeddings
+
+BATCH = 50
+TOTAL = 20_000
+REPORT_AT = (1_000, 5_000, 10_000, 20_000)
+
+
+def chunks(start, n):
+    return [f"Incident {i}: beaconing from host {i % 300} to 203.0.113.{i % 250}, contained and reimaged." for i in range(start, start + n)]
+
+
+def legacy_ingest(directory, embeddings):
+    """add_documents before the append-only store: embed, add, rewrite everything"""
+    import faiss
+    index = faiss.IndexFlatL2(embeddings.dim)
+    texts = []
+
+    def add(batch):
+        index.add(embeddings.embed_batch(batch))
+        texts.extend(batch)
+        faiss.write_index(index, os.path.join(directory, "index.faiss"))
+        with open(os.path.join(directory, "meta.pkl"), "wb") as f:
+            pickle.dump(texts, f)
+    return add
+
+
+def append_ingest(directory, embeddings):
+    # Exact index only: an approximate-index rebuild in the background would skew the timings
+    return RAGSystem(directory, embeddings=embeddings, index_type="flat").add_documents
+
+
+def measure(name, make_add, embeddings):
+    directory = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        add = make_add(directory, embeddings)
+        timings = {}
+        window = []
+        for start in range(0, TOTAL, BATCH):
+            batch = chunks(start, BATCH)
+            started = time.perf_counter()
+            add(batch)
+            window.append(time.perf_counter() - started)
+            done = start + BATCH
+            if done in REPORT_AT:
+                # Average since the previous report point, so compactions are amortized in
+                timings[done] = sum(window) / len(window) / BATCH * 1e6
+                window = []
+        print(f"- {name:<22}" + " | ".join(f"{size:>6,}: {us:7.1f} µs/chunk" for size, us in timings.items()))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_benchmark():
+    # The cheap hasher keeps embedding time out of the comparison
+    embeddings = make_embeddings("hash")
+    print(f"💾 Ingesting {TOTAL:,} chunks in uploads of {BATCH}; per-chunk cost at each corpus size")
+    measure("full rewrite (before)", legacy_ingest, embeddings)
+    measure("append-only store", append_ingest, embeddings)
+
+
+if __name__ == "__main__":
+    run_benchmark()
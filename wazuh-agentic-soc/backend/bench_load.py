@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark knowledge-base startup as the corpus grows: reading the whole
+FAISS index and unpickling every chunk (before) vs opening the
+memory-mapped VectorStore. Each load runs in a fresh process and reports
+time to the first answered query plus private memory (RssAnon, not
+shared between workers) and file-backed memory (RssFile, shared through
+the page cache)
+"""
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from rag_system import make_embeddings
+from vector_store import VectorStore
+
+SIZES = (10_000, 100_000, 300_000)
+
+PROBE = r"""
+import sys, time
+started = time.perf_counter()
+directory, mode = sys.argv[1], sys.argv[2]
+if mode == "legacy":
+    import pickle, faiss
+    from rag_system import make_embeddings
+    index = faiss.read_index(directory + "/index.faiss")
+    with open(directory + "/meta.pkl", "rb") as f:
+        texts = pickle.load(f)
+    _, ids = index.search(make_embeddings("hash").embed_batch(["beaconing host 7"]), 4)
+    answer = [texts[i] for i in ids[0]]
+else:
+    from rag_system import RAGSystem, make_embeddings
+    rag = RAGSystem(directory, embeddings=make_embeddings("hash"), index_type="flat")
+    answer = rag.query("beaconing host 7")["sources"]
+elapsed = time.perf_counter() - started
+status = dict(line.split(":", 1) for line in open("/proc/self/status"))
+print(elapsed, int(status["RssAnon"].split()[0]) // 1024, int(status["RssFile"].split()[0]) // 1024)
+"""
+
+
+def build_stores(directory, size, embeddings):
+    texts = [f"Incident {i}: beaconing from host {i % 300} to 203.0.113.{i % 250}, contained and reimaged." for i in range(size)]
+    vectors = embeddings.embed_batch(texts)
+    legacy = os.path.join(directory, "legacy")
+    os.makedirs(legacy)
+    import faiss
+    index = faiss.IndexFlatL2(embeddings.dim)
+    index.add(vectors)
+    faiss.write_index(index, os.path.join(legacy, "index.faiss"))
+    with open(os.path.join(legacy, "meta.pkl"), "wb") as f:
+        pickle.dump(texts, f)
+    mapped = os.path.join(directory, "mapped")
+    VectorStore(mapped).rewrite(vectors, texts, {"backend": embeddings.name, "dim": embeddings.dim})
+    return legacy, mapped
+
+
+def probe(directory, mode):
+    out = subprocess.run([sys.executable, "-c", PROBE, directory, mode], capture_output=True, text=True,
+                         check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    return float(out[-3]) * 1000, int(out[-2]), int(out[-1])
+
+
+def run_benchmark():
+    if not os.path.exists("/proc/self/status"):
+        sys.exit("bench_load.py reads memory figures from /proc and needs Linux")
+    embeddings = make_embeddings("hash")
+    print(f"🗂️  Startup to first query, fresh process per load ({embeddings.name} embeddings, dim {embeddings.dim})")
+    for size in SIZES:
+        directory = tempfile.mkdtemp(prefix="bench_load_")
+        try:
+            legacy, mapped = build_stores(directory, size, embeddings)
+            for name, path, mode in (("read + unpickle", legacy, "legacy"), ("memory-mapped", mapped, "mapped")):
+                probe(path, mode)  # Warm the page cache so both modes read from memory
+                ms, anon, shared = probe(path, mode)
+                print(f"- {size:>7,} chunks {name:<16} {ms:7.0f} ms | private {anon:5} MB | page cache {shared:5} MB")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Benchmark RAG retrieval: quality (recall@1, recall@4, MRR) and embedding
+throughput for each embedding backend in rag_system.EMBEDDING_BACKENDS.
+
+Every chunk of local SOC text goes into one index, so each question
+competes with all of it:
+- labelled runbooks (below), asked with paraphrased analyst questions
+- the Wazuh ruleset under WAZUH_RULESET_DIR (default /var/ossec/ruleset on
+  a manager): each rule's description asks for that rule, decoders are
+  distractors
+- MITRE ATT&CK techniques from MITRE_ATTACK_JSON (enterprise-attack.json):
+  each technique's name asks for its description
+- the knowledge base in RAG_BENCH_KB (default vectorstore) and this
+  repository's documentation, split as RAGSystem.add_text_chunks does,
+  as distractors
+Sources missing on this machine are skipped and listed.
+"""
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from rag_system import EMBEDDING_BACKENDS, RAGSystem, make_embeddings
+from vector_store import VectorStore
+
+K = 4
+THROUGHPUT_CHUNKS = 20_000
+WAZUH_RULESET_DIR = os.getenv("WAZUH_RULESET_DIR", "/var/ossec/ruleset")
+MITRE_ATTACK_JSON = os.getenv("MITRE_ATTACK_JSON", "")
+RAG_BENCH_KB = os.getenv("RAG_BENCH_KB", "vectorstore")
+DOCS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# doc id -> runbook chunk
+CORPUS = {
+    "ssh_bruteforce": "SSH brute force: many failed password attempts for root or invalid users from one source IP. "
+                      "Block the source address on the firewall, enforce key-based authentication and fail2ban.",
+    "ransomware": "Ransomware response: isolate the infected host from the network, preserve a memory image, "
+                  "identify the encryption process and restore files from offline backups.",
+    "phishing": "Phishing email triage: check sender domain, SPF and DKIM results, detonate attachments in a sandbox "
+                "and reset credentials of users who clicked the link.",
+    "fim_etc": "File integrity monitoring alert on /etc/passwd or /etc/shadow: confirm whether the change was an "
+               "authorized user account change, otherwise treat it as persistence and escalate.",
+    "web_sqli": "SQL injection against the web application: look for UNION SELECT and quote characters in access logs, "
+                "enable the WAF rule set and review database audit logs for data exfiltration.",
+    "privilege_escalation": "Privilege escalation via sudo: review sudoers changes, unexpected sudo usage by service "
+                            "accounts and new SUID binaries; remove unauthorized rights.",
+    "malware_hash": "Suspicious binary: compute the SHA256 hash, look it up on VirusTotal and threat intelligence feeds, "
+                    "quarantine the file and scan other endpoints for the same hash.",
+    "dns_tunneling": "DNS tunneling: very long random subdomains, high query volume to a single domain and TXT records. "
+                     "Sinkhole the domain and inspect the client process.",
+    "agent_disconnected": "Wazuh agent disconnected: verify the agent service is running, check connectivity to the "
+                          "manager on port 1514 and re-register the agent key if needed.",
+    "cis_compliance": "CIS benchmark compliance failures from SCA: prioritize failed checks on password policy, "
+                      "SSH configuration and audit logging, then rescan the host.",
+    "port_scan": "Port scan detected: a single source touching many destination ports in a short window. "
+                 "Correlate with firewall logs and block the scanner if external.",
+    "data_exfiltration": "Data exfiltration: unusually large outbound transfers to cloud storage or unknown IPs at night. "
+                         "Cut the connection, identify the data and the account involved.",
+    "windows_logon": "Windows failed logon events 4625 in bulk indicate password spraying; lock affected accounts and "
+                     "check successful logons 4624 from the same source.",
+    "rootkit": "Rootcheck rootkit detection: hidden processes or files reported by the Wazuh agent. Reimage the system "
+               "rather than cleaning it.",
+    "vulnerability_patch": "Critical CVE reported by vulnerability detection: find affected packages across agents, "
+                           "schedule patching and apply temporary mitigations.",
+    "cryptominer": "Cryptominer: sustained high CPU usage, connections to mining pools on port 3333 or 4444, "
+                   "kill the miner process and remove its cron persistence.",
+    "valid_accounts": "Valid accounts (T1078): a successful login from a new country or outside working hours right "
+                      "after failures. Confirm with the user, revoke sessions and rotate the password.",
+    "powershell": "Command and scripting interpreter (T1059): encoded PowerShell with -enc or DownloadString, or bash "
+                  "piping curl into sh. Capture the command line, the parent process and any downloaded payload.",
+    "new_service": "New system service (T1543): a service or systemd unit created outside change management, often "
+                   "running from a temp directory. Stop and disable it, keep the binary for analysis.",
+    "scheduled_task": "Scheduled task or cron job (T1053) added for persistence: schtasks /create or a new crontab "
+                      "entry running a script every few minutes. Remove the entry and trace who created it.",
+    "uac_bypass": "Abuse elevation control (T1548): UAC bypass through fodhelper or eventvwr registry keys, or setuid "
+                  "tricks on Linux. Revert the registry change and review what ran with high integrity.",
+    "process_injection": "Process injection (T1055): a process writing memory into another (CreateRemoteThread, "
+                         "ptrace) such as code inside explorer.exe or lsass. Dump the target process before killing it.",
+    "log_clearing": "Indicator removal (T1070): security event log cleared (event 1102), audit logs truncated or shell "
+                    "history deleted. Treat as an active intruder covering tracks and pull logs from the manager copy.",
+    "registry_run_key": "Modify registry (T1112): new values under Run or RunOnce keys reported by registry integrity "
+                        "monitoring. Compare with the baseline and delete unknown autostart entries.",
+    "credential_dumping": "OS credential dumping (T1003): access to lsass memory, mimikatz strings, procdump on lsass "
+                          "or copies of the SAM and NTDS.dit. Reset affected credentials, including krbtgt twice.",
+    "network_sniffing": "Network sniffing (T1040): interface switched to promiscuous mode, tcpdump or Wireshark started "
+                        "on a server. Find who launched the capture and whether credentials crossed in clear text.",
+    "file_discovery": "File and directory discovery (T1083): bursts of dir /s, find / or recursive listing of shares "
+                      "by one account, usually before collection. Review what the account opened next.",
+    "remote_discovery": "Remote system discovery (T1018): net view, ping sweeps or nltest domain enumeration from a "
+                        "workstation. Scope the host and check for lateral movement that followed.",
+    "lateral_rdp": "Remote services lateral movement (T1021): RDP logon type 10 or SSH sessions between internal hosts "
+                   "that never talk to each other, or PsExec service creation. Map the hop chain and isolate sources.",
+    "deployment_tools": "Software deployment tools (T1072): SCCM, Ansible or PDQ pushing an unexpected package to "
+                        "many endpoints at once. Freeze the deployment and review the operator account.",
+    "c2_beacon": "Application layer protocol C2 (T1071): periodic HTTPS beacons at a fixed interval with a rare user "
+                 "agent to a newly registered domain. Block the domain and hunt for the same beacon on other hosts.",
+    "tool_transfer": "Ingress tool transfer (T1105): certutil -urlcache, bitsadmin or wget fetching executables onto a "
+                     "server. Block the source URL and check what ran from the download folder.",
+    "shadow_copy_delete": "Inhibit system recovery (T1490): vssadmin delete shadows, wbadmin delete catalog or "
+                          "bcdedit recoveryenabled no. Usually seconds before ransomware encryption; isolate now.",
+    "web_scanner": "Web scanner: bursts of HTTP 400 and 404 errors from one address requesting admin pages, .git and "
+                   "wp-login paths. Rate-limit or block the address at the reverse proxy.",
+    "account_created": "New local user or group member added (Windows 4720 and 4732, Linux useradd): verify the "
+                       "ticket, otherwise disable the account and check the admins group for other additions.",
+    "usb_device": "Removable storage: a USB mass storage device attached to a server or a kiosk. Confirm it is "
+                  "authorized and review files copied to it.",
+    "docker_privileged": "Container escape risk: a docker container started privileged or with the host root "
+                         "mounted. Stop the container and audit the image and who launched it.",
+    "cloudtrail_root": "AWS CloudTrail: console login with the root account, MFA disabled or access keys created for "
+                       "an unused IAM user. Lock the root credentials and review the API calls made.",
+    "manager_disk": "Wazuh manager disk almost full: alerts.json and archives grow without rotation and analysisd "
+                    "starts dropping events. Rotate and compress logs, adjust the retention policy.",
+    "active_response_block": "Active response firewall-drop: the agent adds the attacker IP to iptables for the "
+                             "configured timeout. Check the rule level that triggered it and remove false positives.",
+}
+
+# (analyst question, doc id that answers it) - paraphrased, not copied from the chunks
+QUERIES = [
+    ("lots of failed ssh logins from one ip", "ssh_bruteforce"),
+    ("someone is bruteforcing our root account over ssh", "ssh_bruteforce"),
+    ("files got encrypted, what do we do", "ransomware"),
+    ("ransomware on a workstation", "ransomware"),
+    ("user clicked a link in a suspicious email", "phishing"),
+    ("how to triage a phishing report", "phishing"),
+    ("/etc/shadow was modified", "fim_etc"),
+    ("integrity alert on passwd file", "fim_etc"),
+    ("sql injection in access logs", "web_sqli"),
+    ("union select attack on website", "web_sqli"),
+    ("service account used sudo unexpectedly", "privilege_escalation"),
+    ("new suid binary found", "privilege_escalation"),
+    ("check this hash on virustotal", "malware_hash"),
+    ("unknown executable, is it malware", "malware_hash"),
+    ("weird long subdomains in dns queries", "dns_tunneling"),
+    ("agent shows disconnected in the manager", "agent_disconnected"),
+    ("wazuh agent not reporting", "agent_disconnected"),
+    ("failed CIS checks after SCA scan", "cis_compliance"),
+    ("host is scanning many ports", "port_scan"),
+    ("large upload to cloud storage at 3am", "data_exfiltration"),
+    ("event id 4625 spike", "windows_logon"),
+    ("password spraying against windows accounts", "windows_logon"),
+    ("rootcheck found hidden processes", "rootkit"),
+    ("critical cve on our servers", "vulnerability_patch"),
+    ("cpu at 100% and connections to mining pool", "cryptominer"),
+    ("login from another country at 2am after a few failures", "valid_accounts"),
+    ("is this successful logon by a real user", "valid_accounts"),
+    ("base64 encoded powershell command", "powershell"),
+    ("curl piped to sh on a server", "powershell"),
+    ("unknown systemd unit appeared", "new_service"),
+    ("service installed running from temp folder", "new_service"),
+    ("new crontab entry running every 5 minutes", "scheduled_task"),
+    ("schtasks create persistence", "scheduled_task"),
+    ("fodhelper uac bypass", "uac_bypass"),
+    ("createremotethread into explorer", "process_injection"),
+    ("code injected into another process", "process_injection"),
+    ("security log was cleared event 1102", "log_clearing"),
+    ("attacker deleted bash history", "log_clearing"),
+    ("new autostart value under run key", "registry_run_key"),
+    ("mimikatz on a domain controller", "credential_dumping"),
+    ("someone dumped lsass", "credential_dumping"),
+    ("ntds.dit copied", "credential_dumping"),
+    ("nic in promiscuous mode", "network_sniffing"),
+    ("tcpdump running on the db server", "network_sniffing"),
+    ("user recursively listing every share", "file_discovery"),
+    ("ping sweep from a workstation", "remote_discovery"),
+    ("nltest domain trust enumeration", "remote_discovery"),
+    ("rdp between two workstations", "lateral_rdp"),
+    ("psexec used to hop to another host", "lateral_rdp"),
+    ("sccm pushed an unknown package to all machines", "deployment_tools"),
+    ("beaconing every 60 seconds to a new domain", "c2_beacon"),
+    ("certutil downloading an exe", "tool_transfer"),
+    ("bitsadmin fetching a file from the internet", "tool_transfer"),
+    ("vssadmin delete shadows", "shadow_copy_delete"),
+    ("backups catalog deleted with wbadmin", "shadow_copy_delete"),
+    ("lots of 404s for wp-login and .git", "web_scanner"),
+    ("someone probing our admin pages", "web_scanner"),
+    ("event 4720 new user account", "account_created"),
+    ("user added to local administrators", "account_created"),
+    ("usb stick plugged into a server", "usb_device"),
+    ("privileged docker container started", "docker_privileged"),
+    ("container mounts host root filesystem", "docker_privileged"),
+    ("aws root account console login", "cloudtrail_root"),
+    ("mfa disabled on iam user", "cloudtrail_root"),
+    ("wazuh manager running out of disk space", "manager_disk"),
+    ("analysisd dropping events", "manager_disk"),
+    ("why was this ip added to iptables automatically", "active_response_block"),
+    ("firewall-drop blocked a legitimate address", "active_response_block"),
+]
+
+
+def _tag_text(xml, tag):
+    return [" ".join(value.split()) for value in re.findall(rf"<{tag}\b[^>]*>(.*?)</{tag}>", xml, re.S)]
+
+
+def load_ruleset(directory=WAZUH_RULESET_DIR):
+    """Rule and decoder chunks from a Wazuh ruleset, plus one (description, rule ids) question per description.
+
+    The files hold several root elements and the odd malformed comment, so
+    rules and decoders are cut out with regexes rather than parsed as XML.
+    """
+    docs, descriptions = {}, {}
+    for path in sorted(glob.glob(os.path.join(directory, "rules", "*.xml"))):
+        with open(path, errors="replace") as f:
+            for attrs, body in re.findall(r"<rule\b([^>]*)>(.*?)</rule>", f.read(), re.S):
+                rule_id = re.search(r'\bid="(\d+)"', attrs)
+                if rule_id is None:
+                    continue
+                level = re.search(r'\blevel="(\d+)"', attrs)
+                description = " ".join(_tag_text(body, "description"))
+                doc_id = f"rule {rule_id.group(1)}"
+                docs[doc_id] = " ".join(
+                    [f"Rule {rule_id.group(1)} level {level.group(1) if level else '?'}: {description}"]
+                    + [f"{tag}: {value}" for tag in ("match", "regex", "field", "group", "id")
+                       for value in _tag_text(body, tag)])
+                if description:
+                    # Rules sharing a description answer its question equally well
+                    descriptions.setdefault(description.lower(), set()).add(doc_id)
+    for path in sorted(glob.glob(os.path.join(directory, "decoders", "*.xml"))):
+        with open(path, errors="replace") as f:
+            decoders = re.findall(r'<decoder\b[^>]*\bname="([^"]+)"[^>]*>(.*?)</decoder>', f.read(), re.S)
+            for i, (name, body) in enumerate(decoders):
+                # Child decoders repeat their parent's name
+                docs[f"{os.path.basename(path)} decoder {i}"] = f"Decoder {name}: " + " ".join(
+                    f"{tag}: {value}" for tag in ("parent", "prematch", "program_name", "regex", "order")
+                    for value in _tag_text(body, tag))
+    return docs, list(descriptions.items())
+
+
+def load_attack(path=MITRE_ATTACK_JSON):
+    """ATT&CK technique descriptions and one (technique name, {id}) question per technique"""
+    if not path or not os.path.exists(path):
+        return {}, []
+    with open(path) as f:
+        bundle = json.load(f)
+    docs, questions = {}, []
+    for item in bundle.get("objects", []):
+        if item.get("type") != "attack-pattern" or item.get("revoked") or item.get("x_mitre_deprecated"):
+            continue
+        ref = next((r for r in item.get("external_references", []) if r.get("source_name") == "mitre-attack"), None)
+        if ref is None or not item.get("description"):
+            continue
+        tactics = ", ".join(phase["phase_name"] for phase in item.get("kill_chain_phases", []))
+        docs[ref["external_id"]] = f"{ref['external_id']} ({tactics}): {item['description']}"
+        questions.append((item["name"], {ref["external_id"]}))
+    return docs, questions
+
+
+def load_distractors(kb_directory=RAG_BENCH_KB, docs_directory=DOCS_DIR):
+    """Unlabelled chunks: the knowledge base's texts and this repository's markdown, chunked like uploads"""
+    docs = {}
+    store = VectorStore(kb_directory)
+    if store.exists():
+        _, texts = store.load()
+        docs.update((f"kb {i}", text) for i, text in enumerate(texts))
+    splitter = RAGSystem(kb_directory).text_splitter
+    for path in sorted(glob.glob(os.path.join(docs_directory, "*.md"))):
+        with open(path) as f:
+            for i, chunk in enumerate(splitter.split_text(f.read())):
+                docs[f"{os.path.basename(path)} {i}"] = chunk
+    return docs
+
+
+def build_corpus():
+    """(docs {id: text}, {question set: [(question, relevant ids)]}, source sizes, skipped sources)"""
+    docs = dict(CORPUS)
+    question_sets = {"runbook questions": [(question, {doc_id}) for question, doc_id in QUERIES]}
+    sizes, skipped = {"runbooks": len(CORPUS)}, []
+
+    rules, rule_questions = load_ruleset()
+    if rules:
+        docs.update(rules)
+        question_sets["rule descriptions"] = rule_questions
+        sizes["rules + decoders"] = len(rules)
+    else:
+        skipped.append(f"Wazuh ruleset (nothing under {WAZUH_RULESET_DIR}; set WAZUH_RULESET_DIR)")
+
+    techniques, technique_questions = load_attack()
+    if techniques:
+        docs.update(techniques)
+        question_sets["ATT&CK technique names"] = technique_questions
+        sizes["ATT&CK techniques"] = len(techniques)
+    else:
+        skipped.append("MITRE ATT&CK (set MITRE_ATTACK_JSON to enterprise-attack.json)")
+
+    distractors = load_distractors()
+    docs.update(distractors)
+    sizes["KB + docs chunks"] = len(distractors)
+    return docs, question_sets, sizes, skipped
+
+
+def retrieval_quality(embeddings, docs, questions, batch=256):
+    """recall@1, recall@K and MRR of ``questions`` [(text, relevant ids)] against every chunk in ``docs``"""
+    ids = list(docs)
+    vectors = embeddings.embed_batch([docs[i] for i in ids])
+    norms = (vectors ** 2).sum(1)
+    hits1 = hitsk = reciprocal = 0.0
+    for start in range(0, len(questions), batch):
+        chunk = questions[start:start + batch]
+        queries = embeddings.embed_batch([q for q, _ in chunk])
+        # Squared L2 distances, the same ranking IndexFlatL2 produces
+        distances = (queries ** 2).sum(1)[:, None] - 2 * queries @ vectors.T + norms[None, :]
+        for row, (_, relevant) in enumerate(chunk):
+            order = np.argsort(distances[row], kind="stable")
+            rank = next(position for position, i in enumerate(order, 1) if ids[i] in relevant)
+            hits1 += rank == 1
+            hitsk += rank <= K
+            reciprocal += 1 / rank
+    n = len(questions)
+    return hits1 / n, hitsk / n, reciprocal / n
+
+
+def throughput(embeddings):
+    chunks = [f"{text} (incident {i})" for i, text in zip(range(THROUGHPUT_CHUNKS), list(CORPUS.values()) * THROUGHPUT_CHUNKS)]
+    started = time.perf_counter()
+    embeddings.embed_batch(chunks)
+    return THROUGHPUT_CHUNKS / (time.perf_counter() - started)
+
+
+def run_benchmark():
+    docs, question_sets, sizes, skipped = build_corpus()
+    print(f"🔎 {len(docs):,} chunks in one index ({', '.join(f'{n:,} {source}' for source, n in sizes.items())}); "
+          f"throughput on {THROUGHPUT_CHUNKS:,} chunks")
+    for source in skipped:
+        print(f"   skipped: {source}")
+    for name in EMBEDDING_BACKENDS:
+        embeddings = make_embeddings(name)
+        print(f"- {name:<6} dim {embeddings.dim:<4} {throughput(embeddings):9,.0f} chunks/s")
+        for label, questions in question_sets.items():
+            recall1, recallk, mrr = retrieval_quality(embeddings, docs, questions)
+            print(f"    {label:<24} ({len(questions):>5,}) recall@1 {recall1:6.1%} | recall@{K} {recallk:6.1%} | MRR {mrr:.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark query routing: the old sequential any() keyword chain vs the
+compiled single-pass intent router, on the labelled test corpus
+"""
+import time
+
+from agents.intent_router import INTENTS, DEFAULT_INTENT, IntentRouter
+from test_intent_router import CORPUS, REGRESSIONS
+
+ROUNDS = 2_000
+
+
+def legacy_determine_tool(query):
+    """The pre-router _determine_tool: first intent with any substring hit wins"""
+    query_lower = query.lower()
+    for tool, keywords in INTENTS:
+        if any(word in query_lower for word in keywords):
+            return tool
+    return DEFAULT_INTENT
+
+
+def time_per_query(fn, queries):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) / (ROUNDS * len(queries)) * 1e6
+
+
+def run_benchmark():
+    router = IntentRouter()
+    labelled = CORPUS + REGRESSIONS
+    queries = [query for query, _ in labelled]
+    # Long pasted log lines are where per-keyword scans hurt most
+    long_queries = [query + " " + "sshd[1042]: Failed password for invalid user from 10.0.0.5 port 51234 ssh2 " * 8
+                    for query in queries]
+
+    print(f"🧭 Routing {len(queries)} corpus queries x {ROUNDS:,} rounds")
+    for name, batch in (("corpus", queries), ("with pasted logs", long_queries)):
+        legacy_us = time_per_query(legacy_determine_tool, batch)
+        router_us = time_per_query(router.best, batch)
+        print(f"- {name:<17} any() chain {legacy_us:6.2f} µs/query | compiled router {router_us:6.2f} µs/query "
+              f"(ranks all {len(INTENTS)} intents)")
+
+    for name, fn in (("any() chain", legacy_determine_tool), ("compiled router", router.best)):
+        correct = sum(fn(query) == expected for query, expected in labelled)
+        print(f"🎯 {name:<16} accuracy {correct}/{len(labelled)} ({correct / len(labelled):.1%})")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark backend startup: import time of main.py, time until the app
+serves requests, and time until the chat orchestrator is ready, each in
+a fresh interpreter, next to what the eager imports used to cost
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+RUNS = 3
+
+# Everything main.py used to import (and build) before serving a request
+EAGER_MODULES = ["langchain_google_genai", "langchain_text_splitters", "faiss"] + [
+    f"agents.{name}" for name in (
+        "alert_agent", "rule_agent", "agent_manager", "firewall_agent", "xml_editor_agent",
+        "alert_triage_agent", "threat_intelligence_agent", "incident_response_agent", "fim_agent",
+        "sca_agent", "log_analysis_agent", "active_response_agent", "reporting_agent", "dashboard_agent",
+    )
+]
+
+PROBES = {
+    "eager imports (before)": f"""
+import importlib, time
+started = time.perf_counter()
+import main
+for module in {EAGER_MODULES!r}:
+    importlib.import_module(module)
+print({{"ms": (time.perf_counter() - started) * 1000}})
+""",
+    "import main": """
+import time
+started = time.perf_counter()
+import main
+print({"ms": (time.perf_counter() - started) * 1000})
+""",
+    "time to ready": """
+import time
+started = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+main.STARTUP_WARMUP = False
+with TestClient(main.app) as client:
+    client.get("/")
+    ready = (time.perf_counter() - started) * 1000
+    client.portal.call(main.get_orchestrator)
+    chat_ready = (time.perf_counter() - started) * 1000
+print({"ms": ready, "chat_ready_ms": chat_ready})
+""",
+}
+
+
+def run_probe(code):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    # The orchestrator prints its own status lines; the probe result is the last one
+    return json.loads(out.strip().splitlines()[-1].replace("'", '"'))
+
+
+def run_benchmark():
+    print(f"⏱️  Startup timings, median of {RUNS} fresh interpreters")
+    for name, code in PROBES.items():
+        samples = [run_probe(code) for _ in range(RUNS)]
+        line = f"- {name:<24} {statistics.median(s['ms'] for s in samples):8.1f} ms"
+        if "chat_ready_ms" in samples[0]:
+            line += f" | orchestrator ready {statistics.median(s['chat_ready_ms'] for s in samples):8.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,75 @@
+import threading
+
+
+class AlertWindow:
+    """Newest-first, size-bounded window of alerts for one query, advanced by a cursor.
+
+    The cursor is the newest ``timestamp`` seen plus the ids seen at exactly
+    that timestamp, so the next poll asks Wazuh only for alerts at or after
+    it and drops the ones already merged.
+    """
+
+    def __init__(self, max_size=500):
+        self.max_size = max_size
+        self.items = []
+        self.last_timestamp = None
+        self.ids_at_last_timestamp = set()
+        self.total_affected_items = 0
+        self.polls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def primed(self):
+        return self.last_timestamp is not None
+
+    def cursor_query(self):
+        """Wazuh q= clause selecting alerts at or after the cursor"""
+        return f"(timestamp>{self.last_timestamp},timestamp={self.last_timestamp})"
+
+    def resize(self, max_size):
+        """Grow the window; a full one is reset so the next poll backfills older alerts"""
+        with self._lock:
+            if max_size <= self.max_size:
+                return
+            if len(self.items) >= self.max_size:
+                self.items = []
+                self.last_timestamp = None
+                self.ids_at_last_timestamp = set()
+            self.max_size = max_size
+
+    def merge(self, new_items, total=None):
+        """Add freshly fetched alerts; returns how many were actually new"""
+        with self._lock:
+            self.polls += 1
+            known = {item.get('id') for item in self.items}
+            fresh = []
+            for item in new_items:
+                alert_id = item.get('id')
+                if alert_id in known:
+                    continue
+                if item.get('timestamp') == self.last_timestamp and alert_id in self.ids_at_last_timestamp:
+                    continue
+                known.add(alert_id)
+                fresh.append(item)
+
+            if total is not None and not self.primed:
+                self.total_affected_items = total
+            else:
+                self.total_affected_items += len(fresh)
+
+            merged = sorted(self.items + fresh, key=lambda a: (a.get('timestamp', ''), str(a.get('id', ''))), reverse=True)
+            self.items = merged[:self.max_size]
+
+            if self.items:
+                newest = self.items[0].get('timestamp')
+                if newest != self.last_timestamp:
+                    self.ids_at_last_timestamp = set()
+                    self.last_timestamp = newest
+                self.ids_at_last_timestamp.update(a.get('id') for a in self.items if a.get('timestamp') == newest)
+            return len(fresh)
+
+    def snapshot(self, limit=None):
+        """get_alerts-style payload straight from memory"""
+        with self._lock:
+            items = list(self.items[:limit] if limit else self.items)
+            return {"data": {"affected_items": items, "total_affected_items": self.total_affected_items}, "error": 0}
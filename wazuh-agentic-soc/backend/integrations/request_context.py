@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+import types
+
+from integrations.wazuh_client import DEFAULT_ALERT_WINDOW
+
+# Alert reads through a context are widened to at least this many items so
+# that later, narrower reads in the same request can be answered locally
+CONTEXT_ALERT_LIMIT = int(os.getenv("WAZUH_CONTEXT_ALERT_LIMIT", "100"))
+
+
+class WazuhRequestContext:
+    """Per-request view of a Wazuh client that memoizes reads.
+
+    Hand one to every tool serving a query: identical ``get_*`` calls hit
+    the manager once, and an alert read can be answered from a wider one
+    already made (e.g. limit 100 at level 5+ serves limit 10 at level 7+)
+    by filtering locally. ``iter_*`` pagers and ``fetch_many`` go through
+    the memoized getters too, and ``poll_alerts`` runs at most once per
+    query: its window is recorded as an alert read, so triage, the alert
+    tool, reporting and the response tools share whatever one of them
+    downloaded first. Writes pass through and clear the memo. Entries live
+    as long as the context, or ``ttl`` seconds if given.
+    """
+
+    def __init__(self, client, ttl=None, alert_limit=CONTEXT_ALERT_LIMIT):
+        self.client = client
+        self.ttl = ttl
+        self.alert_limit = alert_limit
+        self._reads = {}
+        self._alert_reads = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.served_by_wider = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name == "fetch_many" or name.startswith("iter_"):
+            # Rebind to the context so the getters they call are the memoized ones
+            return types.MethodType(getattr(type(self.client), name), self)
+        if name.startswith("get_") and callable(attr):
+            return lambda *args, **kwargs: self._memoized(name, attr, args, kwargs)
+        return attr
+
+    def _fresh(self, stored_at):
+        return self.ttl is None or time.monotonic() - stored_at < self.ttl
+
+    def _memoized(self, name, getter, args, kwargs):
+        key = (name, repr(args), tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+        with self._lock:
+            entry = self._reads.get(key)
+            if entry is not None and self._fresh(entry[0]):
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        payload = getter(*args, **kwargs)
+        if not payload.get('error'):
+            with self._lock:
+                self._reads[key] = (time.monotonic(), payload)
+        return payload
+
+    def _stored_alerts(self, limit, severity_min, sort, q, fields):
+        """Payload cut from an earlier alert read that covers this one, or None (counted as a miss)"""
+        with self._lock:
+            for stored_at, read, payload in reversed(self._alert_reads):
+                if self._fresh(stored_at) and self._covers(read, payload, limit, severity_min, sort, q, fields):
+                    self.hits += 1
+                    if read["severity_min"] != severity_min or read["limit"] != limit:
+                        self.served_by_wider += 1
+                    return self._narrow(read, payload, limit, severity_min)
+            self.misses += 1
+        return None
+
+    def _store_alerts(self, read, payload):
+        with self._lock:
+            self._alert_reads.append((time.monotonic(), read, payload))
+
+    def get_alerts(self, limit=50, severity_min=5, sort=None, q=None, offset=0, fields=None):
+        """Same contract as the client's get_alerts, served locally when an earlier read covers it"""
+        if offset or limit is None:
+            return self._memoized("get_alerts", self.client.get_alerts, (),
+                                  dict(limit=limit, severity_min=severity_min, sort=sort, q=q, offset=offset, fields=fields))
+        payload = self._stored_alerts(limit, severity_min, sort, q, fields)
+        if payload is not None:
+            return payload
+        # Unsorted reads are made newest first, the order poll_alerts and reporting use, so they serve each other
+        read = dict(limit=max(limit, self.alert_limit), severity_min=severity_min, sort=sort or "-timestamp", q=q,
+                    fields=fields)
+        payload = self.client.get_alerts(**read)
+        if payload.get('error'):
+            return payload
+        self._store_alerts(read, payload)
+        return self._narrow(read, payload, limit, severity_min)
+
+    def poll_alerts(self, severity_min=5, q=None, fields=None, window_size=DEFAULT_ALERT_WINDOW):
+        """Same contract as the client's poll_alerts: the newest ``window_size`` alerts.
+
+        Served from an earlier newest-first read in this query when one
+        covers it; otherwise the client polls (advancing its cursor) and the
+        window is kept for the reads that follow.
+        """
+        payload = self._stored_alerts(window_size, severity_min, "-timestamp", q, fields)
+        if payload is not None:
+            return payload
+        payload = self.client.poll_alerts(severity_min=severity_min, q=q, fields=fields, window_size=window_size)
+        if payload.get('error'):
+            return payload
+        self._store_alerts(dict(limit=window_size, severity_min=severity_min, sort="-timestamp", q=q, fields=fields),
+                           payload)
+        return payload
+
+    @staticmethod
+    def _exhaustive(read, payload):
+        data = payload.get('data', {})
+        items = data.get('affected_items', [])
+        return len(items) < read["limit"] or data.get('total_affected_items', len(items) + 1) <= len(items)
+
+    def _covers(self, read, payload, limit, severity_min, sort, q, fields):
+        # A read without sort takes the manager's default order, so any stored order will do
+        if read["q"] != q or (sort is not None and read["sort"] != sort) or read["severity_min"] > severity_min:
+            return False
+        if fields and read["fields"] and not set(fields) <= set(read["fields"]):
+            return False
+        if read["fields"] and not fields:
+            # Caller wants whole documents, the stored read was projected
+            return False
+        if read["severity_min"] != severity_min and read["fields"] and "rule.level" not in read["fields"]:
+            return False
+        if self._exhaustive(read, payload):
+            return True
+        return len(self._items(read, payload, severity_min)) >= limit
+
+    @staticmethod
+    def _items(read, payload, severity_min):
+        """Stored items matching ``rule.level>severity_min``"""
+        items = payload.get('data', {}).get('affected_items', [])
+        if read["severity_min"] == severity_min:
+            return items
+        return [a for a in items if a.get('rule', {}).get('level', 0) > severity_min]
+
+    def _narrow(self, read, payload, limit, severity_min):
+        """get_alerts-shaped payload for (limit, severity_min) cut from a wider stored read"""
+        items = self._items(read, payload, severity_min)
+        data = {"affected_items": items[:limit]}
+        if read["severity_min"] == severity_min:
+            data["total_affected_items"] = payload['data'].get('total_affected_items', len(items))
+        elif self._exhaustive(read, payload):
+            data["total_affected_items"] = len(items)
+        # Otherwise the narrower total is unknown; callers fall back to len(items)
+        return {"data": data, "error": 0}
+
+    def trigger_active_response(self, *args, **kwargs):
+        result = self.client.trigger_active_response(*args, **kwargs)
+        # The manager's state changed, so nothing read before can be trusted
+        self.clear()
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._reads.clear()
+            self._alert_reads.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "served_by_wider": self.served_by_wider}
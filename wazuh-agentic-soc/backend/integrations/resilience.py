@@ -0,0 +1,244 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("WAZUH_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("WAZUH_BREAKER_RESET", "30"))
+TIMEOUT_MIN = float(os.getenv("WAZUH_TIMEOUT_MIN", "2"))
+TIMEOUT_MAX = float(os.getenv("WAZUH_TIMEOUT_MAX", "10"))
+MAX_RETRIES = int(os.getenv("WAZUH_MAX_RETRIES", "2"))
+# Each request earns this fraction of a retry; retries beyond the budget are skipped
+RETRY_BUDGET_RATIO = float(os.getenv("WAZUH_RETRY_BUDGET", "0.2"))
+# Items the Wazuh API returns when a request sets no limit
+DEFAULT_PAGE_SIZE = 500
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failed calls -> half_open probe after a cool-down.
+
+    A failure is one logical call that still failed after its retries, not
+    one attempt, so the threshold counts user-visible errors.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise CircuitOpenError unless a request may go out now"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                # Let exactly one probe through; everyone else keeps failing fast
+                self._probing = True
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"Wazuh {self.name} circuit open after repeated failures; retrying in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+class LatencyTracker:
+    """Smoothed latency and deviation (TCP RTO style) used to derive a request timeout"""
+
+    def __init__(self, minimum=TIMEOUT_MIN, maximum=TIMEOUT_MAX):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.srtt = None
+        self.rttvar = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            if self.srtt is None:
+                self.srtt, self.rttvar = seconds, seconds / 2
+            else:
+                self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - seconds)
+                self.srtt = 0.875 * self.srtt + 0.125 * seconds
+
+    def timeout(self):
+        with self._lock:
+            if self.srtt is None:
+                return self.maximum
+            return min(self.maximum, max(self.minimum, self.srtt + 4 * self.rttvar))
+
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of overall traffic"""
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+
+def page_bucket(limit):
+    """Power of ten at or above the requested page size (1, 10, 100, 1000, ...)"""
+    size = DEFAULT_PAGE_SIZE if limit is None else max(1, int(limit))
+    bucket = 1
+    while bucket < size:
+        bucket *= 10
+    return bucket
+
+
+def backoff_delay(attempt, base=0.2, cap=2.0):
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class Resilience:
+    """Per-endpoint breakers, timeouts per endpoint and page size, and a shared retry budget for one Wazuh manager.
+
+    A limit=1 probe and a 500-item page of the same endpoint take very
+    different times, so each page-size bucket learns its own timeout;
+    otherwise the probes drag the bulk pages' timeout down to TIMEOUT_MIN.
+    """
+
+    def __init__(self, max_retries=MAX_RETRIES):
+        self.max_retries = max_retries
+        self.budget = RetryBudget()
+        self._breakers = {}
+        self._latency = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_name(path):
+        return "/" + path.strip("/").split("/")[0]
+
+    def _endpoint(self, path, limit=None):
+        name = self.endpoint_name(path)
+        key = (name, page_bucket(limit))
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            if key not in self._latency:
+                self._latency[key] = LatencyTracker()
+            return self._breakers[name], self._latency[key]
+
+    @staticmethod
+    def _failed(latency, started, response, error):
+        """Time one attempt; True when it failed in a way worth retrying"""
+        latency.observe(time.monotonic() - started)
+        return error is not None or response.status_code >= 500
+
+    def _give_up(self, breaker, attempt, idempotent):
+        # A half-open probe gets one attempt, and nobody keeps retrying once the breaker opens
+        return (not idempotent or breaker.state != "closed" or attempt >= self.max_retries
+                or not self.budget.withdraw())
+
+    @staticmethod
+    def _finish(breaker, response, error):
+        """Record the outcome of the whole call (after its retries) and return or raise it"""
+        if error is None and response.status_code < 500:
+            breaker.record_success()
+            return response
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+
+    def call(self, path, send, idempotent=True, limit=None):
+        """Run ``send(timeout)`` through the endpoint's breaker, with jittered retries.
+
+        ``limit`` is the request's page size, which picks the timeout.
+        Returns the last response (possibly a 5xx) or raises the last
+        exception; raises CircuitOpenError without calling ``send`` while
+        the breaker is open.
+        """
+        breaker, latency = self._endpoint(path, limit)
+        breaker.check()
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            response, error = None, None
+            try:
+                response = send(latency.timeout())
+            except Exception as e:
+                error = e
+            if not self._failed(latency, started, response, error) or self._give_up(breaker, attempt, idempotent):
+                return self._finish(breaker, response, error)
+            attempt += 1
+            time.sleep(backoff_delay(attempt))
+
+    async def acall(self, path, send, idempotent=True, limit=None):
+        """asyncio version of call(); ``send(timeout)`` returns an awaitable"""
+        breaker, latency = self._endpoint(path, limit)
+        breaker.check()
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            response, error = None, None
+            try:
+                response = await send(latency.timeout())
+            except Exception as e:
+                error = e
+            if not self._failed(latency, started, response, error) or self._give_up(breaker, attempt, idempotent):
+                return self._finish(breaker, response, error)
+            attempt += 1
+            await asyncio.sleep(backoff_delay(attempt))
+
+    def snapshot(self):
+        """Breaker state and current timeout per endpoint and page-size bucket, for /api/health"""
+        with self._lock:
+            breakers = dict(self._breakers)
+            latency = dict(self._latency)
+        endpoints = {}
+        for name, breaker in breakers.items():
+            timeouts = {f"limit<={bucket}": round(tracker.timeout(), 2)
+                        for (endpoint, bucket), tracker in sorted(latency.items()) if endpoint == name}
+            endpoints[name] = {**breaker.snapshot(), "timeout_seconds": timeouts}
+        return {
+            "endpoints": endpoints,
+            "retry_budget_tokens": round(self.budget.tokens, 2),
+            "retries_denied": self.budget.exhausted,
+        }
@@ -0,0 +1,237 @@
+import asyncio
+import os
+import time
+from base64 import b64encode
+
+import httpx
+
+from integrations.single_flight import AsyncSingleFlight
+
+from integrations.wazuh_client import (
+    DEFAULT_ALERT_WINDOW,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_POOL_SIZE,
+    TOKEN_REFRESH_MARGIN,
+    PagerBase,
+    WazuhEndpoints,
+    _token_expiry,
+    cache_ttl,
+    resilience,
+    response_cache,
+)
+
+
+class AsyncWazuhPager(PagerBase):
+    """Async version of WazuhPager: ``async for item in client.iter_alerts()``"""
+
+    async def _fetch(self, offset, limit):
+        return await getattr(self.client, self.getter)(limit=limit, offset=offset, **self.filters)
+
+    async def pages(self):
+        offset, limit = 0, self._limit_for(0)
+        if limit == 0:
+            return
+        pending = None
+        try:
+            payload = await self._fetch(offset, limit)
+            while True:
+                items = self._accept(payload)
+                if not items:
+                    return
+                last = self._is_last(offset, items, limit)
+                next_offset = offset + len(items)
+                next_limit = self._limit_for(next_offset)
+                if self.prefetch and not last:
+                    pending = asyncio.create_task(self._fetch(next_offset, next_limit))
+                yield items
+                if last:
+                    return
+                if pending:
+                    payload, pending = await pending, None
+                else:
+                    payload = await self._fetch(next_offset, next_limit)
+                offset, limit = next_offset, next_limit
+        finally:
+            if pending:
+                pending.cancel()
+
+    async def __aiter__(self):
+        async for page in self.pages():
+            for item in page:
+                yield item
+
+    async def total(self):
+        """Total matching items, read from a single one-item page if not known yet"""
+        if self.total_affected_items is None:
+            self._accept(await self._fetch(0, 1))
+        return self.total_affected_items
+
+    async def collect(self):
+        """Drain every page into a single get_*-style payload"""
+        return self._as_payload([item async for item in self])
+
+
+class AsyncWazuhClient(WazuhEndpoints):
+    """asyncio counterpart of WazuhClient for the FastAPI routes.
+
+    Exposes the same getters (``get_alerts``, ``get_agents``, ...) as
+    coroutines, so handlers can ``await`` them without blocking the event loop.
+    """
+
+    _pager_class = AsyncWazuhPager
+
+    def __init__(self, pool_size=None):
+        self.host = os.getenv("WAZUH_HOST")
+        self.port = os.getenv("WAZUH_PORT")
+        self.user = os.getenv("WAZUH_USER")
+        self.password = os.getenv("WAZUH_PASSWORD")
+        self.base_url = f"https://{self.host}:{self.port}"
+        self.pool_size = pool_size or DEFAULT_POOL_SIZE
+        self._http = None
+        self._inflight = AsyncSingleFlight()
+        self._token = None
+        self._token_expires_at = 0.0
+        self._auth_lock = asyncio.Lock()
+
+    @property
+    def http(self):
+        # Created lazily so the pool binds to the running event loop
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                verify=False,
+                timeout=10,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def get_token(self):
+        """Cached JWT, re-authenticating when missing or close to expiry"""
+        if self._token and time.time() < self._token_expires_at - TOKEN_REFRESH_MARGIN:
+            return self._token
+        async with self._auth_lock:
+            if self._token and time.time() < self._token_expires_at - TOKEN_REFRESH_MARGIN:
+                return self._token
+            self._token = await self._authenticate()
+            self._token_expires_at = _token_expiry(self._token) if self._token else 0.0
+            return self._token
+
+    def invalidate_token(self, stale_token=None):
+        """Drop the cached JWT so the next request authenticates again"""
+        if stale_token is None or self._token == stale_token:
+            self._token = None
+            self._token_expires_at = 0.0
+
+    async def _authenticate(self):
+        """Get JWT token from Wazuh using Basic Auth"""
+        auth = f"{self.user}:{self.password}".encode()
+        headers = {
+            'Authorization': f'Basic {b64encode(auth).decode()}',
+            'Content-Type': 'application/json'
+        }
+        try:
+            response = await self.http.post(f"{self.base_url}/security/user/authenticate", headers=headers)
+            if response.status_code == 200:
+                return response.json()['data']['token']
+            print(f"❌ Auth failed: {response.status_code} - {response.text}")
+            return None
+        except Exception as e:
+            print(f"❌ Authentication error: {e}")
+            return None
+
+    async def _request(self, method, url, timeout=10, **kwargs):
+        """Send an authenticated request, re-authenticating once on HTTP 401"""
+        token = await self.get_token()
+        headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+        response = await self.http.request(method, url, headers=headers, timeout=timeout, **kwargs)
+        if response.status_code == 401:
+            self.invalidate_token(token)
+            headers['Authorization'] = f'Bearer {await self.get_token()}'
+            response = await self.http.request(method, url, headers=headers, timeout=timeout, **kwargs)
+        return response
+
+    async def _get(self, path, params=None, empty_items=True):
+        """GET an endpoint, folding failures into the usual error payload"""
+        ttl = cache_ttl(path)
+        key = self._cache_key(path, params)
+        if ttl:
+            cached = response_cache.get(key)
+            if cached is not None:
+                return cached
+        # Identical reads already in flight share that request's result
+        return await self._inflight.do(key, lambda: self._fetch(path, params, empty_items, ttl, key))
+
+    async def _fetch(self, path, params, empty_items, ttl, key):
+        try:
+            url = f"{self.base_url}{path}"
+            response = await resilience.acall(path, lambda timeout: self._request("GET", url, params=params, timeout=timeout),
+                                              limit=(params or {}).get("limit"))
+            if response.status_code == 200:
+                payload = response.json()
+                if ttl:
+                    response_cache.set(key, payload, ttl)
+                return payload
+            return self._error_payload(f"HTTP {response.status_code}: {response.text}", empty_items)
+        except Exception as e:
+            return self._error_payload(str(e), empty_items)
+
+    async def fetch_many(self, calls, max_concurrency=None):
+        """Run independent reads concurrently and return {name: payload}.
+
+        Same contract as WazuhClient.fetch_many: at most ``max_concurrency``
+        requests are in flight, and failures come back as error payloads.
+        """
+        calls = self._normalize_calls(calls)
+        semaphore = asyncio.Semaphore(max(1, min(max_concurrency or DEFAULT_MAX_CONCURRENCY, self.pool_size)))
+
+        async def run(method, kwargs):
+            async with semaphore:
+                try:
+                    result = getattr(self, method)(**kwargs)
+                    if isinstance(result, AsyncWazuhPager):
+                        return await result.collect()
+                    return await result
+                except Exception as e:
+                    return self._error_payload(str(e))
+
+        results = await asyncio.gather(*(run(method, kwargs) for method, kwargs in calls.values()))
+        return dict(zip(calls.keys(), results))
+
+    async def poll_alerts(self, severity_min=5, q=None, fields=None, window_size=DEFAULT_ALERT_WINDOW):
+        """Fetch only the alerts newer than the last poll of this query and return the merged window"""
+        window, fields = self._alert_window(severity_min, q, fields, window_size)
+        pager = self._cursor_pager(window, severity_min, q, fields)
+        payload = await pager.collect()
+        if payload.get('error'):
+            return payload
+        window.merge(payload['data']['affected_items'], total=pager.total_affected_items)
+        return window.snapshot(window_size)
+
+    async def _put(self, path, payload):
+        """PUT a JSON payload, folding failures into an error payload"""
+        try:
+            url = f"{self.base_url}{path}"
+            response = await resilience.acall(path, lambda timeout: self._request("PUT", url, json=payload, timeout=timeout),
+                                              idempotent=False)
+            if response.status_code == 200:
+                # Anything cached under a path we just changed is now stale
+                self.invalidate_cache(path)
+                return response.json()
+            return self._error_payload(f"HTTP {response.status_code}: {response.text}", empty_items=False)
+        except Exception as e:
+            return self._error_payload(str(e), empty_items=False)
+
+
+_shared_async_client = None
+
+
+def get_async_wazuh_client():
+    """Return the process-wide AsyncWazuhClient used by the async API routes"""
+    global _shared_async_client
+    if _shared_async_client is None:
+        _shared_async_client = AsyncWazuhClient()
+    return _shared_async_client
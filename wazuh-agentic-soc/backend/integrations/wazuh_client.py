@@ -1,21 +1,414 @@
 import requests
+from requests.adapters import HTTPAdapter
 import urllib3
-from base64 import b64encode
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from base64 import b64encode, urlsafe_b64decode
 import os
 from dotenv import load_dotenv
+from integrations.alert_cursor import AlertWindow
+from integrations.resilience import Resilience
+from integrations.single_flight import SingleFlight
+from integrations.ttl_cache import TTLCache
 
 load_dotenv()
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-class WazuhClient:
-    def __init__(self):
+# Wazuh issues tokens valid for 900 seconds unless auth_token_exp_timeout is changed
+DEFAULT_TOKEN_TTL = int(os.getenv("WAZUH_TOKEN_TTL", "900"))
+# Refresh this many seconds before the token actually expires
+TOKEN_REFRESH_MARGIN = int(os.getenv("WAZUH_TOKEN_REFRESH_MARGIN", "60"))
+# Keep-alive connections held open to the manager
+DEFAULT_POOL_SIZE = int(os.getenv("WAZUH_POOL_SIZE", "10"))
+# Upper bound on reads issued at once by fetch_many
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("WAZUH_MAX_CONCURRENCY", "4"))
+# Page size used by the iter_* helpers (the Wazuh API caps most endpoints at 500)
+DEFAULT_PAGE_SIZE = int(os.getenv("WAZUH_PAGE_SIZE", "500"))
+
+# Newest alerts kept in memory per poll_alerts query
+DEFAULT_ALERT_WINDOW = int(os.getenv("WAZUH_ALERT_WINDOW", "500"))
+
+# Seconds a successful GET stays cached, by path prefix. Only slow-changing
+# catalogs are listed; alerts, agents, FIM and logs are always fetched live.
+CACHE_POLICIES = {
+    "/rules": 300,
+    "/decoders": 300,
+    "/sca": 120,
+    "/active-response": 600,
+}
+
+# Breakers, adaptive timeouts and the retry budget describe the manager itself,
+# so the sync and async clients share them
+resilience = Resilience()
+
+# Shared by the sync and async clients so either one warms it for the other
+response_cache = TTLCache(max_entries=int(os.getenv("WAZUH_CACHE_MAX_ENTRIES", "256")))
+
+# poll_alerts windows, keyed by query and likewise shared by both clients
+alert_windows = {}
+_alert_windows_lock = threading.Lock()
+
+
+def cache_ttl(path):
+    """TTL for a path from CACHE_POLICIES (longest matching prefix), 0 if uncached"""
+    matches = [prefix for prefix in CACHE_POLICIES if path == prefix or path.startswith(prefix + "/")]
+    return CACHE_POLICIES[max(matches, key=len)] if matches else 0
+
+
+# Fields the alert-summarising agents and the dashboard actually read
+ALERT_SUMMARY_FIELDS = ["id", "timestamp", "rule.id", "rule.level", "rule.description", "agent.id", "agent.name"]
+
+
+def _token_expiry(token):
+    """Read the exp claim from a JWT, falling back to the default TTL"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(urlsafe_b64decode(payload))['exp'])
+    except Exception:
+        return time.time() + DEFAULT_TOKEN_TTL
+
+
+class PagerBase:
+    """Bookkeeping shared by the sync and async offset/limit pagers"""
+
+    def __init__(self, client, getter, filters, page_size=DEFAULT_PAGE_SIZE, max_items=None, prefetch=False):
+        self.client = client
+        self.getter = getter
+        self.filters = filters
+        self.page_size = page_size
+        self.max_items = max_items
+        self.prefetch = prefetch
+        self.total_affected_items = None
+        self.error = None
+
+    def _limit_for(self, offset):
+        if self.max_items is None:
+            return self.page_size
+        return max(0, min(self.page_size, self.max_items - offset))
+
+    def _accept(self, payload):
+        """Record total/error from a page payload and return its items"""
+        if payload.get('error'):
+            self.error = payload['error']
+            return []
+        data = payload.get('data', {})
+        if 'total_affected_items' in data:
+            self.total_affected_items = data['total_affected_items']
+        return data.get('affected_items', [])
+
+    def _is_last(self, offset, items, limit):
+        next_offset = offset + len(items)
+        if len(items) < limit or self._limit_for(next_offset) == 0:
+            return True
+        return self.total_affected_items is not None and next_offset >= self.total_affected_items
+
+    def _as_payload(self, items):
+        total = self.total_affected_items if self.total_affected_items is not None else len(items)
+        return {"data": {"affected_items": items, "total_affected_items": total}, "error": self.error or 0}
+
+
+class WazuhPager(PagerBase):
+    """Lazy offset/limit walk over a getter's affected_items.
+
+    Iterating yields items one by one, fetching a page only when the previous
+    one is used up; with ``prefetch`` the next page is requested while the
+    current one is being processed. ``total()`` answers from
+    ``total_affected_items`` without downloading the whole collection.
+    """
+
+    def _fetch(self, offset, limit):
+        return getattr(self.client, self.getter)(limit=limit, offset=offset, **self.filters)
+
+    def pages(self):
+        offset, limit = 0, self._limit_for(0)
+        if limit == 0:
+            return
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        try:
+            payload = self._fetch(offset, limit)
+            while True:
+                items = self._accept(payload)
+                if not items:
+                    return
+                last = self._is_last(offset, items, limit)
+                next_offset = offset + len(items)
+                next_limit = self._limit_for(next_offset)
+                pending = None
+                if executor and not last:
+                    pending = executor.submit(self._fetch, next_offset, next_limit)
+                yield items
+                if last:
+                    return
+                payload = pending.result() if pending else self._fetch(next_offset, next_limit)
+                offset, limit = next_offset, next_limit
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page
+
+    def total(self):
+        """Total matching items, read from a single one-item page if not known yet"""
+        if self.total_affected_items is None:
+            self._accept(self._fetch(0, 1))
+        return self.total_affected_items
+
+    def collect(self):
+        """Drain every page into a single get_*-style payload"""
+        return self._as_payload(list(self))
+
+
+class WazuhEndpoints:
+    """Wazuh API surface shared by the sync and async clients.
+
+    Each getter only describes the request; the subclass's ``_get``/``_put``
+    perform it, so on AsyncWazuhClient every method returns an awaitable.
+    """
+
+    @staticmethod
+    def _error_payload(error, empty_items=True):
+        if empty_items:
+            return {"data": {"affected_items": []}, "error": error}
+        return {"error": error}
+
+    @staticmethod
+    def _cache_key(path, params):
+        return (path, tuple(sorted((params or {}).items())))
+
+    def invalidate_cache(self, path_prefix=None):
+        """Drop cached responses, e.g. invalidate_cache("/rules") after a rule change"""
+        if path_prefix is None:
+            return response_cache.invalidate()
+        return response_cache.invalidate(lambda key: key[0] == path_prefix or key[0].startswith(path_prefix.rstrip("/") + "/"))
+
+    def cache_stats(self):
+        """Hit/miss counters of the shared response cache"""
+        return response_cache.stats()
+
+    def breaker_states(self):
+        """Circuit-breaker state and adaptive timeout per endpoint"""
+        return resilience.snapshot()
+
+    def coalescing_stats(self):
+        """How many reads ran upstream vs. joined an identical in-flight read"""
+        return self._inflight.stats()
+
+    @staticmethod
+    def _normalize_calls(calls):
+        """Turn {name: "get_x" | ("get_x", kwargs)} into {name: (method, kwargs)}"""
+        normalized = {}
+        for name, call in calls.items():
+            if isinstance(call, str):
+                normalized[name] = (call, {})
+            else:
+                method, kwargs = call
+                normalized[name] = (method, kwargs or {})
+        return normalized
+
+    @staticmethod
+    def _page_params(params, limit, offset, fields=None):
+        if fields:
+            # Wazuh select= projection: only these (dotted) fields come back
+            params["select"] = ",".join(fields)
+        if limit is not None:
+            params["limit"] = limit
+        if offset:
+            params["offset"] = offset
+        return params
+
+    def get_alerts(self, limit=50, severity_min=5, sort=None, q=None, offset=0, fields=None):
+        """Fetch recent alerts"""
+        query = f"rule.level>{severity_min}"
+        if q:
+            query += f";{q}"
+        params = {"q": query}
+        if sort:
+            params["sort"] = sort
+        return self._get("/alerts", self._page_params(params, limit, offset, fields))
+
+    def get_agents(self, limit=None, offset=0, status=None, fields=None):
+        """List all agents"""
+        params = {}
+        if status:
+            params["status"] = status
+        return self._get("/agents", self._page_params(params, limit, offset, fields))
+
+    def get_rules(self, rule_id=None, limit=None, offset=0, fields=None):
+        """Get Wazuh rules"""
+        params = {}
+        if rule_id:
+            params["rule_ids"] = rule_id
+        return self._get("/rules", self._page_params(params, limit, offset, fields))
+
+    def get_fim_events(self, agent_id=None, limit=50, offset=0, fields=None):
+        """Get File Integrity Monitoring events"""
+        params = {}
+        if agent_id:
+            params["agents_list"] = agent_id
+        return self._get("/fim/events", self._page_params(params, limit, offset, fields))
+
+    def iter_alerts(self, severity_min=5, sort=None, q=None, fields=None, page_size=DEFAULT_PAGE_SIZE, max_items=None, prefetch=False):
+        """Lazily page through every matching alert"""
+        return self._pager_class(self, "get_alerts", {"severity_min": severity_min, "sort": sort, "q": q, "fields": fields},
+                                 page_size, max_items, prefetch)
+
+    def iter_agents(self, status=None, fields=None, page_size=DEFAULT_PAGE_SIZE, max_items=None, prefetch=False):
+        """Lazily page through every agent"""
+        return self._pager_class(self, "get_agents", {"status": status, "fields": fields}, page_size, max_items, prefetch)
+
+    def iter_rules(self, rule_id=None, fields=None, page_size=DEFAULT_PAGE_SIZE, max_items=None, prefetch=False):
+        """Lazily page through every rule"""
+        return self._pager_class(self, "get_rules", {"rule_id": rule_id, "fields": fields}, page_size, max_items, prefetch)
+
+    def iter_fim_events(self, agent_id=None, fields=None, page_size=DEFAULT_PAGE_SIZE, max_items=None, prefetch=False):
+        """Lazily page through every FIM event"""
+        return self._pager_class(self, "get_fim_events", {"agent_id": agent_id, "fields": fields}, page_size, max_items, prefetch)
+
+    @staticmethod
+    def _alert_window_key(severity_min, q, fields):
+        if fields:
+            # The cursor needs these even when the caller projects them away
+            fields = list(fields) + [f for f in ("id", "timestamp") if f not in fields]
+        return (severity_min, q, tuple(fields) if fields else None), fields
+
+    @classmethod
+    def _alert_window(cls, severity_min, q, fields, window_size):
+        key, fields = cls._alert_window_key(severity_min, q, fields)
+        with _alert_windows_lock:
+            window = alert_windows.get(key)
+            if window is None:
+                window = alert_windows[key] = AlertWindow(window_size)
+        window.resize(window_size)
+        return window, fields
+
+    def _cursor_pager(self, window, severity_min, q, fields):
+        """Pager for the alerts newer than the window's cursor (the newest ``max_size`` when unprimed)"""
+        if window.primed:
+            q = f"{q};{window.cursor_query()}" if q else window.cursor_query()
+        return self.iter_alerts(severity_min=severity_min, sort="-timestamp", q=q, fields=fields,
+                                max_items=window.max_size, prefetch=True)
+
+    def alert_window(self, severity_min=5, q=None, fields=None, limit=None):
+        """Alerts already merged by poll_alerts for this query, newest first, without a round trip.
+
+        Only reads: the window is neither created nor resized (resizing a full
+        one would reset it), and it is empty until poll_alerts has run.
+        """
+        key, _ = self._alert_window_key(severity_min, q, fields)
+        with _alert_windows_lock:
+            window = alert_windows.get(key)
+        if window is None:
+            return {"data": {"affected_items": [], "total_affected_items": 0}, "error": 0}
+        return window.snapshot(limit)
+
+    def get_sca_checks(self, agent_id=None):
+        """Get Security Configuration Assessment results"""
+        return self._get(f"/sca/{agent_id}" if agent_id else "/sca")
+
+    def get_active_response(self):
+        """Get active response commands"""
+        return self._get("/active-response")
+
+    def trigger_active_response(self, command, agent_id, arguments=None):
+        """Trigger active response command"""
+        payload = {
+            "command": command,
+            "agents_list": [agent_id] if agent_id else ["all"]
+        }
+        if arguments:
+            payload["arguments"] = arguments
+        return self._put("/active-response", payload)
+
+    def get_vulnerabilities(self, agent_id=None):
+        """Get vulnerability assessment results"""
+        return self._get(f"/vulnerability/{agent_id}" if agent_id else "/vulnerability")
+
+    def get_logs(self, agent_id=None, limit=50, query=None):
+        """Get logs from agents"""
+        params = {"limit": limit}
+        if agent_id:
+            params["agents_list"] = agent_id
+        if query:
+            params["q"] = query
+        return self._get("/logs", params)
+
+    def get_decoders(self, decoder_name=None):
+        """Get Wazuh decoders"""
+        params = {}
+        if decoder_name:
+            params["decoder"] = decoder_name
+        return self._get("/decoders", params)
+
+    def get_agent_config(self, agent_id):
+        """Get agent configuration"""
+        return self._get(f"/agents/{agent_id}/config", empty_items=False)
+
+
+class WazuhClient(WazuhEndpoints):
+    _pager_class = WazuhPager
+
+    def __init__(self, pool_size=None):
         self.host = os.getenv("WAZUH_HOST")
         self.port = os.getenv("WAZUH_PORT")
         self.user = os.getenv("WAZUH_USER")
         self.password = os.getenv("WAZUH_PASSWORD")
         self.base_url = f"https://{self.host}:{self.port}"
-        self.token = self._authenticate()
-    
+        self.pool_size = pool_size or DEFAULT_POOL_SIZE
+        self.session = self._build_session()
+        self._inflight = SingleFlight()
+        self._token = None
+        self._token_expires_at = 0.0
+        self._auth_lock = threading.Lock()
+
+    def _build_session(self):
+        """Session backed by a keep-alive pool so TLS handshakes are paid once per connection"""
+        session = requests.Session()
+        session.verify = False
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=False)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def pool_stats(self):
+        """Connection-pool usage for the manager: connections opened vs requests served"""
+        stats = {"pool_size": self.pool_size, "connections_opened": 0, "requests_sent": 0, "idle_connections": 0}
+        adapter = self.session.get_adapter(self.base_url)
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["connections_opened"] += pool.num_connections
+            stats["requests_sent"] += pool.num_requests
+            stats["idle_connections"] += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        stats["reused_requests"] = max(stats["requests_sent"] - stats["connections_opened"], 0)
+        return stats
+
+    @property
+    def token(self):
+        """Cached JWT, re-authenticating when missing or close to expiry"""
+        if self._token and time.time() < self._token_expires_at - TOKEN_REFRESH_MARGIN:
+            return self._token
+        with self._auth_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._token and time.time() < self._token_expires_at - TOKEN_REFRESH_MARGIN:
+                return self._token
+            self._token = self._authenticate()
+            self._token_expires_at = _token_expiry(self._token) if self._token else 0.0
+            return self._token
+
+    def invalidate_token(self, stale_token=None):
+        """Drop the cached JWT so the next request authenticates again"""
+        with self._auth_lock:
+            if stale_token is None or self._token == stale_token:
+                self._token = None
+                self._token_expires_at = 0.0
+
     def _authenticate(self):
         """Get JWT token from Wazuh using Basic Auth"""
         auth = f"{self.user}:{self.password}".encode()
@@ -25,14 +418,13 @@ class WazuhClient:
         }
         try:
             print(f"Authenticating with {self.user}@{self.host}:{self.port}")
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/security/user/authenticate",
                 headers=headers,
-                verify=False,
                 timeout=10
             )
             print(f"Auth response: {response.status_code}")
-            
+
             if response.status_code == 200:
                 token = response.json()['data']['token']
                 print("✅ JWT token obtained successfully")
@@ -43,179 +435,112 @@ class WazuhClient:
         except Exception as e:
             print(f"❌ Authentication error: {e}")
             return None
-    
-    def _get_headers(self):
+
+    def _get_headers(self, token=None):
         return {
-            'Authorization': f'Bearer {self.token}',
+            'Authorization': f'Bearer {token or self.token}',
             'Content-Type': 'application/json'
         }
-    
-    def get_alerts(self, limit=50, severity_min=5):
-        """Fetch recent alerts"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/alerts?limit={limit}&q=rule.level>{severity_min}&pretty=true",
-                headers=self._get_headers(),
-                verify=False,
-                timeout=10
-            )
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_agents(self):
-        """List all agents"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/agents?pretty=true",
-                headers=self._get_headers(),
-                verify=False,
-                timeout=10
-            )
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_rules(self, rule_id=None):
-        """Get Wazuh rules"""
-        try:
-            url = f"{self.base_url}/rules?pretty=true"
-            if rule_id:
-                url += f"&rule_ids={rule_id}"
-            response = requests.get(url, headers=self._get_headers(), verify=False, timeout=10)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_fim_events(self, agent_id=None, limit=50):
-        """Get File Integrity Monitoring events"""
-        try:
-            url = f"{self.base_url}/fim/events?pretty=true&limit={limit}"
-            if agent_id:
-                url += f"&agents_list={agent_id}"
-            response = requests.get(url, headers=self._get_headers(), verify=False, timeout=10)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_sca_checks(self, agent_id=None):
-        """Get Security Configuration Assessment results"""
-        try:
-            url = f"{self.base_url}/sca/{agent_id}?pretty=true" if agent_id else f"{self.base_url}/sca?pretty=true"
-            response = requests.get(url, headers=self._get_headers(), verify=False, timeout=10)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_active_response(self):
-        """Get active response commands"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/active-response?pretty=true",
-                headers=self._get_headers(),
-                verify=False,
-                timeout=10
-            )
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def trigger_active_response(self, command, agent_id, arguments=None):
-        """Trigger active response command"""
-        try:
-            payload = {
-                "command": command,
-                "agents_list": [agent_id] if agent_id else ["all"]
-            }
-            if arguments:
-                payload["arguments"] = arguments
-            
-            response = requests.put(
-                f"{self.base_url}/active-response",
-                headers=self._get_headers(),
-                json=payload,
-                verify=False,
-                timeout=10
-            )
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"error": str(e)}
-    
-    def get_vulnerabilities(self, agent_id=None):
-        """Get vulnerability assessment results"""
-        try:
-            url = f"{self.base_url}/vulnerability/{agent_id}?pretty=true" if agent_id else f"{self.base_url}/vulnerability?pretty=true"
-            response = requests.get(url, headers=self._get_headers(), verify=False, timeout=10)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_logs(self, agent_id=None, limit=50, query=None):
-        """Get logs from agents"""
-        try:
-            url = f"{self.base_url}/logs?pretty=true&limit={limit}"
-            if agent_id:
-                url += f"&agents_list={agent_id}"
-            if query:
-                url += f"&q={query}"
-            response = requests.get(url, headers=self._get_headers(), verify=False, timeout=10)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
-        except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_decoders(self, decoder_name=None):
-        """Get Wazuh decoders"""
+
+    def _request(self, method, url, timeout=10, **kwargs):
+        """Send an authenticated request, re-authenticating once on HTTP 401"""
+        token = self.token
+        response = self.session.request(method, url, headers=self._get_headers(token), timeout=timeout, **kwargs)
+        if response.status_code == 401:
+            # Token revoked or expired early on the manager side
+            self.invalidate_token(token)
+            response = self.session.request(method, url, headers=self._get_headers(), timeout=timeout, **kwargs)
+        return response
+
+    def _get(self, path, params=None, empty_items=True):
+        """GET an endpoint, folding failures into the usual error payload"""
+        ttl = cache_ttl(path)
+        key = self._cache_key(path, params)
+        if ttl:
+            cached = response_cache.get(key)
+            if cached is not None:
+                return cached
+        # Identical reads already in flight share that request's result
+        return self._inflight.do(key, lambda: self._fetch(path, params, empty_items, ttl, key))
+
+    def _fetch(self, path, params, empty_items, ttl, key):
         try:
-            url = f"{self.base_url}/decoders?pretty=true"
-            if decoder_name:
-                url += f"&decoder={decoder_name}"
-            response = requests.get(url, headers=self._get_headers(), verify=False, timeout=10)
+            url = f"{self.base_url}{path}"
+            response = resilience.call(path, lambda timeout: self._request("GET", url, params=params, timeout=timeout),
+                                       limit=(params or {}).get("limit"))
             if response.status_code == 200:
-                return response.json()
-            else:
-                return {"data": {"affected_items": []}, "error": f"HTTP {response.status_code}: {response.text}"}
+                payload = response.json()
+                if ttl:
+                    response_cache.set(key, payload, ttl)
+                return payload
+            return self._error_payload(f"HTTP {response.status_code}: {response.text}", empty_items)
         except Exception as e:
-            return {"data": {"affected_items": []}, "error": str(e)}
-    
-    def get_agent_config(self, agent_id):
-        """Get agent configuration"""
+            return self._error_payload(str(e), empty_items)
+
+    def fetch_many(self, calls, max_concurrency=None):
+        """Run independent reads concurrently and return {name: payload}.
+
+        ``calls`` maps a result name to a getter name or ``(getter, kwargs)``.
+        A failing call yields the usual error payload under its own name, so
+        callers always get partial results for the calls that succeeded.
+        ``iter_*`` getters are drained into a single payload.
+        """
+        calls = self._normalize_calls(calls)
+        if not calls:
+            return {}
+        workers = max(1, min(max_concurrency or DEFAULT_MAX_CONCURRENCY, self.pool_size, len(calls)))
+
+        def run(method, kwargs):
+            try:
+                result = getattr(self, method)(**kwargs)
+                return result.collect() if isinstance(result, WazuhPager) else result
+            except Exception as e:
+                return self._error_payload(str(e))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {name: executor.submit(run, method, kwargs) for name, (method, kwargs) in calls.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def poll_alerts(self, severity_min=5, q=None, fields=None, window_size=DEFAULT_ALERT_WINDOW):
+        """Fetch only the alerts newer than the last poll of this query and return the merged window.
+
+        The first poll downloads the newest ``window_size`` alerts; later ones
+        ask for ``timestamp`` at or after the cursor, so steady-state traffic
+        follows the alert rate rather than the poll rate.
+        """
+        window, fields = self._alert_window(severity_min, q, fields, window_size)
+        pager = self._cursor_pager(window, severity_min, q, fields)
+        payload = pager.collect()
+        if payload.get('error'):
+            return payload
+        window.merge(payload['data']['affected_items'], total=pager.total_affected_items)
+        return window.snapshot(window_size)
+
+    def _put(self, path, payload):
+        """PUT a JSON payload, folding failures into an error payload"""
         try:
-            response = requests.get(
-                f"{self.base_url}/agents/{agent_id}/config?pretty=true",
-                headers=self._get_headers(),
-                verify=False,
-                timeout=10
-            )
+            url = f"{self.base_url}{path}"
+            # Not retried: replaying an active response could run it twice
+            response = resilience.call(path, lambda timeout: self._request("PUT", url, json=payload, timeout=timeout),
+                                       idempotent=False)
             if response.status_code == 200:
+                # Anything cached under a path we just changed is now stale
+                self.invalidate_cache(path)
                 return response.json()
-            else:
-                return {"error": f"HTTP {response.status_code}: {response.text}"}
+            return self._error_payload(f"HTTP {response.status_code}: {response.text}", empty_items=False)
         except Exception as e:
-            return {"error": str(e)}
\ No newline at end of file
+            return self._error_payload(str(e), empty_items=False)
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_wazuh_client():
+    """Return the process-wide WazuhClient so every caller reuses one JWT"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = WazuhClient()
+    return _shared_client
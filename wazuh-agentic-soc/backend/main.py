@@ -1,3 +1,9 @@
+import time
+
+# Import time of this module, reported by /api/health and bench_startup.py
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from agents.orchestrator import SOCOrchestrator
@@ -5,10 +11,80 @@ from api.stats import router as stats_router
 from api.rag import router as rag_router
 from api.dashboard import router as dashboard_router
 from api.wazuh_proxy import router as wazuh_proxy_router
+from integrations.wazuh_client import get_wazuh_client
+from integrations.wazuh_async_client import get_async_wazuh_client
+from rag_system import get_rag_system
+from scheduler import QueryScheduler, QueueFullError, classify
+from alert_watcher import AlertWatcher
 import json
 import asyncio
+import os
+import threading
+
+# Import tool modules, read the RAG index and log in to Wazuh in the
+# background after startup, so the first chat query does not pay for it
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# Queued plus running queries one chat connection may have; past it that connection gets "busy",
+# so a single socket cannot fill the scheduler's queue for every other analyst
+CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "4"))
 
-app = FastAPI(title="Agentic Wazuh SOC API")
+# Milliseconds for each startup phase, exposed under "startup" in /api/health
+startup_timings = {}
+
+orchestrator = None
+_orchestrator_task = None
+
+def _build_orchestrator():
+    global orchestrator
+    started = time.perf_counter()
+    try:
+        orchestrator = SOCOrchestrator()
+        print("✅ SOC Orchestrator initialized successfully")
+    except Exception as e:
+        print(f"❌ Failed to initialize orchestrator: {e}")
+    finished = time.perf_counter()
+    startup_timings["orchestrator_ms"] = round((finished - started) * 1000, 1)
+    # From process import to the point chat queries stop waiting on the orchestrator
+    startup_timings["ready_ms"] = round((finished - _import_started) * 1000, 1)
+    return orchestrator
+
+async def get_orchestrator():
+    """The SOC orchestrator, built once off the event loop; None if it could not be configured"""
+    global _orchestrator_task
+    if _orchestrator_task is None:
+        _orchestrator_task = asyncio.ensure_future(asyncio.to_thread(_build_orchestrator))
+    return await asyncio.shield(_orchestrator_task)
+
+def _warm_up_sync(soc):
+    soc.load_tools()
+    get_rag_system().load()
+    get_wazuh_client().token
+
+async def warm_up():
+    """Best-effort: anything that fails here is simply done again on first use"""
+    started = time.perf_counter()
+    try:
+        soc = await get_orchestrator()
+        if soc is not None:
+            await asyncio.to_thread(_warm_up_sync, soc)
+        await get_async_wazuh_client().get_token()
+    except Exception as e:
+        print(f"⚠️ Warm-up incomplete: {e}")
+    startup_timings["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Building the orchestrator imports the Gemini client (the slowest import);
+    # start it now but serve requests meanwhile, chat queries wait for it
+    asyncio.ensure_future(get_orchestrator())
+    warmup = asyncio.create_task(warm_up()) if STARTUP_WARMUP else None
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    await get_async_wazuh_client().aclose()
+
+app = FastAPI(title="Agentic Wazuh SOC API", lifespan=lifespan)
 
 # Enable CORS for React frontend
 app.add_middleware(
@@ -25,24 +101,165 @@ app.include_router(rag_router, prefix="/api/rag")
 app.include_router(dashboard_router, prefix="/api/dashboard")
 app.include_router(wazuh_proxy_router, prefix="/api/wazuh")
 
-# Initialize orchestrator
-try:
-    orchestrator = SOCOrchestrator()
-    print("✅ SOC Orchestrator initialized successfully")
-except Exception as e:
-    print(f"❌ Failed to initialize orchestrator: {e}")
-    orchestrator = None
-
 # Store active connections
 active_connections: list[WebSocket] = []
 
+# Orchestrator work runs here rather than on the default executor
+scheduler = QueryScheduler()
+
+# One Wazuh poller shared by every /ws/alerts subscriber
+alert_watcher = AlertWatcher()
+
+def response_meta(response: dict) -> dict:
+    return {key: response[key] for key in ("tool", "mode", "tool_ms", "latency_ms")}
+
+class ChatSession:
+    """One /ws/chat connection: serialized sends plus the queries it has in flight.
+
+    Each query runs as its own task, so a slow one does not hold up the
+    next, and answers go out tagged with their ``request_id`` in whatever
+    order they finish.
+    """
+    
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        # request_id -> {"task", "cancel" (threading.Event), "job"}
+        self.in_flight = {}
+        self._send_lock = asyncio.Lock()
+        self._next_id = 0
+    
+    def new_request_id(self) -> str:
+        self._next_id += 1
+        return f"srv-{self._next_id}"
+    
+    async def send(self, message: dict, request_id=None):
+        if request_id is not None:
+            message = {**message, "request_id": request_id}
+        async with self._send_lock:
+            await self.websocket.send_json(message)
+    
+    async def admit(self, request_id) -> bool:
+        """Whether a new query may start; tells the client why not"""
+        if request_id in self.in_flight:
+            # Replies are routed by request_id, so a second query under it could not be told apart
+            await self.send({
+                "type": "error",
+                "content": f"A query with request_id {request_id!r} is still in flight; use a new id."
+            }, request_id)
+            return False
+        if len(self.in_flight) >= CHAT_MAX_IN_FLIGHT:
+            await self.send({
+                "type": "busy",
+                "content": f"You already have {len(self.in_flight)} queries in progress. "
+                           "Wait for one to finish or cancel it.",
+                "in_flight": len(self.in_flight)
+            }, request_id)
+            return False
+        return True
+
+    def start(self, request_id, message: dict):
+        entry = {"cancel": threading.Event(), "job": None}
+        self.in_flight[request_id] = entry
+        entry["task"] = asyncio.create_task(run_chat_query(self, request_id, message, entry))
+    
+    async def cancel(self, request_id):
+        """Drop a queued query, or stop a running one before (or during) its LLM call"""
+        entry = self.in_flight.get(request_id)
+        if entry is None:
+            await self.send({"type": "cancelled", "found": False}, request_id)
+            return
+        entry["cancel"].set()
+        if entry["job"] is not None:
+            scheduler.cancel(entry["job"])
+    
+    def close(self):
+        for entry in self.in_flight.values():
+            entry["cancel"].set()
+            if entry["job"] is not None:
+                scheduler.cancel(entry["job"])
+            entry["task"].cancel()
+        self.in_flight.clear()
+
+async def submit_query(session: ChatSession, request_id, user_query: str, fn):
+    """Queue ``fn`` for this connection; tells the client if it has to wait, returns None when refused"""
+    try:
+        job = scheduler.submit(id(session.websocket), fn, classify(user_query))
+    except QueueFullError as e:
+        await session.send({
+            "type": "busy",
+            "content": f"The SOC assistant is at capacity ({e}). Please try again in a moment.",
+            "queue_depth": scheduler.depth()
+        }, request_id)
+        return None
+    position = scheduler.position(job)
+    if position:
+        await session.send({"type": "queued", "position": position, "queue_depth": scheduler.depth()}, request_id)
+    return job
+
+async def run_chat_query(session: ChatSession, request_id, message: dict, entry: dict):
+    """Run one chat message on the scheduler and send its answer (or progress, tokens and ``done``).
+
+    With ``stream`` set, sends ``progress`` and ``token`` messages, then a
+    ``done`` message with the full answer and timing metadata (including
+    time to first token); otherwise a single ``bot`` message.
+    """
+    user_query = message.get("query", "")
+    response_mode = message.get("mode")
+    stream = bool(message.get("stream"))
+    cancel = entry["cancel"]
+    loop = asyncio.get_event_loop()
+    events = asyncio.Queue()
+    started = time.perf_counter()
+    first_token_ms = None
+    
+    def emit(event):
+        # Called from the worker thread; the queue keeps events in order
+        if not cancel.is_set():
+            loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    try:
+        job = await submit_query(session, request_id, user_query,
+                                 lambda: orchestrator.run_query(user_query, response_mode, emit=emit if stream else None, cancel=cancel))
+        if job is None:
+            return
+        entry["job"] = job
+        job.future.add_done_callback(lambda _: events.put_nowait(None))
+        
+        while (event := await events.get()) is not None:
+            if event["type"] == "token" and first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+            await session.send(event, request_id)
+        
+        if job.future.cancelled() or cancel.is_set():
+            # Dropped from the queue, or stopped at a checkpoint while running
+            await session.send({"type": "cancelled", "found": True}, request_id)
+            return
+        
+        response = job.future.result()
+        if stream:
+            await session.send({
+                "type": "done",
+                "content": response["content"],
+                "meta": {**response_meta(response), "first_token_ms": first_token_ms}
+            }, request_id)
+        else:
+            await session.send({
+                "type": "bot",
+                "content": response["content"],
+                "meta": response_meta(response)
+            }, request_id)
+    finally:
+        if session.in_flight.get(request_id) is entry:
+            del session.in_flight[request_id]
+
 @app.websocket("/ws/chat")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     active_connections.append(websocket)
+    session = ChatSession(websocket)
     
     # Send welcome message
-    await websocket.send_json({
+    await session.send({
         "type": "bot",
         "content": "Hello! I'm your SOC assistant. Ask me about Wazuh alerts, rules, or agents."
     })
@@ -53,28 +270,26 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             message = json.loads(data)
             
-            user_query = message.get("query", "")
+            # {"type": "cancel", "request_id": ...} stops a query still in flight
+            if message.get("type") == "cancel":
+                await session.cancel(message.get("request_id"))
+                continue
+            
+            # Optional: "request_id" (echoed on every reply; generated if absent),
+            # "mode": "llm", "direct", "template" or "auto" (server default),
+            # "stream": true switches to progress/token/done messages
+            request_id = message.get("request_id") or session.new_request_id()
             
-            if not orchestrator:
-                await websocket.send_json({
+            if not await get_orchestrator():
+                await session.send({
                     "type": "bot",
                     "content": "Sorry, the SOC assistant is not available. Please check your Gemini API key configuration."
-                })
+                }, request_id)
                 continue
             
-            # Process through orchestrator in a separate thread
-            def process_query():
-                return orchestrator.process_query(user_query)
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, process_query)
-            
-            # Send response back
-            await websocket.send_json({
-                "type": "bot",
-                "content": response
-            })
+            # Queries run concurrently; the loop goes straight back to receiving
+            if await session.admit(request_id):
+                session.start(request_id, message)
             
     except WebSocketDisconnect:
         active_connections.remove(websocket)
@@ -82,18 +297,62 @@ async def websocket_endpoint(websocket: WebSocket):
         print(f"WebSocket error: {e}")
         if websocket in active_connections:
             active_connections.remove(websocket)
+    finally:
+        session.close()
+
+@app.websocket("/ws/alerts")
+async def alerts_feed(websocket: WebSocket):
+    """Live alerts and dashboard stats: a snapshot, then only what changes"""
+    await websocket.accept()
+    queue = alert_watcher.subscribe()
+    
+    async def wait_for_disconnect():
+        # The client never sends; receiving is what notices a closed tab on a quiet manager,
+        # where no broadcast would fail, so the watcher stops polling once nobody listens
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    disconnected = asyncio.create_task(wait_for_disconnect())
+    message = None
+    try:
+        while True:
+            message = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if message not in done:
+                break
+            await websocket.send_json(message.result())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Alert feed error: {e}")
+    finally:
+        disconnected.cancel()
+        if message is not None:
+            message.cancel()
+        alert_watcher.unsubscribe(queue)
 
 @app.get("/api/health")
 async def health_check():
     return {
         "status": "healthy",
-        "orchestrator_ready": orchestrator is not None
+        "orchestrator_ready": orchestrator is not None,
+        "wazuh_pool": get_wazuh_client().pool_stats(),
+        "wazuh_cache": get_wazuh_client().cache_stats(),
+        "wazuh_coalescing": get_wazuh_client().coalescing_stats(),
+        "wazuh_breakers": get_wazuh_client().breaker_states(),
+        "response_latency": orchestrator.latency_stats() if orchestrator else {},
+        "llm_cache": orchestrator.llm.stats() if orchestrator else {},
+        "scheduler": scheduler.stats(),
+        "alert_watcher": alert_watcher.stats(),
+        "startup": startup_timings
     }
 
 @app.get("/")
 async def root():
     return {"message": "Agentic Wazuh SOC API is running"}
 
+startup_timings["import_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting Agentic Wazuh SOC Backend...")
@@ -1,116 +1,499 @@
 import os
-import faiss
+import re
+import json
+import math
+import zlib
 import numpy as np
 import pickle
 import hashlib
+import threading
+from collections import Counter
 from typing import List, Any
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+import ann_index
+from vector_store import TextStore, VectorStore
+
+# faiss, the text splitter and the Gemini client are imported on first use:
+# together they cost well over a second at startup and most requests need none of them
+
+# Embedding backend for new indexes: "ngram" (default) or "hash" (the original SHA-256 hasher)
+RAG_EMBEDDINGS = os.getenv("RAG_EMBEDDINGS", "ngram")
+RAG_EMBEDDING_DIM = int(os.getenv("RAG_EMBEDDING_DIM", "0")) or None
+
+# Compact (drop duplicate chunks, start a new store generation) once the rows
+# appended since the last compaction reach this share of the store, and at least RAG_COMPACT_MIN_ROWS
+RAG_COMPACT_RATIO = float(os.getenv("RAG_COMPACT_RATIO", "0.5"))
+RAG_COMPACT_MIN_ROWS = int(os.getenv("RAG_COMPACT_MIN_ROWS", "1000"))
 
 class SimpleHashEmbeddings:
+    """Whole-text SHA-256 hash: deterministic but with no notion of similarity"""
+
+    name = "hash"
+    DIGEST_SIZE = 32  # bytes per SHA-256 digest
+
     def __init__(self, dim: int = 256):
         self.dim = dim
+        # Digest i of a text is sha256(text + i as 4 little-endian bytes)
+        self._counters = [c.to_bytes(4, "little", signed=False)
+                          for c in range(-(-dim // self.DIGEST_SIZE))]
 
-    def _text_to_vector(self, text: str) -> np.ndarray:
-        out = np.zeros(self.dim, dtype=np.float32)
-        i = 0
-        counter = 0
-        while i < self.dim:
-            m = hashlib.sha256()
-            m.update(text.encode("utf-8"))
-            m.update(counter.to_bytes(4, "little", signed=False))
-            digest = m.digest()
-            for b in digest:
-                if i >= self.dim:
-                    break
-                out[i] = (b - 128) / 128.0
-                i += 1
-            counter += 1
-        norm = np.linalg.norm(out)
-        if norm > 0:
-            out = out / norm
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Unit-normalized (len(texts), dim) float32 matrix, built straight from the digest bytes"""
+        digests = bytearray()
+        for text in texts:
+            # Hash the text once; each counter digest continues from a copy
+            base = hashlib.sha256(text.encode("utf-8"))
+            for counter in self._counters:
+                m = base.copy()
+                m.update(counter)
+                digests += m.digest()
+        width = len(self._counters) * self.DIGEST_SIZE
+        raw = np.frombuffer(bytes(digests), dtype=np.uint8).reshape(len(texts), width)[:, :self.dim]
+        out = (raw.astype(np.float32) - 128) / np.float32(128)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
         return out
 
+    def _text_to_vector(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return [self._text_to_vector(t).tolist() for t in texts]
+        return self.embed_batch(texts).tolist()
 
     def embed_query(self, text: str) -> List[float]:
         return self._text_to_vector(text).tolist()
 
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Too common to say anything about which chunk answers a question
+STOP_WORDS = frozenset("""
+a an and are as at be by can do does for from has have how i in is it its me my of on or
+should that the their there this to was we were what when where which who why will with you your
+""".split())
+
+class HashedNgramEmbeddings:
+    """Hashed word and character n-gram vectors, so similar texts get nearby vectors.
+
+    Each word contributes itself plus its character trigrams (with
+    boundary markers, so "bruteforce" still overlaps "brute force" and
+    typos only lose a few grams); each adjacent word pair adds a bigram.
+    Features are hashed with crc32 (stable across processes) into ``dim``
+    signed buckets, weighted by sublinear term frequency and L2-normalized,
+    so FAISS L2 distance ranks by cosine similarity. Nothing is fitted:
+    there is no vocabulary to persist and a chunk's vector never changes
+    as the corpus grows.
+    """
+
+    name = "ngram"
+    WORD_WEIGHT = 1.0
+    BIGRAM_WEIGHT = 0.7
+    CHAR_WEIGHT = 0.25
+    CACHE_LIMIT = 500_000
+
+    def __init__(self, dim: int = 512, char_ngram: int = 3):
+        self.dim = dim
+        self.char_ngram = char_ngram
+        # word or bigram -> (buckets, signed weights); vocabularies repeat heavily
+        self._features = {}
+
+    def _hash(self, feature: str):
+        h = zlib.crc32(feature.encode("utf-8"))
+        return h % self.dim, (1.0 if h & 0x80000000 else -1.0)
+
+    def _word_features(self, word: str):
+        cached = self._features.get(word)
+        if cached is None:
+            marked = f"<{word}>"
+            n = self.char_ngram
+            grams = [marked[i:i + n] for i in range(len(marked) - n + 1)]
+            hashed = [self._hash("w:" + word)] + [self._hash("c:" + gram) for gram in grams]
+            weights = [self.WORD_WEIGHT] + [self.CHAR_WEIGHT] * len(grams)
+            cached = ([bucket for bucket, _ in hashed], [sign * w for (_, sign), w in zip(hashed, weights)])
+            self._remember(word, cached)
+        return cached
+
+    def _bigram_feature(self, bigram: str):
+        cached = self._features.get(bigram)
+        if cached is None:
+            bucket, sign = self._hash("b:" + bigram)
+            cached = ([bucket], [sign * self.BIGRAM_WEIGHT])
+            self._remember(bigram, cached)
+        return cached
+
+    def _remember(self, key, features):
+        if len(self._features) >= self.CACHE_LIMIT:
+            self._features.clear()
+        self._features[key] = features
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Unit-normalized (len(texts), dim) float32 matrix"""
+        # Buckets and weights for the whole batch, plus how many belong to each text
+        buckets, vals, counts = [], [], []
+        for text in texts:
+            words = [w for w in _WORD.findall(text.lower()) if w not in STOP_WORDS]
+            terms = [(self._word_features(word), tf) for word, tf in Counter(words).items()]
+            terms += [(self._bigram_feature(bigram), tf)
+                      for bigram, tf in Counter(map(" ".join, zip(words, words[1:]))).items()]
+            start = len(buckets)
+            for (term_buckets, weights), tf in terms:
+                buckets.extend(term_buckets)
+                if tf == 1:
+                    vals.extend(weights)
+                else:
+                    scale = 1 + math.log(tf)
+                    vals.extend([w * scale for w in weights])
+            counts.append(len(buckets) - start)
+        # One bincount over (row * dim + bucket) sums every contribution of the batch
+        cells = np.array(buckets, dtype=np.int64) + np.repeat(np.arange(len(texts), dtype=np.int64) * self.dim, counts)
+        out = np.bincount(cells, weights=np.array(vals, dtype=np.float64), minlength=len(texts) * self.dim)
+        out = out.astype(np.float32).reshape(len(texts), self.dim)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_batch(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0].tolist()
+
+EMBEDDING_BACKENDS = {
+    SimpleHashEmbeddings.name: SimpleHashEmbeddings,
+    HashedNgramEmbeddings.name: HashedNgramEmbeddings,
+}
+
+def make_embeddings(backend: str = None, dim: int = None):
+    """Embedding backend by name (RAG_EMBEDDINGS by default), at its default dim unless given"""
+    backend = backend or RAG_EMBEDDINGS
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown RAG_EMBEDDINGS backend {backend!r}; choose from {', '.join(EMBEDDING_BACKENDS)}")
+    cls = EMBEDDING_BACKENDS[backend]
+    return cls(dim=dim) if dim else cls()
+
 class RAGSystem:
-    def __init__(self, persist_directory: str = "vectorstore"):
+    """FAISS-backed knowledge base over an append-only, memory-mapped VectorStore, opened on first use"""
+
+    def __init__(self, persist_directory: str = "vectorstore", embeddings=None, index_type: str = None,
+                 ann_threshold: int = None, nprobe: int = None, ef_search: int = None):
         self.persist_directory = persist_directory
-        self.embeddings = SimpleHashEmbeddings(dim=256)
-        self.texts: List[str] = []
-        self.index = None
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
-        )
-        
-        # Initialize Gemini LLM
-        api_key = os.getenv("GEMINI_API_KEY")
-        model = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
+        self.embeddings = embeddings or make_embeddings(dim=RAG_EMBEDDING_DIM)
+        # Approximate-search settings, see ann_index.py
+        self.index_type = index_type or ann_index.RAG_INDEX_TYPE
+        ann_index.effective_kind(self.index_type, 0)  # Reject an unknown type up front
+        self.ann_threshold = ann_index.RAG_ANN_THRESHOLD if ann_threshold is None else ann_threshold
+        self.nprobe = nprobe or ann_index.RAG_NPROBE
+        self.ef_search = ef_search or ann_index.RAG_EF_SEARCH
+        self._rebuild_thread = None
+        self._store = VectorStore(persist_directory)
+        # (index, texts) replaced in one assignment, so a reader never pairs one commit's ids with another's texts
+        self._snapshot = (None, TextStore())
+        self._loaded = False
+        self._manifest_stamp = None  # stat of manifest.json when this process last mapped the store
+        self._served_generation = None  # store generation the live index was built over
+        self._load_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._text_splitter = None
+        self._llm = None
         
-        if api_key and api_key != "your_gemini_api_key_here":
-            self.llm = ChatGoogleGenerativeAI(
-                model=model,
-                google_api_key=api_key,
+        # Gemini settings; the client itself is built on first query
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        self.model = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
+
+    @property
+    def gemini_configured(self) -> bool:
+        return bool(self.api_key) and self.api_key != "your_gemini_api_key_here"
+
+    @property
+    def llm(self):
+        if self._llm is None and self.gemini_configured:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            self._llm = ChatGoogleGenerativeAI(
+                model=self.model,
+                google_api_key=self.api_key,
                 temperature=0.1
             )
-        else:
-            self.llm = None
-        
-        self._load_index()
+        return self._llm
+
+    @property
+    def text_splitter(self):
+        if self._text_splitter is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            self._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=1000,
+                chunk_overlap=200
+            )
+        return self._text_splitter
+
+    @property
+    def index(self):
+        self.load()
+        return self._snapshot[0]
+
+    @property
+    def texts(self) -> TextStore:
+        self.load()
+        return self._snapshot[1]
+
+    def load(self):
+        """Read the persisted index once; safe to call from several threads"""
+        if self._loaded:
+            return
+        # The write lock keeps a background index rebuild from swapping in before the load finishes
+        with self._load_lock, self._write_lock:
+            if not self._loaded:
+                self._load_index()
+                self._loaded = True
+
+    def _embedding_config(self) -> dict:
+        return {"backend": self.embeddings.name, "dim": self.embeddings.dim}
+
+    def _stored_config(self) -> dict:
+        return {"backend": self._store.manifest["backend"], "dim": self._store.manifest["dim"]}
 
     def _load_index(self):
+        try:
+            self._manifest_stamp = self._stat_manifest()
+            if not self._store.exists() and os.path.exists(os.path.join(self.persist_directory, "meta.pkl")):
+                with self._store.locked():
+                    # Another worker may have migrated it while this one waited for the lock
+                    if self._store.manifest is None:
+                        self._migrate_legacy()
+                        return
+            if self._store.exists():
+                vectors, texts = self._store.load()
+                if self._stored_config() != self._embedding_config():
+                    with self._store.locked():
+                        vectors, texts = self._store.mapped()
+                        if self._stored_config() != self._embedding_config():
+                            self._reembed(self._stored_config(), texts)
+                            return
+                self._set_index(self._open_index(vectors), texts)
+        except Exception as e:
+            print(f"Failed to load knowledge base from {self.persist_directory}: {e}")
+            self._snapshot = (None, TextStore())
+
+    def _stat_manifest(self):
+        try:
+            stat = os.stat(os.path.join(self.persist_directory, "manifest.json"))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _sync(self):
+        """Map rows other workers committed since this process last read the manifest (a stat() per query)"""
+        stamp = self._stat_manifest()
+        if stamp is None or stamp == self._manifest_stamp or self._snapshot[0] is None:
+            return
+        with self._write_lock:
+            if stamp == self._manifest_stamp or self._snapshot[0] is None:
+                return
+            try:
+                vectors, texts = self._store.load()
+                # A store re-embedded by a worker with another backend is not searchable with this one
+                if self._stored_config() == self._embedding_config():
+                    self._refresh_index(vectors, texts)
+            except Exception as e:
+                print(f"Keeping the current view of {self.persist_directory}, could not map the new commit: {e}")
+            self._manifest_stamp = stamp
+
+    def _refresh_index(self, vectors, texts):
+        """Serve freshly mapped ``vectors`` and ``texts``. The index snapshot is kept while it still matches
+        the manifest, and reopened if another writer compacted the store or saved a newer snapshot."""
+        snapshot = self._store.manifest.get("index") or {}
+        index = self._snapshot[0]
+        if (self._served_generation == self._store.manifest["generation"]
+                and snapshot.get("rows", 0) == index.ann_rows):
+            self._set_index(index.with_vectors(vectors), texts)
+        else:
+            self._set_index(self._open_index(vectors), texts)
+
+    def _open_index(self, vectors) -> "ann_index.MappedIndex":
+        """Search over the mapped rows, through this generation's index snapshot when it fits the configuration"""
+        wanted = ann_index.effective_kind(self.index_type, len(vectors), self.ann_threshold)
+        if wanted != "flat":
+            try:
+                snapshot = self._store.read_index()
+            except Exception as e:
+                print(f"Ignoring unreadable index snapshot in {self.persist_directory}: {e}")
+                snapshot = None
+            if snapshot is not None and snapshot[2] == wanted and snapshot[1] <= len(vectors):
+                ann, rows, _ = snapshot
+                ann_index.set_search_params(ann, self.nprobe, self.ef_search)
+                return ann_index.MappedIndex(vectors, ann, rows)
+        return ann_index.MappedIndex(vectors)
+
+    def _set_index(self, index: "ann_index.MappedIndex", texts: TextStore):
+        """Swap in ``index`` over ``texts`` as one snapshot; train an approximate index in the background when it is due"""
+        self._snapshot = (index, texts)
+        self._served_generation = self._store.manifest["generation"] if self._store.manifest else None
+        wanted = ann_index.effective_kind(self.index_type, index.ntotal, self.ann_threshold)
+        # Rows past the approximate index are searched exactly, which stops paying off at the same
+        # size as for the whole corpus; training takes seconds, exact search answers meanwhile
+        if wanted != "flat" and (index.kind != wanted or index.tail_rows >= max(self.ann_threshold, 1)):
+            self._schedule_rebuild()
+
+    def _schedule_rebuild(self):
+        if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+            return
+        self._rebuild_thread = threading.Thread(target=self._rebuild, name="rag-index-rebuild", daemon=True)
+        self._rebuild_thread.start()
+
+    def _rebuild(self):
+        """Train the approximate index off the write lock, then snapshot it and swap it in"""
+        try:
+            while True:
+                with self._write_lock:
+                    manifest = self._store.manifest
+                    if manifest is None:
+                        return
+                    generation, rows = manifest["generation"], manifest["count"]
+                    kind = ann_index.effective_kind(self.index_type, rows, self.ann_threshold)
+                    if kind == "flat":
+                        return
+                    vectors, _ = self._store.mapped()  # Exactly the manifest's rows, whoever committed them
+                index = ann_index.build_index(kind, vectors, self.embeddings.dim)
+                del vectors
+                with self._write_lock:
+                    # False when another worker saved an index at least as large first; serve that one
+                    self._store.write_index(index, rows, kind, generation)
+                    del index
+                    if self._store.manifest["generation"] != generation:
+                        continue  # Compacted or re-embedded meanwhile: start over from the new generation
+                    # Serve the snapshot mapped, like a fresh load; uploads committed while
+                    # training (here or by other workers) stay in the exactly-searched tail
+                    vectors, texts = self._store.mapped()
+                    ann, ann_rows, _ = self._store.read_index()
+                    ann_index.set_search_params(ann, self.nprobe, self.ef_search)
+                    self._set_index(ann_index.MappedIndex(vectors, ann, ann_rows), texts)
+                    return
+        except Exception as e:
+            print(f"Background index rebuild failed in {self.persist_directory}: {e}")
+
+    def wait_for_rebuild(self, timeout: float = None) -> bool:
+        """Block until a running background rebuild finishes; False if it is still running"""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+        return thread is None or not thread.is_alive()
+
+    def set_search_params(self, nprobe: int = None, ef_search: int = None):
+        """Trade recall for speed on the live index (and any rebuilt later)"""
+        self.nprobe = nprobe or self.nprobe
+        self.ef_search = ef_search or self.ef_search
+        index = self._snapshot[0]
+        if index is not None and index.ann is not None:
+            ann_index.set_search_params(index.ann, self.nprobe, self.ef_search)
+
+    def index_info(self) -> dict:
+        index = self.index
+        return {
+            "type": self.index_type,
+            "active": index.kind if index is not None else None,
+            "vectors": index.ntotal if index is not None else 0,
+            "exact_rows": index.tail_rows if index is not None else 0,
+            "rebuilding": not self.wait_for_rebuild(0),
+            "ann_threshold": self.ann_threshold,
+            "nprobe": self.nprobe,
+            "ef_search": self.ef_search,
+        }
+
+    def _reembed(self, stored: dict, texts: TextStore):
+        """Rewrite the store from its texts with the configured backend; vectors from two backends do not mix"""
+        print(f"Re-embedding {len(texts)} chunks: {stored['backend']}/{stored['dim']} -> "
+              f"{self.embeddings.name}/{self.embeddings.dim}")
+        texts = list(texts)
+        vectors = self.embeddings.embed_batch(texts)
+        self._set_index(*self._rewrite(vectors, texts))
+
+    def _migrate_legacy(self):
+        """One-time conversion of index.faiss + meta.pkl (a full rewrite per upload) to the append-only store"""
+        import faiss
         index_path = os.path.join(self.persist_directory, "index.faiss")
         meta_path = os.path.join(self.persist_directory, "meta.pkl")
-        
-        if os.path.exists(index_path) and os.path.exists(meta_path):
-            try:
-                self.index = faiss.read_index(index_path)
-                with open(meta_path, "rb") as f:
-                    self.texts = pickle.load(f)
-            except Exception:
-                self.index = None
+        embeddings_path = os.path.join(self.persist_directory, "embeddings.json")
+        with open(meta_path, "rb") as f:
+            texts = pickle.load(f)
+        # Indexes written before embeddings.json existed used the SHA-256 hasher
+        stored = {"backend": SimpleHashEmbeddings.name, "dim": 256}
+        if os.path.exists(embeddings_path):
+            with open(embeddings_path) as f:
+                stored = json.load(f)
+        if stored == self._embedding_config() and os.path.exists(index_path):
+            legacy = faiss.read_index(index_path)
+            vectors = legacy.reconstruct_n(0, legacy.ntotal)
+        else:
+            print(f"Re-embedding {len(texts)} chunks: {stored['backend']}/{stored['dim']} -> "
+                  f"{self.embeddings.name}/{self.embeddings.dim}")
+            vectors = self.embeddings.embed_batch(texts)
+        self._set_index(*self._rewrite(vectors, texts))
+        # Kept for rollback, but no longer read
+        for path in (index_path, meta_path, embeddings_path):
+            if os.path.exists(path):
+                os.replace(path, path + ".legacy")
+        print(f"Migrated {len(texts)} chunks in {self.persist_directory} to the append-only store")
 
     def add_documents(self, texts: List[str]):
+        """Embed and append chunks; cost depends on the batch, not on the size of the store"""
         if not texts:
             return
-            
-        vectors = self.embeddings.embed_documents(texts)
-        vecs = np.array(vectors).astype("float32")
         
-        if self.index is None:
-            self.index = faiss.IndexFlatL2(vecs.shape[1])
-            
-        self.index.add(vecs)
-        self.texts.extend(texts)
-        self._save_index()
+        vecs = self.embeddings.embed_batch(texts)
+        self.load()
+        # The store lock re-reads the manifest: other workers may have created, appended to or compacted it
+        with self._write_lock, self._store.locked():
+            if self._store.manifest is None:
+                self._set_index(*self._rewrite(vecs, texts))
+                return
+            vectors, stored_texts = self._store.append(vecs, texts)
+            manifest = self._store.manifest
+            appended = manifest["appended_since_compaction"]
+            if appended >= max(RAG_COMPACT_MIN_ROWS, RAG_COMPACT_RATIO * (manifest["count"] - appended)):
+                self._compact()
+            elif self._snapshot[0] is None:
+                self._set_index(self._open_index(vectors), stored_texts)
+            else:
+                self._refresh_index(vectors, stored_texts)
 
-    def _save_index(self):
-        os.makedirs(self.persist_directory, exist_ok=True)
-        index_path = os.path.join(self.persist_directory, "index.faiss")
-        meta_path = os.path.join(self.persist_directory, "meta.pkl")
-        
-        if self.index is not None:
-            faiss.write_index(self.index, index_path)
-            with open(meta_path, "wb") as f:
-                pickle.dump(self.texts, f)
+    def compact(self) -> int:
+        """Drop duplicate chunks (e.g. a re-uploaded document) into a new store generation; returns how many"""
+        self.load()
+        with self._write_lock, self._store.locked():
+            if self._store.manifest is None:
+                return 0
+            return self._compact()
+
+    def _compact(self) -> int:
+        """Rewrite without duplicates; runs inside ``_store.locked()`` so no other worker's append is lost"""
+        vectors, texts = self._store.mapped()
+        first = {}
+        for i, text in enumerate(texts):
+            first.setdefault(text, i)
+        keep = sorted(first.values())
+        self._set_index(*self._rewrite(vectors[keep], [texts[i] for i in keep]))
+        return len(vectors) - len(keep)
+
+    def _rewrite(self, vectors, texts: List[str]):
+        """Start a new store generation; returns (exact index, texts) ready for ``_set_index``"""
+        vectors, stored_texts = self._store.rewrite(vectors, texts, self._embedding_config())
+        return ann_index.MappedIndex(vectors), stored_texts
 
     def query(self, question: str, k: int = 4) -> dict:
-        if self.index is None or len(self.texts) == 0:
+        self.load()
+        self._sync()
+        # One snapshot for the whole query: uploads, compaction or a rebuild may swap in another meanwhile
+        index, texts = self._snapshot
+        if index is None or len(texts) == 0:
             return {"answer": "No documents in knowledge base", "sources": []}
             
         # Retrieve relevant documents
-        qv = np.array([self.embeddings.embed_query(question)]).astype("float32")
-        D, I = self.index.search(qv, k)
+        qv = self.embeddings.embed_batch([question])
+        D, I = index.search(qv, k)
         
         sources = []
         for idx in I[0]:
-            if idx < len(self.texts):
-                sources.append(self.texts[idx])
+            # FAISS pads with -1 when k exceeds the number of chunks
+            if 0 <= idx < len(texts):
+                sources.append(texts[idx])
         
         if not self.llm:
             return {"answer": "Gemini API not configured", "sources": sources}
@@ -127,4 +510,18 @@ class RAGSystem:
 
     def add_text_chunks(self, text: str):
         chunks = self.text_splitter.split_text(text)
-        self.add_documents(chunks)
\ No newline at end of file
+        self.add_documents(chunks)
+
+
+_shared_rag_system = None
+_shared_rag_lock = threading.Lock()
+
+
+def get_rag_system():
+    """Return the process-wide RAGSystem shared by the RAG routes and the RAG agent"""
+    global _shared_rag_system
+    if _shared_rag_system is None:
+        with _shared_rag_lock:
+            if _shared_rag_system is None:
+                _shared_rag_system = RAGSystem()
+    return _shared_rag_system
@@ -0,0 +1,204 @@
+"""
+Bounded, prioritized worker pool for chat queries.
+
+Replaces the event loop's default executor for orchestrator work: a fixed
+number of worker threads, a bounded queue, priority classes and per-
+connection round-robin inside each class, so one analyst's large report
+cannot starve someone else's host isolation.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from agents.intent_router import route_query
+
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "4"))
+# Queued (not yet running) queries accepted before new ones are refused
+QUERY_QUEUE_LIMIT = int(os.getenv("QUERY_QUEUE_LIMIT", "32"))
+
+# Lower runs first
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {PRIORITY_URGENT: "urgent", PRIORITY_NORMAL: "normal", PRIORITY_BULK: "bulk"}
+
+URGENT_TOOLS = {"incident_response", "active_response", "firewall"}
+BULK_TOOLS = {"reporting"}
+
+
+def classify(query: str) -> int:
+    """Approvals and containment actions jump the queue; reports wait behind everything"""
+    if query.lower().startswith('approve'):
+        return PRIORITY_URGENT
+    tool = route_query(query)[0].tool
+    if tool in URGENT_TOOLS:
+        return PRIORITY_URGENT
+    if tool in BULK_TOOLS:
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when the queue is at QUERY_QUEUE_LIMIT"""
+
+
+class Job:
+    def __init__(self, owner, fn, priority, loop):
+        self.owner = owner
+        self.fn = fn
+        self.priority = priority
+        self.loop = loop
+        self.future = loop.create_future()
+        self.enqueued_at = time.monotonic()
+
+    def _settle(self, result=None, error=None):
+        if self.future.done():
+            return
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(result)
+
+
+class QueryScheduler:
+    """Fixed worker threads pulling from per-priority, per-connection queues.
+
+    The next job comes from the most urgent non-empty class; inside a
+    class, connections take turns (round-robin), so a client that queued
+    ten reports gets one worker slot per turn like everyone else.
+    """
+
+    def __init__(self, workers=QUERY_WORKERS, max_queue=QUERY_QUEUE_LIMIT):
+        self.workers = workers
+        self.max_queue = max_queue
+        # priority -> OrderedDict(owner -> deque of jobs), rotated for fairness
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self._depth = 0
+        self._running = 0
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stats = {name: {"submitted": 0, "completed": 0, "rejected": 0, "cancelled": 0,
+                              "total_wait": 0.0, "max_wait": 0.0}
+                       for name in PRIORITY_NAMES.values()}
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"query-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def depth(self):
+        with self._cond:
+            return self._depth
+
+    def submit(self, owner, fn, priority=PRIORITY_NORMAL):
+        """Queue ``fn`` for ``owner`` (e.g. a connection id); returns the Job, whose future resolves to fn()"""
+        job = Job(owner, fn, priority, asyncio.get_running_loop())
+        stats = self._stats[PRIORITY_NAMES[priority]]
+        with self._cond:
+            self._ensure_started()
+            if self._depth >= self.max_queue:
+                stats["rejected"] += 1
+                raise QueueFullError(f"{self._depth} queries already waiting")
+            self._queues[priority].setdefault(owner, deque()).append(job)
+            self._depth += 1
+            stats["submitted"] += 1
+            self._cond.notify()
+        return job
+
+    def cancel(self, job):
+        """Drop ``job`` if it has not started yet (its future is cancelled); False if it already runs"""
+        with self._cond:
+            owners = self._queues[job.priority]
+            jobs = owners.get(job.owner)
+            if not jobs or job not in jobs:
+                return False
+            jobs.remove(job)
+            if not jobs:
+                del owners[job.owner]
+            self._depth -= 1
+            self._stats[PRIORITY_NAMES[job.priority]]["cancelled"] += 1
+        job.future.cancel()
+        return True
+
+    def position(self, job):
+        """Queued jobs that will start before ``job`` under the round-robin order"""
+        with self._cond:
+            ahead = sum(len(jobs) for priority, owners in self._queues.items() if priority < job.priority
+                        for jobs in owners.values())
+            owners = self._queues[job.priority]
+            if job.owner not in owners or job not in owners[job.owner]:
+                return 0
+            rounds = owners[job.owner].index(job)
+            before_owner = True
+            for owner, jobs in owners.items():
+                if owner == job.owner:
+                    before_owner = False
+                    ahead += rounds
+                else:
+                    ahead += min(len(jobs), rounds + (1 if before_owner else 0))
+            return ahead
+
+    def _next_job(self):
+        for priority in sorted(self._queues):
+            owners = self._queues[priority]
+            if owners:
+                owner, jobs = next(iter(owners.items()))
+                job = jobs.popleft()
+                del owners[owner]
+                if jobs:
+                    # Back of the line for this connection's next query
+                    owners[owner] = jobs
+                return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while self._depth == 0:
+                    self._cond.wait()
+                job = self._next_job()
+                self._depth -= 1
+                self._running += 1
+            waited = time.monotonic() - job.enqueued_at
+            try:
+                result, error = job.fn(), None
+            except Exception as e:
+                result, error = None, e
+            with self._cond:
+                self._running -= 1
+                stats = self._stats[PRIORITY_NAMES[job.priority]]
+                stats["completed"] += 1
+                stats["total_wait"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+            try:
+                job.loop.call_soon_threadsafe(job._settle, result, error)
+            except RuntimeError:
+                # The submitting event loop is gone (server shutting down)
+                pass
+
+    def stats(self):
+        """Queue depth, busy workers and per-class counts and wait times"""
+        with self._cond:
+            classes = {}
+            for name, stats in self._stats.items():
+                completed = stats["completed"]
+                classes[name] = {
+                    "submitted": stats["submitted"],
+                    "completed": completed,
+                    "rejected": stats["rejected"],
+                    "cancelled": stats["cancelled"],
+                    "avg_wait_ms": round(stats["total_wait"] / completed * 1000, 1) if completed else 0.0,
+                    "max_wait_ms": round(stats["max_wait"] * 1000, 1),
+                }
+            return {
+                "workers": self.workers,
+                "busy_workers": self._running,
+                "queue_depth": self._depth,
+                "queue_limit": self.max_queue,
+                "classes": classes,
+            }
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test intent routing accuracy on a labelled analyst-query corpus
+"""
+from agents.intent_router import plan_tools, route_query
+
+# (query, expected best tool)
+CORPUS = [
+    ("Show me critical alerts from the last hour", "alerts"),
+    ("any high severity security events?", "alerts"),
+    ("list recent alerts", "alerts"),
+    ("was there a breach last night", "alerts"),
+    ("Triage critical alerts", "alert_triage"),
+    ("map these incidents to MITRE ATT&CK", "alert_triage"),
+    ("correlate alerts for agent 002", "alert_triage"),
+    ("Show FIM changes on agent 003", "fim"),
+    ("file integrity monitoring status", "fim"),
+    ("what files changed since the baseline", "fim"),
+    ("run a CIS compliance check", "sca"),
+    ("security assessment results for agent 001", "sca"),
+    ("NIST configuration check", "sca"),
+    ("Generate a compliance report", "reporting"),
+    ("weekly executive summary", "reporting"),
+    ("create a report of today's activity", "reporting"),
+    ("search logs for failed ssh logins", "log_analysis"),
+    ("log analysis on the web servers", "log_analysis"),
+    ("check ip 185.220.101.4 on virustotal", "threat_intelligence"),
+    ("is this ioc in our threat feed", "threat_intelligence"),
+    ("analyze hash 44d88612fea8a8f36de82e1278abb02f", "threat_intelligence"),
+    ("isolate agent 004", "incident_response"),
+    ("block ip 10.0.0.5 and escalate", "incident_response"),
+    ("quarantine the infected host", "incident_response"),
+    ("trigger active response restart-wazuh on agent 001", "active_response"),
+    ("execute command firewall-drop", "active_response"),
+    ("create rule for ssh brute force", "xml_editor"),
+    ("add rule to detect sudo abuse", "xml_editor"),
+    ("write a decoder for nginx logs", "xml_editor"),
+    ("allow port 443 on the firewall", "firewall"),
+    ("iptables drop traffic from 1.2.3.4", "firewall"),
+    ("show rules for authentication", "rules"),
+    ("what policy covers password changes", "rules"),
+    ("which agents are offline", "agents"),
+    ("status of all endpoints", "agents"),
+    ("list servers", "agents"),
+    ("hello", "alerts"),
+]
+
+# Substring matching used to route these wrongly ("port" in "report", "cis" in "decision")
+REGRESSIONS = [
+    ("support ticket decision", "alerts"),
+    ("scan the network for new hosts", "agents"),
+    # Inflections built from the stem, not by appending "ed"/"ing" to it
+    ("isolated host", "incident_response"),
+    ("quarantined machine", "incident_response"),
+    ("triaging alerts", "alert_triage"),
+    ("escalated incidents", "incident_response"),
+]
+
+
+def test_routing_accuracy():
+    print("🧭 Testing intent router...")
+    misses = []
+    for query, expected in CORPUS + REGRESSIONS:
+        intents = route_query(query)
+        if intents[0].tool != expected:
+            misses.append((query, expected, intents[0].tool))
+            print(f"❌ {query!r}: expected {expected}, got {intents[0].tool}")
+    accuracy = 1 - len(misses) / len(CORPUS + REGRESSIONS)
+    print(f"✅ Routing accuracy: {accuracy:.1%} on {len(CORPUS + REGRESSIONS)} queries")
+    assert not misses
+
+
+def test_ranking_and_confidence():
+    intents = route_query("triage critical alerts and show FIM changes on agent 003")
+    tools = [intent.tool for intent in intents]
+    assert tools[:2] == ["alert_triage", "fim"], tools
+    assert abs(sum(intent.confidence for intent in intents) - 1) < 0.01
+    assert intents[0].confidence >= intents[-1].confidence
+
+    fallback = route_query("good morning")
+    assert fallback[0].tool == "alerts" and fallback[0].confidence == 0.0
+    print("✅ Ranked intents and confidence look sane")
+
+
+# Compound questions -> tools run for them, in order
+COMPOUND = [
+    ("triage critical alerts and show FIM changes on agent 003", ["alert_triage", "fim"]),
+    ("show alerts and agents status; run a CIS compliance check", ["alerts", "agents", "sca"]),
+    ("search logs for ssh then check ip 1.2.3.4 on virustotal", ["log_analysis", "threat_intelligence"]),
+    ("correlate alerts and incidents", ["alert_triage"]),
+    ("block ip 10.0.0.5 and escalate", ["incident_response"]),
+    ("generate report and show alerts", ["reporting"]),
+    ("show critical alerts", ["alerts"]),
+    ("show FIM changes and SCA results for agent 003", ["fim", "sca"]),
+]
+
+
+def test_compound_plans():
+    for query, expected in COMPOUND:
+        plan = plan_tools(query)
+        assert [tool for tool, _ in plan] == expected, (query, plan)
+    # A single intent keeps the question exactly as asked
+    assert plan_tools("show critical alerts") == [("alerts", "show critical alerts")]
+    # An agent ID, IP or rule ID typed in one read-only clause qualifies the others
+    assert plan_tools("show FIM changes and SCA results for agent 003") == [
+        ("fim", "show FIM changes agent 003"), ("sca", "SCA results for agent 003")]
+    assert plan_tools("search logs for 10.0.0.5 then check rule 5710 on Agent 7") == [
+        ("log_analysis", "search logs for 10.0.0.5 agent 7 rule 5710"),
+        ("rules", "check rule 5710 on Agent 7 10.0.0.5")]
+    # Response actions only ever act on the targets typed for them
+    assert plan_tools("isolate agent 004 and show FIM changes on agent 002") == [
+        ("incident_response", "isolate agent 004"), ("fim", "show FIM changes on agent 002")]
+    assert plan_tools("show SCA results for agent 002 then block ip 10.0.0.5 on the firewall") == [
+        ("sca", "show SCA results for agent 002"), ("incident_response", "block ip 10.0.0.5 on the firewall")]
+    assert plan_tools("isolate the host and show FIM changes on agent 002") == [
+        ("incident_response", "isolate the host"), ("fim", "show FIM changes on agent 002")]
+    assert plan_tools("trigger restart and show SCA results for agent 003") == [
+        ("active_response", "trigger restart"), ("sca", "show SCA results for agent 003")]
+    # Two agents named: which one the rule clause means is not guessed at
+    assert plan_tools("show FIM changes on agent 001 then SCA results on agent 002 then check rule 5710") == [
+        ("fim", "show FIM changes on agent 001 rule 5710"), ("sca", "SCA results on agent 002 rule 5710"),
+        ("rules", "check rule 5710")]
+    print(f"✅ {len(COMPOUND)} compound queries split into the expected tools")
+
+
+if __name__ == "__main__":
+    test_routing_accuracy()
+    test_ranking_and_confidence()
+    test_compound_plans()
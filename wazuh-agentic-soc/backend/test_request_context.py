@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test per-query read sharing in integrations/request_context.py (no Wazuh manager needed)
+"""
+from integrations.request_context import WazuhRequestContext
+from integrations.wazuh_client import ALERT_SUMMARY_FIELDS, WazuhClient
+
+
+def make_alerts(count):
+    """Newest first; levels cycle 3..14 so every severity cut keeps some alerts"""
+    return [{"id": str(count - i), "timestamp": f"2026-10-18T10:00:{count - i:05d}",
+             "rule": {"id": str(5700 + i % 12), "level": 3 + i % 12, "description": f"rule {i % 12}"},
+             "agent": {"id": f"{i % 5:03d}", "name": f"web-{i % 5}"}, "full_log": f"log line {i}"}
+            for i in range(count)]
+
+
+def project(alert, fields):
+    out = {}
+    for field in fields:
+        src, dst, parts = alert, out, field.split(".")
+        for part in parts[:-1]:
+            src, dst = src.get(part, {}), dst.setdefault(part, {})
+        if parts[-1] in src:
+            dst[parts[-1]] = src[parts[-1]]
+    return out
+
+
+class FakeClient(WazuhClient):
+    """Answers get_alerts / poll_alerts from memory and records every call that reached the 'manager'"""
+
+    def __init__(self, count=300):
+        self.alerts = make_alerts(count)
+        self.calls = []
+
+    def _select(self, limit, severity_min, fields, offset=0):
+        matching = [a for a in self.alerts if a["rule"]["level"] > severity_min]
+        items = matching[offset:offset + limit]
+        if fields:
+            items = [project(a, fields) for a in items]
+        return {"data": {"affected_items": items, "total_affected_items": len(matching)}, "error": 0}
+
+    def get_alerts(self, limit=50, severity_min=5, sort=None, q=None, offset=0, fields=None):
+        self.calls.append(("get_alerts", limit, severity_min, sort, offset))
+        return self._select(limit, severity_min, fields, offset)
+
+    def poll_alerts(self, severity_min=5, q=None, fields=None, window_size=500):
+        self.calls.append(("poll_alerts", window_size, severity_min))
+        return self._select(window_size, severity_min, fields)
+
+
+def levels(payload):
+    return [a["rule"]["level"] for a in payload["data"]["affected_items"]]
+
+
+def test_narrower_read_served_from_wider():
+    print("🔎 Wider alert read, then narrower ones served locally")
+    client = FakeClient()
+    context = WazuhRequestContext(client, alert_limit=100)
+    wide = context.get_alerts(limit=20, severity_min=5)
+    assert len(wide["data"]["affected_items"]) == 20 and len(client.calls) == 1
+    assert client.calls[0][1] == 100, "the first read is widened to alert_limit"
+
+    narrow = context.get_alerts(limit=10, severity_min=10)
+    assert len(client.calls) == 1, client.calls
+    assert len(levels(narrow)) == 10 and min(levels(narrow)) > 10
+    expected = client._select(10, 10, None)["data"]["affected_items"]
+    assert narrow["data"]["affected_items"] == expected, "same alerts, same order as the manager would return"
+    # Wider read not exhaustive and at a different level: the narrower total is unknown
+    assert "total_affected_items" not in narrow["data"]
+    # Same level: the manager's total still applies
+    assert context.get_alerts(limit=5, severity_min=5)["data"]["total_affected_items"] == wide["data"]["total_affected_items"]
+    assert context.stats() == {"hits": 2, "misses": 1, "served_by_wider": 2}
+    print("✅ 3 reads, 1 manager call")
+
+
+def test_covers_rules():
+    client = FakeClient()
+    context = WazuhRequestContext(client, alert_limit=100)
+    context.get_alerts(limit=10, severity_min=5, fields=["id", "rule.id"])
+    # Projected without rule.level: cannot be filtered to a higher level
+    context.get_alerts(limit=10, severity_min=7, fields=["id"])
+    # Whole documents cannot come from a projected read
+    context.get_alerts(limit=10, severity_min=5)
+    # A different q is a different question
+    context.get_alerts(limit=10, severity_min=5, q="agent.id=001", fields=["id"])
+    assert len(client.calls) == 4, client.calls
+
+    # Not enough level 13+ alerts among the 100 stored, and more exist on the manager
+    context.get_alerts(limit=60, severity_min=12)
+    assert len(client.calls) == 5, client.calls
+    # Field subset at the same level is served, and so is a lower limit of an explicit sort
+    context.get_alerts(limit=10, severity_min=5, fields=["id"])
+    context.get_alerts(limit=10, severity_min=5, sort="-timestamp")
+    assert len(client.calls) == 5, client.calls
+    context.get_alerts(limit=10, severity_min=5, sort="+timestamp")
+    assert len(client.calls) == 6, client.calls
+    print("✅ Wider reads only serve what they actually cover")
+
+
+def test_exhaustive_read_gives_exact_totals():
+    client = FakeClient(count=40)
+    context = WazuhRequestContext(client, alert_limit=100)
+    context.get_alerts(limit=10, severity_min=3)  # All 40 alerts come back: the read is exhaustive
+    narrow = context.get_alerts(limit=100, severity_min=12)
+    assert len(client.calls) == 1
+    assert narrow["data"]["total_affected_items"] == len(levels(narrow)) == client._select(100, 12, None)["data"]["total_affected_items"]
+    print("✅ Exhaustive wider read answers any limit with an exact total")
+
+
+def test_poll_and_pagers_share_one_read():
+    print("🧵 poll_alerts and iter_alerts go through the query's context")
+    client = FakeClient()
+    context = WazuhRequestContext(client, alert_limit=100)
+    # Alert tool and triage both poll: one download
+    first = context.poll_alerts(fields=ALERT_SUMMARY_FIELDS, window_size=50)
+    again = context.poll_alerts(fields=ALERT_SUMMARY_FIELDS, window_size=50)
+    assert first == again and [c[0] for c in client.calls] == ["poll_alerts"]
+    triage = context.poll_alerts(severity_min=7, fields=ALERT_SUMMARY_FIELDS, window_size=20)
+    assert min(levels(triage)) > 7 and len(client.calls) == 1, client.calls
+
+    # Reporting's newest-first pass, then triage at a higher level: served from the first page
+    client = FakeClient()
+    context = WazuhRequestContext(client, alert_limit=100)
+    report = context.iter_alerts(severity_min=5, sort="-timestamp", fields=ALERT_SUMMARY_FIELDS,
+                                 page_size=200, max_items=200).collect()
+    assert len(report["data"]["affected_items"]) == 200
+    context.poll_alerts(severity_min=10, fields=ALERT_SUMMARY_FIELDS, window_size=30)
+    assert [c[0] for c in client.calls] == ["get_alerts"], client.calls
+
+    # Full documents from a response tool also serve a later projected poll
+    client = FakeClient()
+    context = WazuhRequestContext(client, alert_limit=100)
+    context.get_alerts(limit=10, severity_min=7)
+    assert client.calls[0][3] == "-timestamp", "unsorted reads are fetched newest first"
+    context.poll_alerts(severity_min=7, fields=ALERT_SUMMARY_FIELDS, window_size=50)
+    assert len(client.calls) == 1, client.calls
+
+    # A write invalidates everything read so far
+    client.trigger_active_response = lambda *args, **kwargs: {"error": 0}
+    context.trigger_active_response("restart", "001")
+    context.poll_alerts(severity_min=7, fields=ALERT_SUMMARY_FIELDS, window_size=50)
+    assert [c[0] for c in client.calls] == ["get_alerts", "poll_alerts"], client.calls
+    print("✅ One manager read per query serves polls, pagers and getters")
+
+
+if __name__ == "__main__":
+    test_narrower_read_served_from_wider()
+    test_covers_rules()
+    test_exhaustive_read_gives_exact_totals()
+    test_poll_and_pagers_share_one_read()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test circuit-breaker accounting in integrations/resilience.py (no Wazuh manager needed)
+"""
+import asyncio
+from contextlib import contextmanager
+
+from integrations import resilience as resilience_module
+from integrations.resilience import TIMEOUT_MIN, CircuitOpenError, Resilience
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def failing_send(counter):
+    def send(timeout):
+        counter.append(timeout)
+        return Response(503)
+    return send
+
+
+@contextmanager
+def no_backoff():
+    """No sleeping between attempts, restored afterwards so other tests see the real backoff"""
+    backoff_delay = resilience_module.backoff_delay
+    resilience_module.backoff_delay = lambda attempt: 0
+    try:
+        yield
+    finally:
+        resilience_module.backoff_delay = backoff_delay
+
+
+def make_resilience(max_retries=2, threshold=5):
+    res = Resilience(max_retries=max_retries)
+    res.budget.tokens = res.budget.max_tokens = 1000
+    breaker, _ = res._endpoint("/alerts")
+    breaker.failure_threshold = threshold
+    return res, breaker
+
+
+def test_failure_counted_once_per_call():
+    print("🔌 One failed call with retries = one breaker failure")
+    res, breaker = make_resilience(max_retries=2, threshold=5)
+    attempts = []
+    with no_backoff():
+        for call in range(4):
+            response = res.call("/alerts", failing_send(attempts))
+            assert response.status_code == 503
+        assert len(attempts) == 12, attempts  # 4 calls x (1 + 2 retries)
+        assert breaker.failures == 4 and breaker.state == "closed", breaker.snapshot()
+        res.call("/alerts", failing_send(attempts))
+        assert breaker.state == "open", breaker.snapshot()
+        try:
+            res.call("/alerts", failing_send(attempts))
+            raise AssertionError("open breaker let a call through")
+        except CircuitOpenError:
+            pass
+    assert len(attempts) == 15
+    print("✅ Breaker opened after 5 failed calls (15 attempts), not after 2 calls")
+
+
+def test_retry_success_resets_failures():
+    print("🔁 A call that succeeds on retry is a success")
+    res, breaker = make_resilience(max_retries=2, threshold=2)
+    statuses = [503, 200]
+    with no_backoff():
+        res.call("/alerts", failing_send([]))
+        res.call("/alerts", lambda timeout: Response(statuses.pop(0)))
+    assert breaker.failures == 0 and breaker.state == "closed", breaker.snapshot()
+    print("✅ Failure count reset")
+
+
+def test_half_open_probe_single_attempt():
+    print("🩺 A half-open probe is not retried")
+    res, breaker = make_resilience(max_retries=2, threshold=1)
+    with no_backoff():
+        res.call("/alerts", failing_send([]))
+    assert breaker.state == "open"
+    breaker.opened_at -= breaker.reset_timeout
+    attempts = []
+    asyncio.run(res.acall("/alerts", lambda timeout: asyncio.sleep(0, failing_send(attempts)(timeout))))
+    assert len(attempts) == 1 and breaker.state == "open", (attempts, breaker.snapshot())
+    print("✅ Probe failed once and re-opened the breaker")
+
+
+def test_probes_do_not_shrink_bulk_timeouts():
+    print("📏 limit=1 probes and 500-item pages learn separate timeouts")
+    res = Resilience()
+    for probe in range(50):
+        res.call("/agents", lambda timeout: Response(200), limit=1)
+    _, probes = res._endpoint("/agents", 1)
+    _, pages = res._endpoint("/agents", 500)
+    assert probes.timeout() == TIMEOUT_MIN and pages is not probes
+    # The first 500-item page still gets the full timeout, then its own latency sets it
+    timeouts = []
+    res.call("/agents", lambda timeout: timeouts.append(timeout) or Response(200), limit="500")
+    assert timeouts == [pages.maximum], timeouts
+    pages.observe(4.0)
+    assert pages.timeout() > 4.0 and probes.timeout() == TIMEOUT_MIN
+    # No limit means the API's default page of 500
+    assert res._endpoint("/agents")[1] is pages
+    assert res.snapshot()["endpoints"]["/agents"]["timeout_seconds"] == {
+        "limit<=1": TIMEOUT_MIN, "limit<=1000": round(pages.timeout(), 2)}
+    print("✅ Bulk pages keep a timeout sized for bulk pages")
+
+
+if __name__ == "__main__":
+    test_failure_counted_once_per_call()
+    test_retry_success_resets_failures()
+    test_half_open_probe_single_attempt()
+    test_probes_do_not_shrink_bulk_timeouts()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test crash safety and multi-writer use of the append-only VectorStore (no network or LLM needed)
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import vector_store
+from vector_store import VectorStore
+
+DIM = 4
+CONFIG = {"backend": "test", "dim": DIM}
+
+
+def rows(tag, start, count):
+    """Vectors whose first two components identify their text, so mispaired rows are detectable"""
+    vectors = np.zeros((count, DIM), dtype=np.float32)
+    vectors[:, 0] = tag
+    vectors[:, 1] = np.arange(start, start + count)
+    return vectors, [f"writer {tag} chunk {i}" for i in range(start, start + count)]
+
+
+def assert_paired(vectors, texts):
+    assert len(vectors) == len(texts), (len(vectors), len(texts))
+    for vector, text in zip(vectors, texts):
+        assert text == f"writer {int(vector[0])} chunk {int(vector[1])}", (vector, text)
+
+
+def file_sizes(directory):
+    return {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+
+
+def test_crash_leaves_last_commit_readable():
+    print("💥 Crashed append: readers see the last commit, the next writer truncates the tail")
+    directory = tempfile.mkdtemp(prefix="test_vector_store_")
+    try:
+        store = VectorStore(directory)
+        store.rewrite(*rows(1, 0, 3), CONFIG)
+        store.append(*rows(1, 3, 2))
+        # What an append killed between writing the data files and committing the manifest leaves behind
+        for name in ("vectors-1.f32", "texts-1.bin", "texts-1.idx"):
+            with open(os.path.join(directory, name), "ab") as f:
+                f.write(b"\xff" * 13)
+        before = file_sizes(directory)
+
+        vectors, texts = VectorStore(directory).load()
+        assert_paired(vectors, texts)
+        assert len(texts) == 5 and texts[-1] == "writer 1 chunk 4"
+        assert file_sizes(directory) == before, "load() must not truncate: other workers may be writing"
+
+        vectors, texts = VectorStore(directory).append(*rows(2, 0, 2))
+        assert_paired(vectors, texts)
+        assert len(texts) == 7
+        assert_paired(*VectorStore(directory).load())
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("✅ Committed rows readable after the crash, tail dropped by the next append")
+
+
+def test_manifest_replaced_atomically():
+    print("📝 Crash while committing: manifest.json is the old commit or the new one, never partial")
+    directory = tempfile.mkdtemp(prefix="test_vector_store_")
+    replace = vector_store.os.replace
+    try:
+        store = VectorStore(directory)
+        store.rewrite(*rows(1, 0, 3), CONFIG)
+
+        def crash(src, dst):
+            if dst.endswith(vector_store.MANIFEST_FILE):
+                raise OSError("killed before the rename")
+            return replace(src, dst)
+        vector_store.os.replace = crash
+        try:
+            store.append(*rows(1, 3, 4))
+            raise AssertionError("append should have failed")
+        except OSError:
+            pass
+        finally:
+            vector_store.os.replace = replace
+
+        with open(os.path.join(directory, vector_store.MANIFEST_FILE)) as f:
+            assert json.load(f)["count"] == 3
+        vectors, texts = VectorStore(directory).load()
+        assert len(texts) == 3
+        assert_paired(vectors, texts)
+
+        vectors, texts = VectorStore(directory).append(*rows(2, 0, 1))
+        assert texts[-2:] == ["writer 1 chunk 2", "writer 2 chunk 0"]
+        assert_paired(vectors, texts)
+    finally:
+        vector_store.os.replace = replace
+        shutil.rmtree(directory, ignore_errors=True)
+    print("✅ Unrenamed manifest ignored, store continues from the last commit")
+
+
+def test_rewrite_keeps_previous_generation():
+    directory = tempfile.mkdtemp(prefix="test_vector_store_")
+    try:
+        store = VectorStore(directory)
+        store.rewrite(*rows(1, 0, 3), CONFIG)
+        reader = VectorStore(directory)
+        old_vectors, old_texts = reader.load()
+        store.rewrite(*rows(1, 0, 2), CONFIG)
+        # A worker still on generation 1 can open its files after the switch to generation 2
+        assert_paired(*reader.mapped())
+        assert len(old_texts) == 3 and old_vectors[2][1] == 2
+        store.rewrite(*rows(1, 0, 1), CONFIG)
+        names = os.listdir(directory)
+        assert "vectors-1.f32" not in names and "vectors-2.f32" in names and "vectors-3.f32" in names, names
+        # Mapped before its files were deleted, so still readable
+        assert old_texts[2] == "writer 1 chunk 2"
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"✅ Rewrite keeps the last {vector_store.KEEP_GENERATIONS} generations")
+
+
+def append_batches(directory, tag, batches, compact_at=None):
+    store = VectorStore(directory)
+    store.load()
+    for batch in range(batches):
+        store.append(*rows(tag, batch * 3, 3))
+        if batch == compact_at:
+            # Read-modify-rewrite under the lock, as compaction does
+            with store.locked():
+                vectors, texts = store.mapped()
+                store.rewrite(np.array(vectors), list(texts), CONFIG)
+
+
+def test_two_writers_one_directory():
+    print("👥 Two processes appending to one directory")
+    directory = tempfile.mkdtemp(prefix="test_vector_store_")
+    try:
+        VectorStore(directory).rewrite(*rows(0, 0, 1), CONFIG)
+        context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        writers = [context.Process(target=append_batches, args=(directory, 1, 40)),
+                   context.Process(target=append_batches, args=(directory, 2, 40, 20))]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(120)
+            assert writer.exitcode == 0, writer.exitcode
+
+        vectors, texts = VectorStore(directory).load()
+        assert_paired(vectors, texts)
+        assert sorted(texts) == sorted(["writer 0 chunk 0"] + [f"writer {tag} chunk {i}"
+                                                               for tag in (1, 2) for i in range(120)])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("✅ 241 rows committed, none lost or mispaired")
+
+
+def test_rag_workers_share_one_directory():
+    print("🧠 Two RAGSystem workers on one knowledge base")
+    from rag_system import RAGSystem, make_embeddings
+    directory = tempfile.mkdtemp(prefix="test_vector_store_")
+    try:
+        workers = [RAGSystem(directory, embeddings=make_embeddings("hash"), index_type="flat") for _ in range(2)]
+        for worker in workers:
+            worker.api_key = None  # Sources only, no LLM call
+        first, second = workers
+        first.add_documents(["runbook: isolate the host", "runbook: rotate the keys"])
+        assert "runbook: rotate the keys" in second.query("runbook: rotate the keys")["sources"]
+        # Uploads through either worker are appended after the other's and seen by both
+        second.add_documents(["runbook: block the ip"])
+        first.add_documents(["runbook: reset the password", "runbook: isolate the host"])
+        assert "runbook: block the ip" in first.query("runbook: block the ip")["sources"]
+        assert "runbook: reset the password" in second.query("runbook: reset the password")["sources"]
+        assert second.compact() == 1
+        assert first.query("runbook: isolate the host")["sources"][0] == "runbook: isolate the host"
+        assert list(first.texts) == list(second.texts) == [
+            "runbook: isolate the host", "runbook: rotate the keys", "runbook: block the ip",
+            "runbook: reset the password"]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("✅ Both workers serve every upload, before and after compaction")
+
+
+def test_query_searches_one_snapshot():
+    print("📸 A swap during a query does not pair the old index with the new texts")
+    from rag_system import RAGSystem, make_embeddings
+    directory = tempfile.mkdtemp(prefix="test_vector_store_")
+    try:
+        rag = RAGSystem(directory, embeddings=make_embeddings("hash"), index_type="flat")
+        rag.api_key = None
+        rag.add_documents(["runbook: isolate the host", "runbook: isolate the host", "runbook: rotate the keys"])
+        rag.query("runbook: rotate the keys")  # Maps the commit, so the next query keeps this index
+        index = rag.index
+        search = index.search
+        compacted = []
+
+        def search_then_compact(vectors, k):
+            result = search(vectors, k)
+            # Another thread compacts while this query holds ids from the three-row index
+            compacted.append(rag.compact())
+            return result
+        index.search = search_then_compact
+        assert rag.query("runbook: rotate the keys", k=1)["sources"] == ["runbook: rotate the keys"]
+        assert compacted == [1] and rag.index is not index
+        assert rag.query("runbook: rotate the keys", k=1)["sources"] == ["runbook: rotate the keys"]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("✅ Ids resolved against the texts of the index that produced them")
+
+
+if __name__ == "__main__":
+    test_crash_leaves_last_commit_readable()
+    test_manifest_replaced_atomically()
+    test_rewrite_keeps_previous_generation()
+    test_two_writers_one_directory()
+    test_rag_workers_share_one_directory()
+    test_query_searches_one_snapshot()
@@ -0,0 +1,346 @@
+"""
+Append-only on-disk format for the RAG knowledge base.
+
+    vectors-<gen>.f32         float32 embedding rows, in ingest order
+    texts-<gen>.bin           UTF-8 chunk texts, concatenated
+    texts-<gen>.idx           uint64 end offset of each text in texts-<gen>.bin
+    index-<gen>-<rows>.faiss  optional trained ANN index covering the first ``rows`` rows
+    manifest.json             generation, committed row count and byte sizes, embedding backend/dim
+    .lock                     flock()ed by whichever process is writing
+
+An ingest appends to the current generation's data files, fsyncs them and
+then replaces manifest.json atomically. Readers only trust what the
+manifest counts and never map past it, so a crash mid-append leaves an
+uncommitted tail that the next writer truncates away. Compaction and
+migration write a whole new generation and switch to it with the same
+manifest swap, so a crash at any point leaves either the old or the new
+store, never a mix.
+
+Writers hold an exclusive lock on .lock and re-read the manifest under it,
+so several uvicorn workers can ingest into one directory: each append
+lands after the last commit, whoever made it. Files are never rewritten in
+place, and a rewrite leaves the previous KEEP_GENERATIONS - 1 generations
+on disk, so a worker still serving an older manifest keeps reading valid
+files.
+
+Readers get memory-mapped views of the committed rows: nothing is copied
+into the process at load, so opening the store costs the same whatever
+its size, and every RAGSystem and uvicorn worker on the host shares one
+copy of the data in the page cache.
+"""
+import json
+import mmap
+import os
+import re
+import threading
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so keep to one writing process per directory
+    fcntl = None
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+# Generations left on disk by a rewrite (the new one included), for readers still on an older manifest
+KEEP_GENERATIONS = 2
+
+_GENERATION_FILE = re.compile(r"^(?:vectors|texts|index)-(\d+)[.-]")
+
+
+def _data_files(generation):
+    return {
+        "vectors": f"vectors-{generation}.f32",
+        "texts": f"texts-{generation}.bin",
+        "offsets": f"texts-{generation}.idx",
+    }
+
+
+def _index_file(manifest):
+    """File of the manifest's index snapshot (stores written before snapshots were named by rows lack "file")"""
+    snapshot = manifest.get("index")
+    if not snapshot:
+        return None
+    return snapshot.get("file", f"index-{manifest['generation']}.faiss")
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path, data: bytes):
+    """Write to a temp file, fsync it and rename it over ``path``"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path) or ".")
+
+
+def _encode(texts, start=0):
+    """UTF-8 bytes of ``texts`` and their uint64 end offsets, counting from ``start``"""
+    encoded = [text.encode("utf-8") for text in texts]
+    ends = array("Q")
+    end = start
+    for chunk in encoded:
+        end += len(chunk)
+        ends.append(end)
+    return b"".join(encoded), ends
+
+
+def _map_file(path, length):
+    """Read-only mmap of the first ``length`` bytes (mmap refuses empty files)"""
+    if not length:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+
+
+class TextStore:
+    """Offset-indexed chunk texts: ``len()``, ``store[i]`` and slices without unpickling a list.
+
+    ``data`` and ``ends`` are normally mappings of texts-<gen>.bin / .idx, so
+    a text is only decoded when it is asked for.
+    """
+
+    def __init__(self, data=b"", ends=()):
+        self._data = data
+        self._ends = ends
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("text index out of range")
+        start = int(self._ends[i - 1]) if i else 0
+        return self._data[start:int(self._ends[i])].decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self):
+        return int(self._ends[-1]) if len(self._ends) else 0
+
+
+class VectorStore:
+    """Reads and appends the files of one vectorstore directory.
+
+    Any number of processes may read it. append(), write_index() and
+    rewrite() take the directory's writer lock (see locked()), so they can
+    also run from several processes at once.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest = None
+        self._thread_lock = threading.RLock()
+        self._lock_fd = None
+        self._lock_depth = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def exists(self):
+        return os.path.exists(self._path(MANIFEST_FILE))
+
+    def _read_manifest(self):
+        with open(self._path(MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def _commit(self, manifest):
+        _atomic_write(self._path(MANIFEST_FILE), json.dumps(manifest, indent=2).encode())
+        self.manifest = manifest
+
+    def _committed_sizes(self, manifest):
+        """(path, committed byte size) of each data file of the manifest's generation"""
+        count, files = manifest["count"], _data_files(manifest["generation"])
+        return ((self._path(files["vectors"]), count * manifest["dim"] * 4),
+                (self._path(files["texts"]), manifest["texts_bytes"]),
+                (self._path(files["offsets"]), count * 8))
+
+    @contextmanager
+    def locked(self):
+        """Hold the directory's exclusive writer lock, with ``manifest`` re-read from disk.
+
+        Re-entrant within a process. Code that derives a rewrite from the
+        current rows (compaction, re-embedding) reads them inside the block,
+        so no other writer's append can land in between and be lost.
+        """
+        with self._thread_lock:
+            if not self._lock_depth:
+                os.makedirs(self.directory, exist_ok=True)
+                fd = os.open(self._path(LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    self.manifest = self._read_manifest() if self.exists() else None
+                    self._truncate_tail()
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self._lock_fd = fd
+            self._lock_depth += 1
+            try:
+                yield self
+            finally:
+                self._lock_depth -= 1
+                if not self._lock_depth:
+                    os.close(self._lock_fd)  # Releases the flock
+                    self._lock_fd = None
+
+    def _truncate_tail(self):
+        """Drop what a crashed append wrote past the last commit. Only done under the writer
+        lock: readers map no more than the manifest counts, so they never see these bytes"""
+        if self.manifest is None:
+            return
+        for path, size in self._committed_sizes(self.manifest):
+            if os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def load(self):
+        """Mapped (vectors, TextStore) as of the last commit; bytes past it are ignored, not truncated"""
+        for attempt in range(3):
+            manifest = self._read_manifest()
+            try:
+                for path, size in self._committed_sizes(manifest):
+                    if os.path.getsize(path) < size:
+                        raise ValueError(f"{path} is shorter than its manifest says; the store is corrupt")
+                self.manifest = manifest
+                return self.mapped()
+            except FileNotFoundError:
+                # Rewrites retired this generation between reading the manifest and opening its files
+                if attempt == 2:
+                    raise
+
+    def mapped(self):
+        """Read-only (vectors, TextStore) views of the committed rows; later appends do not change them"""
+        count, dim = self.manifest["count"], self.manifest["dim"]
+        files = _data_files(self.manifest["generation"])
+        if not count:
+            return np.empty((0, dim), dtype=np.float32), TextStore()
+        vectors = np.memmap(self._path(files["vectors"]), dtype=np.float32, mode="r", shape=(count, dim))
+        ends = np.memmap(self._path(files["offsets"]), dtype=np.uint64, mode="r", shape=(count,))
+        return vectors, TextStore(_map_file(self._path(files["texts"]), self.manifest["texts_bytes"]), ends)
+
+    def write_index(self, index, rows, kind, generation) -> bool:
+        """Persist a trained index over the first ``rows`` rows of ``generation``, so a restart does not rebuild it.
+
+        False, and nothing written, if the store has moved to another
+        generation or another writer already saved a ``kind`` index over at
+        least as many rows.
+        """
+        import faiss
+        with self.locked():
+            if self.manifest is None or self.manifest["generation"] != generation:
+                return False
+            current = self.manifest.get("index")
+            if current and current["kind"] == kind and current["rows"] >= rows:
+                return False
+            # A new name per snapshot: a reader that has just read the old manifest still opens the old file
+            name = f"index-{generation}-{rows}.faiss"
+            tmp = self._path(f"{name}.{os.getpid()}.tmp")
+            faiss.write_index(index, tmp)
+            with open(tmp, "rb+") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path(name))
+            replaced = _index_file(self.manifest)
+            manifest = dict(self.manifest)
+            manifest["index"] = {"kind": kind, "rows": rows, "file": name}
+            self._commit(manifest)
+            self._remove_retired(keep={name, replaced})
+        return True
+
+    def read_index(self):
+        """(memory-mapped index, rows, kind) from the snapshot of the current generation, or None"""
+        name = _index_file(self.manifest or {})
+        if name is None:
+            return None
+        from ann_index import open_index
+        snapshot = self.manifest["index"]
+        return open_index(self._path(name), snapshot["kind"]), snapshot["rows"], snapshot["kind"]
+
+    def append(self, vectors: np.ndarray, new_texts):
+        """Append rows (already embedded) and their texts after the last commit, commit, and return mapped views.
+
+        The views cover every committed row, including ones other writers
+        appended since this store last read the manifest.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self.locked():
+            if self.manifest is None:
+                raise FileNotFoundError(f"No vectorstore in {self.directory}; create it with rewrite()")
+            if vectors.shape[1] != self.manifest["dim"]:
+                raise ValueError(f"Cannot append dim {vectors.shape[1]} vectors to a dim {self.manifest['dim']} store")
+            files = _data_files(self.manifest["generation"])
+            data, ends = _encode(new_texts, self.manifest["texts_bytes"])
+            for kind, payload in (("vectors", vectors.tobytes()), ("texts", data), ("offsets", ends.tobytes())):
+                with open(self._path(files[kind]), "ab") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+            manifest = dict(self.manifest)
+            manifest["count"] += len(new_texts)
+            manifest["texts_bytes"] = ends[-1] if ends else manifest["texts_bytes"]
+            manifest["appended_since_compaction"] += len(new_texts)
+            self._commit(manifest)
+            return self.mapped()
+
+    def rewrite(self, vectors: np.ndarray, texts, config: dict):
+        """Write a new generation holding exactly these rows, switch to it and return its mapped views.
+
+        Used to create the store and for compaction, migration and
+        re-embedding. Rows committed by other writers are replaced too, so
+        derive ``vectors`` and ``texts`` inside ``locked()``.
+        """
+        with self.locked():
+            generation = (self.manifest["generation"] if self.manifest else 0) + 1
+            files = _data_files(generation)
+            data, ends = _encode(texts)
+            _atomic_write(self._path(files["vectors"]), np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            _atomic_write(self._path(files["texts"]), data)
+            _atomic_write(self._path(files["offsets"]), ends.tobytes())
+            self._commit({
+                "version": MANIFEST_VERSION,
+                "generation": generation,
+                "backend": config["backend"],
+                "dim": config["dim"],
+                "count": len(ends),
+                "texts_bytes": ends[-1] if ends else 0,
+                "appended_since_compaction": 0,
+            })
+            self._remove_retired()
+            return self.mapped()
+
+    def _remove_retired(self, keep=()):
+        """Delete generations older than the last KEEP_GENERATIONS, and index snapshots of the current
+        one not in ``keep``. Processes that already mapped a deleted file keep reading it (POSIX)"""
+        generation = self.manifest["generation"]
+        for name in os.listdir(self.directory):
+            match = _GENERATION_FILE.match(name)
+            if match is None:
+                continue
+            old = int(match.group(1))
+            if old <= generation - KEEP_GENERATIONS or (old == generation and name.startswith("index-")
+                                                        and name not in keep):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass  # Already gone, or (on Windows) still mapped by a reader
@@ -1,15 +1,24 @@
 import { useState, useEffect } from 'react';
 import { ArrowLeft, AlertTriangle, Clock, Shield, Filter, Search } from 'lucide-react';
 
-function AlertsPage({ onBack }) {
+// feed: the Dashboard's useAlertFeed() state, shared so one tab opens a single /ws/alerts socket
+function AlertsPage({ onBack, feed }) {
   const [alerts, setAlerts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [filter, setFilter] = useState('all');
   const [searchTerm, setSearchTerm] = useState('');
 
+  // New alerts arrive over the live feed; REFRESH still pulls a full page on demand
   useEffect(() => {
-    fetchAlerts();
-  }, []);
+    if (feed.stats) {
+      setAlerts(feed.alerts);
+      setLoading(false);
+    }
+  }, [feed.alerts, feed.stats]);
+
+  useEffect(() => {
+    if (feed.status === 'closed') fetchAlerts();
+  }, [feed.status]);
 
   const fetchAlerts = async () => {
     try {
@@ -82,8 +91,8 @@ function AlertsPage({ onBack }) {
           
           <div className="flex items-center gap-4">
             <div className="flex items-center gap-2 px-3 py-1 bg-black border border-green-500/30 rounded">
-              <div className="w-2 h-2 rounded-full bg-green-400 animate-pulse"></div>
-              <span className="text-xs text-green-400 terminal-text">LIVE</span>
+              <div className={`w-2 h-2 rounded-full ${feed.connected ? 'bg-green-400 animate-pulse' : 'bg-red-400'}`}></div>
+              <span className="text-xs text-green-400 terminal-text">{feed.connected ? 'LIVE' : 'OFFLINE'}</span>
             </div>
             <button
               onClick={fetchAlerts}
@@ -6,8 +6,19 @@ function ChatBot({ isOpen, onToggle }) {
   const [input, setInput] = useState('');
   const [ws, setWs] = useState(null);
   const [isConnected, setIsConnected] = useState(false);
-  const [isLoading, setIsLoading] = useState(false);
+  const [pending, setPending] = useState([]);
+  const [status, setStatus] = useState('');
   const messagesEndRef = useRef(null);
+  const nextRequestId = useRef(0);
+  const isLoading = pending.length > 0;
+
+  const finishRequest = (requestId) => {
+    setPending(prev => {
+      const next = prev.filter(id => id !== requestId);
+      if (next.length === 0) setStatus('');
+      return next;
+    });
+  };
 
   useEffect(() => {
     if (!isOpen) return;
@@ -22,11 +33,60 @@ function ChatBot({ isOpen, onToggle }) {
     
     socket.onmessage = (event) => {
       const data = JSON.parse(event.data);
+      const requestId = data.request_id;
+
+      // Streaming replies: progress events, then tokens, then the final answer
+      if (data.type === 'progress') {
+        setStatus(data.stage === 'tool_selected'
+          ? `Querying ${data.tool}...`
+          : `Data fetched in ${Math.round(data.elapsed_ms)} ms`);
+        return;
+      }
+      if (data.type === 'queued') {
+        setStatus(`Queued - ${data.position} ahead of you`);
+        return;
+      }
+      if (data.type === 'token') {
+        setStatus('');
+        // Several queries can stream at once, so tokens go to their own request's message
+        setMessages(prev => {
+          const idx = prev.findIndex(m => m.streaming && m.requestId === requestId);
+          if (idx !== -1) {
+            const next = [...prev];
+            next[idx] = { ...prev[idx], content: prev[idx].content + data.content };
+            return next;
+          }
+          return [...prev, { type: 'bot', content: data.content, streaming: true, requestId }];
+        });
+        return;
+      }
+
+      finishRequest(requestId);
+      if (data.type === 'cancelled') {
+        // found: false means the query had already finished (its answer is shown) or was unknown
+        if (!data.found) return;
+        setMessages(prev => [...prev.filter(m => !(m.streaming && m.requestId === requestId)),
+          { type: 'bot', content: '[cancelled]', requestId }]);
+        return;
+      }
+      if (data.type === 'done') {
+        setMessages(prev => {
+          const idx = prev.findIndex(m => m.streaming && m.requestId === requestId);
+          const reply = { type: 'bot', content: data.content, meta: data.meta, requestId };
+          if (idx === -1) return [...prev, reply];
+          const next = [...prev];
+          next[idx] = reply;
+          return next;
+        });
+        return;
+      }
+
       setMessages(prev => [...prev, {
         type: 'bot',
-        content: data.content
+        content: data.content,
+        meta: data.meta,
+        requestId
       }]);
-      setIsLoading(false);
     };
     
     socket.onclose = () => {
@@ -51,23 +111,32 @@ function ChatBot({ isOpen, onToggle }) {
   }, [messages]);
 
   const sendMessage = () => {
-    if (!input.trim() || !ws || !isConnected || isLoading) return;
+    if (!input.trim() || !ws || !isConnected) return;
     
     const userMessage = input.trim();
+    nextRequestId.current += 1;
+    const requestId = `ui-${nextRequestId.current}`;
     
     // Add user message
     setMessages(prev => [...prev, {
       type: 'user',
-      content: userMessage
+      content: userMessage,
+      requestId
     }]);
     
-    setIsLoading(true);
+    // Earlier questions may still be running; answers come back tagged with their request_id
+    setPending(prev => [...prev, requestId]);
     
     // Send to backend
-    ws.send(JSON.stringify({ query: userMessage }));
+    ws.send(JSON.stringify({ query: userMessage, stream: true, request_id: requestId }));
     setInput('');
   };
 
+  const cancelLatest = () => {
+    if (!ws || pending.length === 0) return;
+    ws.send(JSON.stringify({ type: 'cancel', request_id: pending[pending.length - 1] }));
+  };
+
   const handleKeyPress = (e) => {
     if (e.key === 'Enter' && !e.shiftKey) {
       e.preventDefault();
@@ -136,10 +205,18 @@ function ChatBot({ isOpen, onToggle }) {
                   : 'bg-black/50 border-green-500/20 text-green-400'
               }`}>
                 <p className="text-sm whitespace-pre-wrap leading-relaxed">{msg.content}</p>
+                {msg.meta && (
+                  <p className="text-[10px] text-green-500/40 mt-2">
+                    {msg.meta.tool} • {msg.meta.mode} • {Math.round(msg.meta.latency_ms)} ms
+                  </p>
+                )}
               </div>
             </div>
           </div>
         ))}
+        {isLoading && status && (
+          <div className="text-xs text-green-500/60 terminal-text animate-pulse">&gt; {status}</div>
+        )}
         <div ref={messagesEndRef} />
       </div>
       
@@ -155,6 +232,15 @@ function ChatBot({ isOpen, onToggle }) {
             rows="3"
             disabled={!isConnected}
           />
+          {isLoading && (
+            <button
+              onClick={cancelLatest}
+              title="Cancel the latest query"
+              className="bg-red-500/10 border border-red-500/50 text-red-400 rounded-lg px-3 py-3 hover:bg-red-500/20 transition-all duration-300 flex items-center justify-center"
+            >
+              <X className="w-5 h-5" />
+            </button>
+          )}
           <button
             onClick={sendMessage}
             disabled={!isConnected || !input.trim()}
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import ChatBot from './ChatBot';
 import AlertsPage from './AlertsPage';
+import useAlertFeed from './useAlertFeed';
 import { 
   Menu, Bell, Shield, Activity, Users, AlertTriangle, 
   Terminal, Zap, Lock, Eye, TrendingUp, Server,
@@ -19,6 +20,7 @@ function Dashboard() {
   });
   const [alerts, setAlerts] = useState([]);
   const [currentTime, setCurrentTime] = useState(new Date());
+  const feed = useAlertFeed();
 
   // Handle UI actions
   const handleAction = async (actionId) => {
@@ -74,23 +76,33 @@ function Dashboard() {
     return () => clearInterval(timer);
   }, []);
 
-  // Fetch real stats from backend
+  const applyStats = (data) => {
+    setStats({
+      criticalAlerts: data.critical_alerts || 0,
+      activeAgents: data.active_agents || 0,
+      totalRules: data.total_rules || 0,
+      incidents: data.critical_alerts > 5 ? Math.floor(data.critical_alerts / 4) : 0,
+      connectionStatus: data.connection_status || 'connected'
+    });
+    setAlerts(data.recent_alerts || []);
+  };
+
+  // Stats are pushed over the live alert feed
+  useEffect(() => {
+    if (feed.stats) applyStats(feed.stats);
+  }, [feed.stats]);
+
+  // Fall back to polling /api/stats only while the feed is down
   useEffect(() => {
+    if (feed.status !== 'closed') return;
+
     const fetchStats = async () => {
       try {
         const response = await fetch('http://localhost:8000/api/stats');
         if (!response.ok) {
           throw new Error(`HTTP ${response.status}`);
         }
-        const data = await response.json();
-        setStats({
-          criticalAlerts: data.critical_alerts || 0,
-          activeAgents: data.active_agents || 0,
-          totalRules: data.total_rules || 0,
-          incidents: data.critical_alerts > 5 ? Math.floor(data.critical_alerts / 4) : 0,
-          connectionStatus: data.connection_status || 'connected'
-        });
-        setAlerts(data.recent_alerts || []);
+        applyStats(await response.json());
       } catch (error) {
         console.error('Backend connection failed:', error);
         setStats({
@@ -107,7 +119,7 @@ function Dashboard() {
     fetchStats();
     const interval = setInterval(fetchStats, 10000);
     return () => clearInterval(interval);
-  }, []);
+  }, [feed.status]);
 
   const getSeverityColor = (severity) => {
     switch (severity.toLowerCase()) {
@@ -524,7 +536,7 @@ function Dashboard() {
 
       {/* Conditional Page Rendering */}
       {currentPage === 'alerts' && (
-        <AlertsPage onBack={() => setCurrentPage('dashboard')} />
+        <AlertsPage onBack={() => setCurrentPage('dashboard')} feed={feed} />
       )}
       
       {/* Chatbot Sidebar */}
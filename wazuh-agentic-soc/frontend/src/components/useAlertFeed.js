@@ -0,0 +1,58 @@
+import { useState, useEffect } from 'react';
+
+const FEED_URL = 'ws://localhost:8000/ws/alerts';
+const RECONNECT_MS = 5000;
+
+// Live alerts and dashboard stats pushed by the backend's shared alert watcher:
+// a snapshot on connect, then only new alerts and changed stats
+function useAlertFeed() {
+  const [alerts, setAlerts] = useState([]);
+  const [stats, setStats] = useState(null);
+  // 'connecting', 'open' or 'closed' (callers fall back to polling while closed)
+  const [status, setStatus] = useState('connecting');
+
+  useEffect(() => {
+    let socket;
+    let retry;
+    let closed = false;
+
+    const connect = () => {
+      socket = new WebSocket(FEED_URL);
+
+      socket.onopen = () => setStatus('open');
+
+      socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'snapshot') {
+          setAlerts(data.alerts || []);
+          setStats(data.stats);
+        } else if (data.type === 'alerts') {
+          // Newest first, trimmed to the window the backend keeps
+          setAlerts(prev => [...data.new, ...prev].slice(0, data.window));
+        } else if (data.type === 'stats') {
+          setStats(data.stats);
+        }
+      };
+
+      socket.onclose = () => {
+        setStatus('closed');
+        if (!closed) retry = setTimeout(connect, RECONNECT_MS);
+      };
+
+      socket.onerror = (error) => {
+        console.error('Alert feed error:', error);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      socket.close();
+    };
+  }, []);
+
+  return { alerts, stats, status, connected: status === 'open' };
+}
+
+export default useAlertFeed;